@@ -2,23 +2,31 @@ from urllib.parse import urlparse
 import requests
 import asyncio
 import aiohttp
-from typing import List, Dict, Any, Tuple
-from HTMLContentExtractor import HTMLContentExtractor
+from typing import List, Dict, Any, Optional, Tuple
 import dotenv
 import os
-from browser import fetch_full_html
+from browser import browser_pool
+from extraction_pool import extraction_pool
+from endpoints import BRIGHT_DATA_API_URL
+from http_sessions import get_session
 
 dotenv.load_dotenv()
 
 API_KEY = os.getenv("BRIGHT_DATA_API_KEY")
 
+# Primary HTML shorter than this is treated as a failed fetch and retried in the browser
+MIN_HTML_LENGTH = 1400
+# Browser HTML is only used if it is longer than this
+MIN_BROWSER_HTML_LENGTH = 2000
+
 class FastContentExtractor:
     def __init__(self, api_key: str = API_KEY, 
-                 zone: str = "web_scraper"):
+                 zone: str = "web_scraper", extraction_mode: Optional[str] = None):
         self.api_key = api_key
         self.zone = zone
-        self.api_url = "https://api.brightdata.com/request"
-        self.html_extractor = HTMLContentExtractor()
+        # HTMLContentExtractor mode ("tiered", "fast" or "full"); None uses EXTRACTION_MODE
+        self.extraction_mode = extraction_mode
+        self.api_url = BRIGHT_DATA_API_URL
 
     async def __aenter__(self):
         return self
@@ -38,6 +46,8 @@ class FastContentExtractor:
         return processed_results
 
     async def _fetch_url(self, url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        domain = urlparse(url).netloc
+        raw_html, error = None, None
         try:
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -55,124 +65,125 @@ class FastContentExtractor:
             async with session.post(self.api_url, headers=headers, json=payload, timeout=timeout) as response:
                 if response.status != 200:
                     print(f"Error: API returned status {response.status} for {url}")
-                    return {
-                        'url': url,
-                        'domain': urlparse(url).netloc,
-                        'raw_html': None,
-                        'content': None,
-                        'error': f"API error: {response.status}",
-                        'success': False
-                    }
-                
-                raw_html = await response.text()
-                backup_html = await asyncio.to_thread(fetch_full_html, url)
-
-                if not raw_html or len(raw_html.strip()) < 1400:
-                    print(f"Error: Received empty or very short HTML for {url}: " + raw_html)
-                    if backup_html and len(backup_html.strip() > 2000):
-                        print(f"Using backup HTML for url: {url}")
-                        raw_html = backup_html
-                    else:  
-                        return {
-                            'url': url,
-                            'domain': urlparse(url).netloc,
-                            'raw_html': raw_html,
-                            'content': "Empty or very short HTML received: " + raw_html,
-                            'error': "Empty or very short HTML received",
-                            'success': False
-                        }
-                    
-                # Extract content using HTMLContentExtractor
-                processed_content = self.html_extractor.extract(url, raw_html)
-                
-                if not processed_content:
-                    print(f"Warning: Failed to extract content for {url}")
-                    return {
-                        'url': url,
-                        'domain': urlparse(url).netloc,
-                        'raw_html': raw_html,
-                        'content': None,
-                        'error': "Content extraction failed",
-                        'success': False
-                    }
-                
-                domain = urlparse(url).netloc
-                print(f"Successfully extracted {len(processed_content)} characters from {url}")
+                    error = f"API error: {response.status}"
+                else:
+                    raw_html = await response.text()
+        except asyncio.TimeoutError:
+            print(f"Timeout error for {url}")
+            error = "Request timed out"
+        except Exception as e:
+            print(f"Error processing {url}: {str(e)}")
+            error = str(e)
+
+        # The browser is only started for pages the API could not deliver
+        if error or not raw_html or len(raw_html.strip()) < MIN_HTML_LENGTH:
+            if not error:
+                print(f"Error: Received empty or very short HTML for {url}: " + (raw_html or ""))
+            backup_html = await browser_pool.fetch(url)
+            if backup_html and len(backup_html.strip()) > MIN_BROWSER_HTML_LENGTH:
+                print(f"Using backup HTML for url: {url}")
+                raw_html = backup_html
+            elif error:
+                return {
+                    'url': url,
+                    'domain': domain,
+                    'raw_html': None,
+                    'content': None,
+                    'error': error,
+                    'success': False
+                }
+            else:
                 return {
                     'url': url,
                     'domain': domain,
                     'raw_html': raw_html,
-                    'content': processed_content,
-                    'success': True
+                    'content': "Empty or very short HTML received: " + (raw_html or ""),
+                    'error': "Empty or very short HTML received",
+                    'success': False
                 }
-        except asyncio.TimeoutError:
-            print(f"Timeout error for {url}")
+
+        try:
+            # Extract content using HTMLContentExtractor, in a worker process so the event loop stays free
+            processed_content = await extraction_pool.extract(url, raw_html, self.extraction_mode)
+        except Exception as e:
+            print(f"Error processing {url}: {str(e)}")
             return {
                 'url': url,
-                'domain': urlparse(url).netloc,
-                'raw_html': None,
+                'domain': domain,
+                'raw_html': raw_html,
                 'content': None,
-                'error': "Request timed out",
+                'error': str(e),
                 'success': False
             }
-        except Exception as e:
-            print(f"Error processing {url}: {str(e)}")
+
+        if not processed_content:
+            print(f"Warning: Failed to extract content for {url}")
             return {
                 'url': url,
-                'domain': urlparse(url).netloc,
-                'raw_html': None,
+                'domain': domain,
+                'raw_html': raw_html,
                 'content': None,
-                'error': str(e),
+                'error': "Content extraction failed",
                 'success': False
             }
 
+        print(f"Successfully extracted {len(processed_content)} characters from {url}")
+        return {
+            'url': url,
+            'domain': domain,
+            'raw_html': raw_html,
+            'content': processed_content,
+            'success': True
+        }
+
     async def extract_content(self, urls: List[str]) -> Dict[str, Any]:
         results = {}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # Create tasks explicitly as required by asyncio
-                tasks = [asyncio.create_task(self._fetch_url(url, session)) for url in urls]
-                
-                # Set a timeout for the entire operation
-                timeout = 75  # 75 seconds total for all requests
-                
-                # Wait for tasks with timeout
-                done, pending = await asyncio.wait(tasks, timeout=timeout)
-                
-                # Handle completed tasks
-                for task in done:
-                    try:
-                        result = task.result()
-                        url = result['url']
-                        results[url] = result
-                    except Exception as e:
-                        print(f"Error getting task result: {str(e)}")
-                
-                # Handle pending tasks (timed out)
-                for task in pending:
-                    task.cancel()  # Cancel any pending tasks
-                    try:
-                        # Find the index of the task in our list (if possible)
-                        task_index = None
-                        for i, t in enumerate(tasks):
-                            if t == task:
-                                task_index = i
-                                break
-                        
-                        # Get the URL if we can find it
-                        url = urls[task_index] if task_index is not None else "unknown URL"
-                        print(f"Task for {url} timed out and was cancelled")
-                        results[url] = {
-                            'url': url,
-                            'domain': urlparse(url).netloc if url != "unknown URL" else "unknown",
-                            'raw_html': None,
-                            'content': None,
-                            'error': "Operation timed out",
-                            'success': False
-                        }
-                    except Exception as e:
-                        print(f"Error handling cancelled task: {str(e)}")
+            # Pooled per host (http_sessions), so connections stay warm across queries and runs
+            session = get_session(self.api_url)
+            # Create tasks explicitly as required by asyncio
+            tasks = [asyncio.create_task(self._fetch_url(url, session)) for url in urls]
+            
+            # Set a timeout for the entire operation
+            timeout = 75  # 75 seconds total for all requests
+            
+            # Wait for tasks with timeout
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            
+            # Handle completed tasks
+            for task in done:
+                try:
+                    result = task.result()
+                    url = result['url']
+                    results[url] = result
+                except Exception as e:
+                    print(f"Error getting task result: {str(e)}")
+            
+            # Handle pending tasks (timed out)
+            for task in pending:
+                task.cancel()  # Cancel any pending tasks
+                try:
+                    # Find the index of the task in our list (if possible)
+                    task_index = None
+                    for i, t in enumerate(tasks):
+                        if t == task:
+                            task_index = i
+                            break
+                    
+                    # Get the URL if we can find it
+                    url = urls[task_index] if task_index is not None else "unknown URL"
+                    print(f"Task for {url} timed out and was cancelled")
+                    results[url] = {
+                        'url': url,
+                        'domain': urlparse(url).netloc if url != "unknown URL" else "unknown",
+                        'raw_html': None,
+                        'content': None,
+                        'error': "Operation timed out",
+                        'success': False
+                    }
+                except Exception as e:
+                    print(f"Error handling cancelled task: {str(e)}")
         
         except Exception as e:
             print(f"Error in extract_content: {str(e)}")
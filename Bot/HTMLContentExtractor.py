@@ -1,5 +1,36 @@
+"""
+Article text extraction from raw HTML.
+
+HTMLContentExtractor.extract tries its strategies (site-specific CSS selectors,
+trafilatura, boilerpy3, readability) in turn and scores each result with
+_calculate_content_quality weighted by strategy. The default order runs the
+cheap selectors (~2 ms a page) first, then trafilatura (~20 ms), which is
+selected on most pages, then boilerpy3 (~7 ms) and readability (~12 ms); the
+strategy counters in extraction_pool.stats() show whether that still holds.
+
+In the default "tiered" mode extraction stops at the first result scoring at
+least EXTRACTION_GOOD_ENOUGH, and also as soon as none of the remaining
+strategies could score higher than the best result so far (a strategy never
+scores above its weight). "fast" mode, for bulk extraction, accepts a lower
+score and runs trafilatura without its fallback extractors; "full" mode always
+runs every strategy and keeps the best result.
+
+Configured with environment variables:
+- EXTRACTION_MODE: tiered, fast or full (default tiered)
+- EXTRACTION_STRATEGIES: strategy order (default site-specific,trafilatura,boilerpy,readability)
+- EXTRACTION_GOOD_ENOUGH: score that ends a tiered extraction early (default 0.6)
+- EXTRACTION_FAST_GOOD_ENOUGH: the same for fast mode (default 0.3)
+"""
+
+import copy
+import os
 import re
-from bs4 import BeautifulSoup
+import time
+from functools import lru_cache
+
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
 from trafilatura import extract as trafilatura_extract, extract_metadata
 from readability import Document
 from boilerpy3 import extractors
@@ -8,10 +39,110 @@ import html as html_lib
 from typing import Optional, Dict, List, Tuple
 import unicodedata
 from difflib import SequenceMatcher
-from bs4 import Tag
+from lxml.html import HtmlElement
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "tiered")
+EXTRACTION_STRATEGIES = [s.strip() for s in os.getenv(
+    "EXTRACTION_STRATEGIES", "site-specific,trafilatura,boilerpy,readability").split(",") if s.strip()]
+EXTRACTION_GOOD_ENOUGH = float(os.getenv("EXTRACTION_GOOD_ENOUGH", "0.6"))
+EXTRACTION_FAST_GOOD_ENOUGH = float(os.getenv("EXTRACTION_FAST_GOOD_ENOUGH", "0.3"))
+
+EXTRACTION_MODES = ("tiered", "fast", "full")
+
+# Base weight of each strategy's quality score; also the highest score it can reach
+STRATEGY_WEIGHTS = {
+    'site-specific': 1.2,
+    'trafilatura': 1.0,
+    'readability': 0.9,
+    'boilerpy': 0.8,
+}
+
+# Comments and processing instructions never carry article text
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+
+def _parse_html(html_content: str) -> HtmlElement:
+    """Parse markup with lxml (a C parser); raises etree.ParserError for an empty document."""
+    # Encoded first: lxml refuses str input that carries an XML encoding declaration
+    return lxml.html.document_fromstring(html_content.encode("utf-8", errors="replace"), parser=HTML_PARSER)
+
+
+@lru_cache(maxsize=256)
+def _css(selector: str) -> CSSSelector:
+    return CSSSelector(selector, translator="html")
+
+
+def _select(element: HtmlElement, selector: str) -> List[HtmlElement]:
+    """Elements under `element` matching a CSS selector (compiled selectors are cached)."""
+    return _css(selector)(element)
+
+
+def _select_one(element: HtmlElement, selector: str) -> Optional[HtmlElement]:
+    matches = _select(element, selector)
+    return matches[0] if matches else None
+
+
+def _get_text(element: HtmlElement) -> str:
+    """Stripped text pieces of an element joined by spaces (BeautifulSoup's get_text(" ", strip=True))."""
+    return " ".join(piece.strip() for piece in element.itertext() if piece.strip())
+
+
+def _drop(element: HtmlElement) -> None:
+    """Remove an element and its content, keeping the text that follows it."""
+    if element.getparent() is not None:
+        element.drop_tree()
+
+
+class HTMLDocument:
+    """
+    One page, parsed once.
+
+    Preprocessing edits `tree` in place; metadata and the fallback stages read it,
+    the selector stage and readability work on copies (they delete elements), and
+    trafilatura takes the tree directly. `html` serialises the tree at most once,
+    for boilerpy3, which only accepts a string.
+    """
+
+    def __init__(self, html_content: str):
+        self.tree = _parse_html(html_content)
+        self._html: Optional[str] = None
+
+    @property
+    def html(self) -> str:
+        if self._html is None:
+            self._html = lxml.html.tostring(self.tree, encoding="unicode")
+        return self._html
+
+    def changed(self) -> None:
+        """Call after editing `tree`, so `html` is serialised again."""
+        self._html = None
+
+    def copy(self) -> HtmlElement:
+        return copy.deepcopy(self.tree)
+
 
 class HTMLContentExtractor:
-    def __init__(self, site_configs: Optional[Dict[str, dict]] = None):
+    def __init__(self, site_configs: Optional[Dict[str, dict]] = None, mode: str = EXTRACTION_MODE,
+                 strategies: List[str] = EXTRACTION_STRATEGIES, good_enough: float = EXTRACTION_GOOD_ENOUGH,
+                 fast_good_enough: float = EXTRACTION_FAST_GOOD_ENOUGH):
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode {mode!r}, expected one of {EXTRACTION_MODES}")
+        unknown = [label for label in strategies if label not in STRATEGY_WEIGHTS]
+        if unknown:
+            raise ValueError(f"Unknown extraction strategies {unknown}, expected some of {list(STRATEGY_WEIGHTS)}")
+        self.mode = mode
+        self.strategies = list(strategies)
+        self.good_enough = good_enough
+        self.fast_good_enough = fast_good_enough
+        self._strategy_functions = {
+            'site-specific': self._run_site_specific,
+            'trafilatura': self._run_trafilatura,
+            'readability': self._run_readability,
+            'boilerpy': self._run_boilerpy,
+        }
         self.extractor = extractors.ArticleExtractor()
         if site_configs is None:
             self.site_configs = {
@@ -235,100 +366,137 @@ class HTMLContentExtractor:
             'thanks for sharing', 'photo:', 'image:', 'published', 'updated'
         ]
 
-    def _preprocess_html(self, html_content: str) -> str:
-        """Pre-process HTML to improve extraction results."""
+    def _preprocess(self, document: HTMLDocument) -> None:
+        """Pre-process the parsed page in place to improve extraction results."""
+        tree = document.tree
         try:
-            # Remove common problematic elements
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
             # Remove script, style, and SVG tags
-            for tag in soup.find_all(['script', 'style', 'svg', 'noscript']):
-                tag.decompose()
+            for tag in tree.xpath('//script|//style|//svg|//noscript'):
+                _drop(tag)
                 
             # Remove hidden elements
-            for tag in soup.find_all(style=re.compile(r'display:\s*none|visibility:\s*hidden')):
-                tag.decompose()
+            for tag in tree.xpath('//*[@style]'):
+                if re.search(r'display:\s*none|visibility:\s*hidden', tag.get('style')):
+                    _drop(tag)
             
             # Handle specific pattern issues
-            for div in soup.find_all('div', {'id': re.compile(r'footer|banner|sidebar|comment')}):
-                div.decompose()
+            for div in tree.xpath('//div[@id]'):
+                if re.search(r'footer|banner|sidebar|comment', div.get('id')):
+                    _drop(div)
                 
             # Keep header elements that might contain article titles
-            for div in soup.find_all('div', {'id': re.compile(r'header')}):
+            for div in tree.xpath('//div[@id]'):
+                if not re.search(r'header', div.get('id')):
+                    continue
                 # Only remove if not likely to contain main content
-                header_text = div.get_text()
+                header_text = ''.join(div.itertext())
                 if len(header_text) < 200 or re.search(r'(menu|navigation|logo|sign in)', header_text.lower()):
-                    div.decompose()
-                
-            return str(soup)
+                    _drop(div)
         except Exception:
-            return html_content
-
-    def extract(self, url: str, html_content: str) -> Optional[str]:
+            pass
+        document.changed()
+
+    def extract(self, url: str, html_content: str, mode: Optional[str] = None) -> Optional[str]:
+        return self.extract_with_report(url, html_content, mode)[0]
+
+    def extract_with_report(self, url: str, html_content: str,
+                            mode: Optional[str] = None) -> Tuple[Optional[str], Dict]:
+        """
+        Extract the article text of a page and report how it was found.
+
+        Args:
+            url: Address of the page (selects the site-specific selectors)
+            html_content: Raw HTML of the page
+            mode: "tiered", "fast" or "full"; defaults to the extractor's mode
+
+        Returns:
+            The formatted content (or None) and a report with the seconds spent per
+            strategy that ran, the strategy whose result was selected ("fallback"
+            for the main-div/paragraph fallbacks) and whether strategies were skipped.
+        """
+        mode = mode or self.mode
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode {mode!r}, expected one of {EXTRACTION_MODES}")
+        report = {"mode": mode, "strategies": {}, "selected": None, "early_exit": False}
+        return self._extract(url, html_content, mode, report), report
+
+    def _extract(self, url: str, html_content: str, mode: str, report: Dict) -> Optional[str]:
         if not html_content or len(html_content.strip()) < 100:
             return None
 
-        html_content = self._preprocess_html(html_content)
-        metadata = self.get_article_metadata(html_content, url)
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        cleaned_results = []
-
-        # Site-specific selectors (if applicable)
-        site_specific = self._extract_with_selectors(html_content, url)
-        if site_specific and len(site_specific.strip()) > 500:
-            cleaned_results.append((site_specific, 1.2, 'site-specific'))
-
-        # Trafilatura
-        trafilatura_result = self._extract_trafilatura(html_content)
-        if trafilatura_result:
-            cleaned_results.append((trafilatura_result, 1.0, 'trafilatura'))
-
-        # Readability
-        try:
-            doc = Document(html_content)
-            readability_soup = BeautifulSoup(doc.summary(), 'html.parser')
-            readability_text = self._fallback_extract_paragraphs(readability_soup)
-            if readability_text:
-                cleaned_results.append((readability_text, 0.9, 'readability'))
-        except Exception as e:
-            print(f"[ERROR] Readability failed: {e}")
-
-        # BoilerPy (optional)
+        # Parsed once; every stage below works off this document
         try:
-            boilerpy_result = self._extract_boilerpy(html_content)
-            if boilerpy_result:
-                cleaned_results.append((boilerpy_result, 0.8, 'boilerpy'))
-        except Exception:
-            pass
-
-        if cleaned_results:
-            scored_results = []
-            for content, base_weight, label in cleaned_results:
-                score = self._calculate_content_quality(content)
-                length_score = min(len(content) / 5000, 1.0)
-                total_score = base_weight * score * length_score
-                scored_results.append((content, total_score, label))
+            document = HTMLDocument(html_content)
+        except (etree.ParserError, ValueError):
+            return None
+        self._preprocess(document)
+        metadata = self.get_article_metadata(document, url)
+
+        good_enough = {"tiered": self.good_enough, "fast": self.fast_good_enough}.get(mode)
+        best = None  # (score, content, label)
+        for i, label in enumerate(self.strategies):
+            started = time.perf_counter()
+            content = self._strategy_functions[label](document, url, mode == "fast")
+            report["strategies"][label] = time.perf_counter() - started
+            if content:
+                score = STRATEGY_WEIGHTS[label] * self._calculate_content_quality(content) * min(len(content) / 5000, 1.0)
+                # Ties go to the strategy with the higher weight, whatever the order
+                if best is None or (score, STRATEGY_WEIGHTS[label]) > (best[0], STRATEGY_WEIGHTS[best[2]]):
+                    best = (score, content, label)
+            if good_enough is None or best is None:
+                continue
+            remaining = self.strategies[i + 1:]
+            if best[0] >= good_enough or best[0] >= max((STRATEGY_WEIGHTS[r] for r in remaining), default=0.0):
+                report["early_exit"] = bool(remaining)
+                break
 
-            best_result, _, label = max(scored_results, key=lambda x: x[1])
+        if best is not None:
+            _, best_result, label = best
+            report["selected"] = label
             print(f"[DEBUG] Selected content from {label} with length {len(best_result)}")
             return self._format_with_metadata(self._clean_content(best_result), metadata)
 
         # Fallback: auto-detect main content div
-        guessed_div = self._guess_main_content_div(soup)
-        if guessed_div:
-            text = guessed_div.get_text(separator=" ", strip=True)
+        guessed_div = self._guess_main_content_div(document.tree)
+        if guessed_div is not None:
+            text = _get_text(guessed_div)
             if text:
+                report["selected"] = "fallback"
                 return self._format_with_metadata(self._clean_content(text), metadata)
 
         # Fallback: collect all <p> and <li> elements
-        fallback = self._fallback_extract_paragraphs(soup)
+        fallback = self._fallback_extract_paragraphs(document.tree)
         if fallback:
+            report["selected"] = "fallback"
             return self._format_with_metadata(self._clean_content(fallback), metadata)
 
         return None
 
-    def _extract_with_selectors(self, html_content: str, url: str) -> Optional[str]:
+    # Strategies: each takes (document, url, fast) and returns candidate text or None
+
+    def _run_site_specific(self, document: HTMLDocument, url: str, fast: bool) -> Optional[str]:
+        site_specific = self._extract_with_selectors(document, url)
+        return site_specific if site_specific and len(site_specific.strip()) > 500 else None
+
+    def _run_trafilatura(self, document: HTMLDocument, url: str, fast: bool) -> Optional[str]:
+        return self._extract_trafilatura(document, fast=fast)
+
+    def _run_readability(self, document: HTMLDocument, url: str, fast: bool) -> Optional[str]:
+        try:
+            doc = Document(document.copy())
+            readability_tree = _parse_html(doc.summary())
+            return self._fallback_extract_paragraphs(readability_tree)
+        except Exception as e:
+            print(f"[ERROR] Readability failed: {e}")
+            return None
+
+    def _run_boilerpy(self, document: HTMLDocument, url: str, fast: bool) -> Optional[str]:
+        try:
+            return self._extract_boilerpy(document.html)
+        except Exception:
+            return None
+
+    def _extract_with_selectors(self, document: HTMLDocument, url: str) -> Optional[str]:
         """Extract content using custom CSS selectors for known sites."""
         from urllib.parse import urlparse
         domain = urlparse(url).netloc
@@ -349,43 +517,41 @@ class HTMLContentExtractor:
             ]
 
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # A copy: the removals below must not leak into the other stages
+            tree = document.copy()
 
             for selector in remove_selectors:
-                for element in soup.select(selector):
-                    element.decompose()
+                for element in _select(tree, selector):
+                    _drop(element)
 
-            for tag in soup.find_all(['aside', 'nav', 'footer']):
-                tag.decompose()
+            for tag in list(tree.iter('aside', 'nav', 'footer')):
+                _drop(tag)
 
-            for tag in soup.find_all(class_=re.compile(r'(ad-|banner|promo|sponsored|recommendation)')):
-                tag.decompose()
+            for tag in tree.xpath('//*[@class]'):
+                if re.search(r'(ad-|banner|promo|sponsored|recommendation)', tag.get('class')):
+                    _drop(tag)
 
             content_parts = []
 
             for selector in selectors:
-                for element in soup.select(selector):
+                for element in _select(tree, selector):
                     self._clean_element(element)
 
                     paragraphs = []
-                    children = list(element.children)
+                    children = list(element)
                     i = 0
                     while i < len(children):
                         child = children[i]
-                        if not isinstance(child, Tag):
-                            i += 1
-                            continue
-
-                        tag_name = child.name
-                        text = child.get_text(separator=" ", strip=True)
+                        tag_name = child.tag
+                        text = _get_text(child)
 
                         if tag_name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6'] and text:
                             merged_text = [text]
                             j = i + 1
                             while j < len(children):
                                 next_child = children[j]
-                                if isinstance(next_child, Tag) and next_child.name in ['p', 'div', 'ul', 'ol']:
-                                    para = next_child.get_text(separator=" ", strip=True)
+                                if next_child.tag in ['p', 'div', 'ul', 'ol']:
+                                    para = _get_text(next_child)
                                     if para and len(para) > 30 and not self._is_boilerplate(para):
                                         merged_text.append(para)
                                         i = j
@@ -401,8 +567,8 @@ class HTMLContentExtractor:
 
             if not content_parts:
                 paragraphs = []
-                for p in soup.find_all(['p']):
-                    text = p.get_text(separator = " ", strip=True)
+                for p in tree.iter('p'):
+                    text = _get_text(p)
                     if text and len(text) > 20 and not self._is_boilerplate(text):
                         paragraphs.append(text)
                 if paragraphs:
@@ -417,17 +583,18 @@ class HTMLContentExtractor:
     def _clean_element(self, element):
         """Clean an element's internal structure."""
         # Remove common clutter tags
-        for tag in element.find_all(['script', 'style', 'button', 'form', 'input', 'iframe']):
-            tag.decompose()
+        for tag in list(element.iterdescendants('script', 'style', 'button', 'form', 'input', 'iframe')):
+            _drop(tag)
             
         # Remove share buttons and related elements
-        for tag in element.find_all(class_=re.compile(r'share|social|comment|related|promo|ad|subscribe|newsletter')):
-            tag.decompose()
+        for tag in element.xpath('.//*[@class]'):
+            if re.search(r'share|social|comment|related|promo|ad|subscribe|newsletter', tag.get('class')):
+                _drop(tag)
             
         # Remove empty paragraphs
-        for p in element.find_all('p'):
-            if not p.get_text(separator = " ", strip=True) or len(p.get_text(separator = " ", strip=True)) < 5:
-                p.decompose()
+        for p in list(element.iterdescendants('p')):
+            if len(_get_text(p)) < 5:
+                _drop(p)
                 
     def _is_boilerplate(self, text: str) -> bool:
         """Check if text is likely boilerplate content."""
@@ -448,7 +615,7 @@ class HTMLContentExtractor:
         return False
     
 
-    def _extract_trafilatura(self, html_content: str) -> Optional[str]:
+    def _extract_trafilatura(self, document: HTMLDocument, fast: bool = False) -> Optional[str]:
         try:
             config = use_config()
             if not config.has_section("EXTRACTION"):
@@ -456,20 +623,22 @@ class HTMLContentExtractor:
             config.set("DEFAULT", "EXTRACTION_TIMEOUT", "0")
             config.set("EXTRACTION", "favor_precision", "true")
 
-            result = trafilatura_extract(html_content, config=config)
+            # trafilatura copies a tree it is given, so the shared one is left as it is
+            # fast skips trafilatura's own fallback extractors (readability-lxml, jusText)
+            result = trafilatura_extract(document.tree, config=config, fast=fast)
             return result if result and len(result) > 300 else None
         except Exception as e:
             print(f"[ERROR] Trafilatura failed: {e}")
             return None
         
-    def _guess_main_content_div(self, soup: BeautifulSoup) -> Optional[Tag]:
+    def _guess_main_content_div(self, tree: HtmlElement) -> Optional[HtmlElement]:
         candidates = []
-        for div in soup.find_all('div'):
-            class_attr = ' '.join(div.get('class', []))
+        for div in tree.iter('div'):
+            class_attr = div.get('class', '')
             if any(kw in class_attr for kw in ['footer', 'nav', 'sidebar', 'header', 'promo', 'share']):
                 continue
-            text = div.get_text(separator=' ', strip=True)
-            p_count = len(div.find_all('p'))
+            text = _get_text(div)
+            p_count = sum(1 for _ in div.iterdescendants('p'))
             if len(text) > 500 and p_count >= 3:
                 candidates.append((div, len(text)))
 
@@ -477,10 +646,10 @@ class HTMLContentExtractor:
             return sorted(candidates, key=lambda x: x[1], reverse=True)[0][0]
         return None
     
-    def _fallback_extract_paragraphs(self, soup: BeautifulSoup) -> Optional[str]:
+    def _fallback_extract_paragraphs(self, tree: HtmlElement) -> Optional[str]:
         paragraphs = []
-        for tag in soup.find_all(['p', 'li', 'h2', 'h3']):
-            text = tag.get_text(separator=" ", strip=True)
+        for tag in tree.iter('p', 'li', 'h2', 'h3'):
+            text = _get_text(tag)
             if text and len(text) > 40 and not self._is_boilerplate(text):
                 paragraphs.append(text)
         return '\n\n'.join(paragraphs) if paragraphs else None
@@ -488,38 +657,37 @@ class HTMLContentExtractor:
 
         
 
-    def _extract_readability(self, html_content: str) -> Optional[str]:
+    def _extract_readability(self, document: HTMLDocument) -> Optional[str]:
         """Extract content using readability."""
         try:
-            doc = Document(html_content)
+            # readability deletes elements from the tree it is given
+            doc = Document(document.copy())
             title = doc.title()
-            summary_html = doc.summary()
-            
-            # Process with BeautifulSoup for better formatting
-            soup = BeautifulSoup(summary_html, 'html.parser')
+            summary_tree = _parse_html(doc.summary())
             
             # Remove clutter
-            for tag in soup.find_all(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                tag.decompose()
+            for tag in list(summary_tree.iter('script', 'style', 'nav', 'footer', 'header', 'aside')):
+                _drop(tag)
                 
-            for tag in soup.find_all(class_=re.compile(r'ads|share|comment|social|promo|related')):
-                tag.decompose()
+            for tag in summary_tree.xpath('//*[@class]'):
+                if re.search(r'ads|share|comment|social|promo|related', tag.get('class')):
+                    _drop(tag)
                 
             # Extract paragraphs with proper spacing, including all possible content containers
             paragraphs = []
             
             # First try to get all paragraph-like elements
-            for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                text = element.get_text(separator = " ", strip=True)
+            for element in summary_tree.iter('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+                text = _get_text(element)
                 if text and len(text) > 15 and not self._is_boilerplate(text):
                     paragraphs.append(text)
             
             # If we didn't find enough content, try extracting div elements directly
             if len(''.join(paragraphs)) < 1000:
-                for div in soup.find_all('div'):
+                for div in summary_tree.iter('div'):
                     # Only process divs that don't have nested paragraphs (to avoid duplication)
-                    if not div.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        text = div.get_text(separator = " ", strip=True)
+                    if next(div.iterdescendants('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'), None) is None:
+                        text = _get_text(div)
                         if text and len(text) > 50 and not self._is_boilerplate(text):
                             # Split into pseudo-paragraphs for better readability
                             for section in re.split(r'(?<=[.!?])\s+', text):
@@ -633,86 +801,86 @@ class HTMLContentExtractor:
         
         return '\n\n'.join(result)
 
-    def get_article_metadata(self, html_content: str, url: str) -> Dict:
+    def get_article_metadata(self, document: HTMLDocument, url: str) -> Dict:
         """Extract metadata from the article."""
         try:
             metadata = {}
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree = document.tree
             
             # Get title
-            metadata['title'] = self._extract_title(soup)
+            metadata['title'] = self._extract_title(tree)
             
             # Get author
-            metadata['author'] = self._extract_author(soup)
+            metadata['author'] = self._extract_author(tree)
             
             # Get publication date
-            metadata['date'] = self._extract_date(soup)
+            metadata['date'] = self._extract_date(tree)
             
             # Get source/publication
-            metadata['source'] = self._extract_source(soup, url)
+            metadata['source'] = self._extract_source(tree, url)
             
             return {k: v for k, v in metadata.items() if v}  # Remove empty values
         except Exception:
             return {}
             
-    def _extract_title(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_title(self, tree: HtmlElement) -> Optional[str]:
         """Extract the article title."""
         # Try meta tags first
-        for meta in soup.find_all('meta'):
+        for meta in tree.iter('meta'):
             if meta.get('property') in ['og:title', 'twitter:title'] and meta.get('content'):
                 return meta.get('content').strip()
                 
         # Try h1 tags
-        h1 = soup.find('h1')
-        if h1:
-            return h1.get_text(separator = " ", strip=True)
+        h1 = next(tree.iter('h1'), None)
+        if h1 is not None:
+            return _get_text(h1)
             
         # Fallback to title tag
-        title_tag = soup.find('title')
-        if title_tag:
-            return title_tag.get_text(separator = " ", strip=True)
+        title_tag = next(tree.iter('title'), None)
+        if title_tag is not None:
+            return _get_text(title_tag)
             
         return None
         
-    def _extract_author(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_author(self, tree: HtmlElement) -> Optional[str]:
         """Extract the author name."""
         # Try meta tags
-        for meta in soup.find_all('meta'):
+        for meta in tree.iter('meta'):
             if meta.get('name') in ['author', 'article:author'] and meta.get('content'):
                 return meta.get('content').strip()
                 
         # Try common author selectors
         for selector in ['.author', '.byline', '.writer', '[rel="author"]']:
-            author_elem = soup.select_one(selector)
-            if author_elem:
-                return author_elem.get_text(separator = " ", strip=True)
+            author_elem = _select_one(tree, selector)
+            if author_elem is not None:
+                return _get_text(author_elem)
                 
         return None
         
-    def _extract_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_date(self, tree: HtmlElement) -> Optional[str]:
         """Extract publication date."""
         # Try meta tags
-        for meta in soup.find_all('meta'):
+        for meta in tree.iter('meta'):
             if meta.get('property') in ['article:published_time', 'og:published_time'] and meta.get('content'):
                 return meta.get('content').strip()
                 
         # Try time tags
-        time_elem = soup.find('time')
-        if time_elem and time_elem.get('datetime'):
+        time_elem = next(tree.iter('time'), None)
+        if time_elem is not None and time_elem.get('datetime'):
             return time_elem.get('datetime')
             
         # Try common date selectors
         for selector in ['.date', '.published', '.timestamp', '.pubdate']:
-            date_elem = soup.select_one(selector)
-            if date_elem:
-                return date_elem.get_text(separator = " ", strip=True)
+            date_elem = _select_one(tree, selector)
+            if date_elem is not None:
+                return _get_text(date_elem)
                 
         return None
         
-    def _extract_source(self, soup: BeautifulSoup, url: str) -> str:
+    def _extract_source(self, tree: HtmlElement, url: str) -> str:
         """Extract publication source name."""
         # Try meta tags
-        for meta in soup.find_all('meta'):
+        for meta in tree.iter('meta'):
             if meta.get('property') in ['og:site_name'] and meta.get('content'):
                 return meta.get('content').strip()
                 
@@ -775,26 +943,30 @@ class HTMLContentExtractor:
         
         return content
 
-    def _extract_cna_article(self, html_content: str) -> Optional[str]:
+    def _extract_cna_article(self, document: HTMLDocument) -> Optional[str]:
         """Special extraction for CNA (Channel News Asia) articles."""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree = document.copy()
             
             # Remove clutter first
-            for element in soup.select('.advertisement, .teaser, .partner-recommendations, div[class*="recommendation"], div[class*="partner"], .also-worth-reading'):
-                element.decompose()
+            for element in _select(tree, '.advertisement, .teaser, .partner-recommendations, div[class*="recommendation"], div[class*="partner"], .also-worth-reading'):
+                _drop(element)
             
             # Try to find the main article content
             content_sections = []
             
             # Strategy 1: Find the main article container
-            main_content = soup.select_one('article') or soup.select_one('div.article-body-wrapper') or soup.select_one('div.text-long')
-            
-            if main_content:
+            main_content = None
+            for selector in ('article', 'div.article-body-wrapper', 'div.text-long'):
+                main_content = _select_one(tree, selector)
+                if main_content is not None:
+                    break
+
+            if main_content is not None:
                 # Extract paragraphs from the main content
                 paragraphs = []
-                for p in main_content.find_all('p'):
-                    text = p.get_text(separator = " ", strip=True)
+                for p in main_content.iterdescendants('p'):
+                    text = _get_text(p)
                     if text and len(text) > 15 and not self._is_boilerplate(text):
                         paragraphs.append(text)
                 
@@ -804,8 +976,8 @@ class HTMLContentExtractor:
             # Strategy 2: Direct paragraph extraction (may include IMPACT ON SINGAPORE and other section headers)
             if not content_sections:
                 paragraphs = []
-                for p in soup.find_all('p'):
-                    text = p.get_text(separator = " ", strip=True)
+                for p in tree.iter('p'):
+                    text = _get_text(p)
                     if text and len(text) > 15 and not self._is_boilerplate(text):
                         if text.isupper() and len(text) < 40:  # Likely a section header
                             paragraphs.append(f"\n{text}\n")
@@ -816,14 +988,15 @@ class HTMLContentExtractor:
                     content_sections.append('\n\n'.join(paragraphs))
             
             # Strategy 3: Look for Related content sections (like "Related:" followed by links)
-            related_sections = soup.find_all(string=re.compile(r'Related:'))
+            related_sections = tree.xpath('//text()[contains(., "Related:")]')
             for related in related_sections:
-                related_element = related.parent
-                if related_element:
+                # The element holding the text (a tail string belongs to the element before it)
+                related_element = related.getparent().getparent() if related.is_tail else related.getparent()
+                if related_element is not None:
                     related_links = []
                     # Find all links within or after the related section
-                    for link in related_element.find_all('a'):
-                        link_text = link.get_text(separator = " ", strip=True)
+                    for link in related_element.iterdescendants('a'):
+                        link_text = _get_text(link)
                         if link_text and len(link_text) > 10:
                             related_links.append(f"- {link_text}")
                     
@@ -1,13 +1,12 @@
 import asyncio
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 from datetime import datetime
 import dotenv
 import requests
 import os
 from forecaster import binary_forecast, multiple_choice_forecast
 from main import get_post_details
+from http_sessions import close_sessions
 
 
 dotenv.load_dotenv()
@@ -118,7 +117,7 @@ async def forecast_question(q):
     print(f"[forecast_question] Starting forecast for question: {q.title if hasattr(q, 'title') else q}")
     try:
         if isinstance(q, SimpleQuestion):
-            details_dict = get_post_details(q.post_id)["question"]
+            details_dict = (await get_post_details(q.post_id))["question"]
             community_prob = await get_metaculus_community_prediction(q.id)
             question = ForecastableQuestion(details=details_dict, community_prediction=community_prob, url=q.url)
         else:
@@ -278,6 +277,8 @@ def normalized_eval(
         raise ValueError("q_type must be 'binary' or 'multiple_choice'")
 
 def plot_results(bot_preds, community_preds, question_titles, types, options_list=None):
+    import matplotlib.pyplot as plt  # plotting stack is only loaded once there is something to plot
+
     binary_indices = [i for i, t in enumerate(types) if t == "binary"]
     mcq_indices = [i for i, t in enumerate(types) if t == "multiple_choice"]
 
@@ -340,6 +341,8 @@ def summarize_performance(bot_preds, community_preds, df):
     print(f"Median normalized error: {df_clean['normalized_error'].median():.4f}")
     print(f"Min: {df_clean['normalized_error'].min():.4f} | Max: {df_clean['normalized_error'].max():.4f}")
 
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 5))
     plt.hist(df_clean['normalized_error'], bins=10, edgecolor='black')
     plt.title("Normalized Error Distribution")
@@ -357,7 +360,9 @@ async def run_benchmark(n=45):
         batch = selected_questions[i:i+2]
         batch_results = await asyncio.gather(*(forecast_question(q) for q in batch))
         results.extend([r for r in batch_results if r is not None])
+    await close_sessions()
 
+    import pandas as pd
 
     df = pd.DataFrame(results)
     if df.empty:
@@ -10,25 +10,29 @@ from prompts import (
 )
 from llm_calls import call_claude, call_gpt_o3, call_gpt_o4_mini, call_claude_with_fallback, call_gpt_o4_mini_with_fallback, call_forecaster_1, call_forecaster_2, call_forecaster_3, call_forecaster_4, call_forecaster_5
 from search import process_search_queries
+from pipeline import forecast_graph, run_forecast
 
 """
-Program flow:
+Program flow (declared as a pipeline.forecast_graph stage graph; every stage starts as soon as its inputs are ready):
 1. Take BINARY_PROMPT_historical and BINARY_PROMPT_current, format in the title, date, background, resolution criteria, fine print (as below) and run call_claude simultaneously on both prompts 
 2. Take the output of call_claude, and run it through process_search_queries (programmed to handle raw LLM output, set forecaster_id = "-1" for historical and "0" for current)
-3. Use the output of process_search_queries with forecaster_id = "-1" as context for binary prompt 1
+3. Use the output of process_search_queries with forecaster_id = "-1" as context for binary prompt 1, as soon as it is ready (the current-context research keeps running until step 2 needs it)
 4. Take Binary Prompt 1, format in the title, date, resolution_criteria, fine print and context and run, simultaneously, two instances of call_claude (forecaster_id will be 1 and 2 respectively, all strings), two instances of gpt-o4-mini (forecaster_id will be 3 and 4 respectively, all strings) and one instance of gpt-o3 (forecaster_id will be 5)
-5. First, initialize a context dictionary with context[1], context[2], context[3], context[4], context[5], all equal to the result of process_search_queries with forecaster_id = "0" (we got this in step 2). Then, we will process the output of Binary Prompt 1 as follows:
+5. As soon as the step-1 output(s) a forecaster depends on are ready (STEP2_DEPENDENCIES), build its context; there is no barrier between the steps. First, initialize a context dictionary with context[1], context[2], context[3], context[4], context[5], all equal to the result of process_search_queries with forecaster_id = "0" (we got this in step 2). Then, we will process the output of Binary Prompt 1 as follows:
     (a) The output of forecaster_id 1 is appended to context[1]
     (b) The output of forecaster_id 2 is appended to context[3]
     (c) The output of forecaster_id 3 is appended to context[2]
     (d) The output of forecaster_id 4 is appended to context[4]
     (e) The output of forecaster_id 5 is appended to context[5]
-6. Now, take binary prompt 2, format in the title, date, resolution_criteria, fine_print and respective context (i.e., forecaster x gets context[x]) and run, simultaneously, all five instances we ran previously
+6. Now, take binary prompt 2, format in the title, date, resolution_criteria, fine_print and respective context (i.e., forecaster x gets context[x]) and run it for that forecaster
 7. Pass the output of all five instances to extract_probability_from_response_as_percentage_not_decimal to extract the five probabilities
 8. Average the five probabilities, first four with weight 1 and last (from o3) with weight 2 to get the final probability
 9. The output should be the final probabilities and the final outputs of binary prompt 2, clearly indicating which output belongs to which forecaster
 """
 
+# Step-1 outputs each forecaster's step-2 prompt reads (forecasters 2 and 3 swap outside views)
+STEP2_DEPENDENCIES = {1: (1,), 2: (3,), 3: (2,), 4: (4,), 5: (5,)}
+
 
 def extract_probability_from_response_as_percentage_not_decimal(forecast_text: str) -> float:
     matches = re.findall(r"Probability:\s*([0-9]+(?:\.[0-9]+)?)%", forecast_text.strip())
@@ -38,6 +42,14 @@ def extract_probability_from_response_as_percentage_not_decimal(forecast_text: s
     raise ValueError(f"Could not extract prediction from response: {forecast_text}")
 
 
+def probability_answer_ready(forecast_text: str) -> bool:
+    """True once the final 'Probability: ZZ%' line has streamed in after the Checklist section."""
+    if "Checklist:" not in forecast_text:
+        return False
+    tail = forecast_text.rsplit("Checklist:", 1)[1]
+    return re.search(r"Probability:\s*[0-9]+(?:\.[0-9]+)?%", tail) is not None
+
+
 async def get_binary_forecast(question_details, write=print):
     today = datetime.datetime.now().strftime("%Y-%m-%d")
     title = question_details["title"]
@@ -55,99 +67,91 @@ async def get_binary_forecast(question_details, write=print):
         )
         return content, await call_gpt_o3(content)
 
-    historical_task = asyncio.create_task(format_and_call_gpt(BINARY_PROMPT_historical))
-    current_task = asyncio.create_task(format_and_call_gpt(BINARY_PROMPT_current))
-    (historical_prompt, historical_output), (current_prompt, current_output) = await asyncio.gather(
-        historical_task, current_task
-    )
+    research_prompts = {"historical": BINARY_PROMPT_historical, "current": BINARY_PROMPT_current}
+    search_ids = {"historical": "-1", "current": "0"}
 
-    context_historical, context_current = await asyncio.gather(
-        process_search_queries(historical_output, forecaster_id="-1", question_details=question_details),
-        process_search_queries(current_output, forecaster_id="0", question_details=question_details),
-    )
+    async def generate_queries(kind):
+        _, output = await format_and_call_gpt(research_prompts[kind])
+        write(f"\n{kind.capitalize()} context LLM output:\n" + output)
+        return output
 
-    write("\nHistorical context LLM output:\n" + historical_output)
-    write("\nCurrent context LLM output:\n" + current_output)
-    write("\nHistorical context search results:\n" + context_historical)
-    write("\nCurrent context search results:\n" + context_current)
-
-    prompt1 = BINARY_PROMPT_1.format(
-        title=title,
-        today=today,
-        resolution_criteria=resolution_criteria,
-        fine_print=fine_print,
-        context=context_historical,
-    )
+    async def search(kind, output):
+        context = await process_search_queries(output, forecaster_id=search_ids[kind], question_details=question_details)
+        write(f"\n{kind.capitalize()} context search results:\n" + context)
+        return context
 
-    async def run_prompt1():
-        return await asyncio.gather(
-            call_forecaster_1(prompt1),  # forecaster 1 - claude-haiku-4.5
-            call_forecaster_2(prompt1),  # forecaster 2 - gemini-2.5-flash
-            call_forecaster_3(prompt1),  # forecaster 3 - gpt-5-chat
-            call_forecaster_4(prompt1),  # forecaster 4 - o4-mini
-            call_forecaster_5(prompt1),  # forecaster 5 - grok-4-fast
+    def format_prompt1(context_historical):
+        return BINARY_PROMPT_1.format(
+            title=title,
+            today=today,
+            resolution_criteria=resolution_criteria,
+            fine_print=fine_print,
+            context=context_historical,
         )
 
-    results_prompt1 = await run_prompt1()
-
-    for i, res in enumerate(results_prompt1):
-        write(f"\nForecaster_{i+1} step 1 output:\n{res}")
+    labels = {1: "Outside view", 2: "Outside view", 3: "Outside view", 4: "Inside view", 5: "Inside view"}
 
-    context_map = {
-        "1": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[0]}",
-        "2": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[2]}",
-        "3": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[1]}",
-        "4": f"Current context: {context_current}\nInside view prediction: {results_prompt1[3]}",
-        "5": f"Current context: {context_current}\nInside view prediction: {results_prompt1[4]}",
-    }
-
-    def format_prompt2(f_id: str):
+    def format_prompt2(f_id: int, context_current: str, step1_outputs: dict):
+        (prediction,) = step1_outputs.values()
         return BINARY_PROMPT_2.format(
             title=title,
             today=today,
             resolution_criteria=resolution_criteria,
             fine_print=fine_print,
-            context=context_map[f_id],
+            context=f"Current context: {context_current}\n{labels[f_id]} prediction: {prediction}",
         )
 
-    async def run_prompt2():
-        return await asyncio.gather(
-            call_forecaster_1(format_prompt2("1")),  # forecaster 1 - claude-haiku-4.5
-            call_forecaster_2(format_prompt2("2")),  # forecaster 2 - gemini-2.5-flash
-            call_forecaster_3(format_prompt2("3")),  # forecaster 3 - gpt-5-chat
-            call_forecaster_4(format_prompt2("4")),  # forecaster 4 - o4-mini
-            call_forecaster_5(format_prompt2("5")),  # forecaster 5 - grok-4-fast
+    def aggregate(results_prompt2, parsed):
+        probabilities = []
+        for i, (r, prob) in enumerate(zip(results_prompt2, parsed)):
+            if isinstance(r, Exception):
+                write(f"Forecaster {i+1} failed: {r}")
+                probabilities.append(None)
+            elif isinstance(prob, Exception):
+                write(f"Error extracting probability: {prob}")
+                probabilities.append(None)
+            else:
+                probabilities.append(prob)
+
+        valid_probs = [p for p in probabilities if p is not None]
+        if len(valid_probs) >= 1:
+            weights = [1, 1, 1, 2, 2]  # forecaster 5 (o3) has truple weight
+            weighted_probs = [p * w for p, w in zip(probabilities, weights) if p is not None]
+            weight_sum = sum(w for p, w in zip(probabilities, weights) if p is not None)
+            final_prob = float(np.sum(weighted_probs) / weight_sum)
+            final_prob = min(0.999, max(0.001, final_prob / 100))  # Normalize to [0.001, 0.999]
+        else:
+            final_prob = None
+
+        write(f"\nFinal predictions: {probabilities}")
+        write(f"Result: {final_prob}")
+
+        final_outputs = "\n\n".join(
+            f"=== Forecaster {i+1} ===\nOutput:\n{out}\nPredicted Probability: {prob if prob is not None else 'N/A'}%"
+            for i, (out, prob) in enumerate(zip(results_prompt2, probabilities))
         )
 
-    results_prompt2 = await run_prompt2()
-
-    probabilities = []
-    for r in results_prompt2:
-        try:
-            prob = extract_probability_from_response_as_percentage_not_decimal(r)
-            probabilities.append(prob)
-        except Exception as e:
-            write(f"Error extracting probability: {e}")
-            probabilities.append(None)
-
-    valid_probs = [p for p in probabilities if p is not None]
-    if len(valid_probs) >= 1:
-        weights = [1, 1, 1, 2, 2]  # forecaster 5 (o3) has truple weight
-        weighted_probs = [p * w for p, w in zip(probabilities, weights) if p is not None]
-        weight_sum = sum(w for p, w in zip(probabilities, weights) if p is not None)
-        final_prob = float(np.sum(weighted_probs) / weight_sum)
-        final_prob = min(0.999, max(0.001, final_prob / 100))  # Normalize to [0.001, 0.999]
-    else:
-        final_prob = None
-
-    write(f"\nFinal predictions: {probabilities}")
-    write(f"Result: {final_prob}")
-
-    final_outputs = "\n\n".join(
-        f"=== Forecaster {i+1} ===\nOutput:\n{out}\nPredicted Probability: {prob if prob is not None else 'N/A'}%"
-        for i, (out, prob) in enumerate(zip(results_prompt2, probabilities))
+        write(final_outputs)
+
+        return final_prob, final_outputs
+
+    graph = forecast_graph(
+        "binary",
+        generate_queries=generate_queries,
+        search=search,
+        forecasters={
+            1: call_forecaster_1,  # forecaster 1 - claude-haiku-4.5
+            2: call_forecaster_2,  # forecaster 2 - gemini-2.5-flash
+            3: call_forecaster_3,  # forecaster 3 - gpt-5-chat
+            4: call_forecaster_4,  # forecaster 4 - o4-mini
+            5: call_forecaster_5,  # forecaster 5 - grok-4-fast
+        },
+        step1_prompt=format_prompt1,
+        step2_prompt=format_prompt2,
+        dependencies=STEP2_DEPENDENCIES,
+        answer_ready=probability_answer_ready,
+        parse=extract_probability_from_response_as_percentage_not_decimal,
+        aggregate=aggregate,
+        write=write,
     )
-
-    write(final_outputs)
-
-    return final_prob, final_outputs
+    return await run_forecast(graph, question_details, write=write)
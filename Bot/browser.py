@@ -1,43 +1,295 @@
+"""
+Headless Chromium fallback for pages the scraping API could not deliver.
 
+FastContentExtractor asks the browser only when the Bright Data fetch failed or
+returned (nearly) empty HTML. One browser is launched per process and kept
+running; it holds a fixed number of contexts with one reusable page each, so at
+most BROWSER_POOL_SIZE pages render at a time and every other caller waits for a
+free page. Contexts block images, fonts and media, which the text extraction
+never looks at.
+
+Instead of waiting for the network to go idle and then sleeping a fixed time, a
+page is read as soon as its DOM has stopped changing for BROWSER_DOM_QUIET_MS
+(capped at BROWSER_DOM_SETTLE_MAX seconds after DOMContentLoaded).
+
+If Chromium cannot be launched (e.g. `patchright install chromium` was never
+run) the pool reports itself unavailable once and fetch() returns None until the
+pool is closed.
+
+Configured with environment variables:
+- BROWSER_POOL_SIZE: pages rendered concurrently (default 3)
+- BROWSER_NAV_TIMEOUT: seconds allowed for navigation up to DOMContentLoaded (default 30)
+- BROWSER_DOM_QUIET_MS: milliseconds without DOM mutations that count as settled (default 500)
+- BROWSER_DOM_SETTLE_MAX: seconds to wait for the DOM to settle at most (default 5)
+- BROWSER_BLOCKED_RESOURCES: resource types that are not loaded (default image,font,media)
+"""
+
+import asyncio
+import os
 import time
-from patchright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from HTMLContentExtractor import HTMLContentExtractor
-
-def fetch_full_html(url: str, timeout: int = 60000, headless: bool = True) -> str:
-    """
-    Launches a headless Chromium browser, navigates to `url`,
-    waits for the network to be idle, and returns the rendered HTML.
-    """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        ctx = browser.new_context(
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/113.0.0.0 Safari/537.36"
-            ),
+from typing import Any, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "3"))
+BROWSER_NAV_TIMEOUT = float(os.getenv("BROWSER_NAV_TIMEOUT", "30"))
+BROWSER_DOM_QUIET_MS = int(os.getenv("BROWSER_DOM_QUIET_MS", "500"))
+BROWSER_DOM_SETTLE_MAX = float(os.getenv("BROWSER_DOM_SETTLE_MAX", "5"))
+BROWSER_BLOCKED_RESOURCES = set(filter(None, os.getenv("BROWSER_BLOCKED_RESOURCES", "image,font,media").split(",")))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/113.0.0.0 Safari/537.36"
+)
+
+# Resolves once no DOM mutation has been seen for quietMs, or after maxMs at the latest
+WAIT_FOR_DOM_STABLE = """
+([quietMs, maxMs]) => new Promise(resolve => {
+    const started = performance.now();
+    let quiet, deadline;
+    const done = () => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(deadline);
+        resolve(performance.now() - started);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(done, quietMs);
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    quiet = setTimeout(done, quietMs);
+    deadline = setTimeout(done, maxMs);
+})
+"""
+
+
+def write(x):
+    print(x)
+
+
+class BrowserPool:
+    """One long-lived headless Chromium with a bounded pool of reusable pages."""
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, nav_timeout: float = BROWSER_NAV_TIMEOUT,
+                 quiet_ms: int = BROWSER_DOM_QUIET_MS, settle_max: float = BROWSER_DOM_SETTLE_MAX,
+                 blocked_resources: Set[str] = BROWSER_BLOCKED_RESOURCES):
+        self.size = max(1, size)
+        self.nav_timeout = nav_timeout
+        self.quiet_ms = quiet_ms
+        self.settle_max = settle_max
+        self.blocked_resources = blocked_resources
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright = None
+        self._browser = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._contexts: List[Any] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._background: Set[asyncio.Task] = set()
+        self.unavailable: Optional[str] = None
+        self.launches = 0
+        self.fetches = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.replaced = 0
+        self.blocked = 0
+        self.settle_seconds = 0.0
+
+    async def _route(self, route) -> None:
+        if route.request.resource_type in self.blocked_resources:
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_slot(self) -> Tuple[Any, Any]:
+        context = await self._browser.new_context(
+            user_agent=USER_AGENT,
             viewport={"width": 1920, "height": 1080},
             java_script_enabled=True,
         )
-        page = ctx.new_page()
-        page.set_default_navigation_timeout(timeout)
+        if self.blocked_resources:
+            await context.route("**/*", self._route)
+        page = await context.new_page()
+        page.set_default_navigation_timeout(self.nav_timeout * 1000)
+        self._contexts.append(context)
+        return context, page
+
+    async def start(self) -> None:
+        """Launch the browser and open the pages; called automatically by the first fetch()."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Playwright objects belong to the loop that created them; a new loop starts a new pool
+            self._reset()
+            self._loop = loop
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None or self.unavailable:
+                return
+            try:
+                from patchright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self.launches += 1
+                idle = asyncio.Queue()
+                for slot in await asyncio.gather(*[self._new_slot() for _ in range(self.size)]):
+                    idle.put_nowait(slot)
+                self._idle = idle
+                write(f"[browser] Chromium ready with {self.size} pages")
+            except Exception as e:
+                self.unavailable = f"{e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+                write(f"[browser] Browser fallback disabled, Chromium could not be started: {self.unavailable}")
+                await self._shutdown()
+
+    async def _replace(self, slot: Tuple[Any, Any]) -> None:
+        context, _ = slot
+        if context in self._contexts:
+            self._contexts.remove(context)
+        try:
+            await context.close()
+        except Exception:
+            pass
+        if self._idle is None:
+            return
+        self.replaced += 1
         try:
-            # Navigate and wait until network is idle (no more than 0.5s of outstanding requests)
-            page.goto(url, wait_until="networkidle")
-            # Extra buffer for late JS-rendered changes 
-            time.sleep(5)
-            return page.content()
-        except PlaywrightTimeoutError:
-            # On timeout, return whatever has loaded so far
-            return page.content()
-        finally:
-            browser.close()
+            self._idle.put_nowait(await self._new_slot())
+        except Exception as e:
+            # The browser itself is gone; wake every waiter instead of leaving them on an empty pool
+            self.unavailable = f"browser lost: {e.__class__.__name__}"
+            write(f"[browser] Browser fallback disabled, could not open a new page: {e!r}")
+            self._idle.put_nowait(None)
+
+    async def _recycle(self, slot: Tuple[Any, Any]) -> None:
+        """Put a page back in the pool, leaving nothing of the last site running in it."""
+        context, page = slot
+        try:
+            await page.goto("about:blank")
+            await context.clear_cookies()
+        except Exception:
+            await self._replace(slot)
+            return
+        self._idle.put_nowait(slot)
+
+    async def _render(self, page, url: str) -> Optional[str]:
+        from patchright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+        try:
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+            except PlaywrightTimeoutError:
+                # Return whatever has loaded so far
+                self.timeouts += 1
+                return await page.content()
+            started = time.monotonic()
+            try:
+                await page.evaluate(WAIT_FOR_DOM_STABLE, [self.quiet_ms, self.settle_max * 1000])
+            except PlaywrightError:
+                pass  # the page navigated again (client-side redirect); read what is there now
+            self.settle_seconds += time.monotonic() - started
+            return await page.content()
+        except PlaywrightError as e:
+            self.failures += 1
+            write(f"[browser] Could not render {url}: {str(e).splitlines()[0] if str(e) else repr(e)}")
+            return None
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """
+        Render `url` and return its HTML once the DOM has settled.
+
+        Returns whatever had loaded when navigation timed out, or None if the page
+        could not be loaded at all or the browser is unavailable.
+        """
+        await self.start()
+        if self.unavailable:
+            return None
+        slot = await self._idle.get()
+        if slot is None:
+            self._idle.put_nowait(None)
+            return None
+        self.fetches += 1
+        try:
+            html = await self._render(slot[1], url)
+        except BaseException:
+            # Cancelled mid-render: the page may still be busy, so it is replaced in the background
+            task = asyncio.create_task(self._replace(slot))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            raise
+        if slot[1].is_closed():
+            await self._replace(slot)
+        else:
+            await self._recycle(slot)
+        return html
+
+    async def _shutdown(self) -> None:
+        self._idle = None
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts = []
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except Exception:
+            pass
+        self._browser = None
+        self._playwright = None
+
+    def _reset(self) -> None:
+        self._contexts = []
+        self._browser = None
+        self._playwright = None
+        self._idle = None
+        self.unavailable = None
+
+    async def close(self) -> None:
+        """Close the browser; the next fetch() launches a fresh one (and retries if it was unavailable)."""
+        if self._loop is asyncio.get_running_loop():
+            await self._shutdown()
+        self._reset()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._browser is not None,
+            "unavailable": self.unavailable,
+            "pages": len(self._contexts),
+            "idle_pages": self._idle.qsize() if self._idle is not None else 0,
+            "launches": self.launches,
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "replaced": self.replaced,
+            "blocked_requests": self.blocked,
+            "avg_settle_seconds": round(self.settle_seconds / self.fetches, 2) if self.fetches else None,
+        }
+
+
+browser_pool = BrowserPool()
+
+
+async def fetch_full_html(url: str) -> Optional[str]:
+    """Rendered HTML of `url` from the shared browser pool."""
+    return await browser_pool.fetch(url)
+
 
 if __name__ == "__main__":
+    from HTMLContentExtractor import HTMLContentExtractor
+
+    async def demo(url: str) -> None:
+        html = await fetch_full_html(url)
+        await browser_pool.close()
+        print(html)
+        print("Markdown: ")
+        print(HTMLContentExtractor().extract(url, html) if html else None)
+
     URL = "https://www.gjopen.com/questions/4349-before-1-january-2026-will-the-us-senate-pass-reconciliation-legislation-that-includes-a-moratorium-on-state-and-local-enforcement-of-regulations-regarding-artificial-intelligence"
-    html = fetch_full_html(URL)
-    extractor = HTMLContentExtractor()
-    result = extractor.extract(URL, html)
-    print(html)
-    print("Markdown: ")
-    print(result)
\ No newline at end of file
+    asyncio.run(demo(URL))
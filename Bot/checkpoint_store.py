@@ -0,0 +1,245 @@
+"""
+Stage-level checkpoints for interrupted runs.
+
+Every completed pipeline stage (query-generation text, search contexts, step-1 and
+step-2 outputs, parsed and aggregated forecasts) is written to a local SQLite
+file, keyed by question ID and a hash of the question's inputs. A rerun of the
+same question restores those results, runs only the stages that never finished
+(failed forecaster calls included) and skips the Metaculus submissions that
+already went through.
+
+The input hash covers the question text, type, options/scaling, today's date and
+the question's revision, so an edited question, a new day or a re-forecast
+triggered by new research (research_fingerprint) starts from scratch.
+
+The same file keeps each question's research record (the queries and sources
+behind its last forecast, and its revision), which outlives the daily checkpoints.
+
+Configured with environment variables:
+- CHECKPOINTS: set to 0 to disable (default 1)
+- CHECKPOINT_PATH: SQLite file (default .cache/checkpoints.sqlite at the repo root)
+- CHECKPOINT_MAX_AGE_DAYS: checkpoints older than this are pruned (default 3)
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHECKPOINTS = os.getenv("CHECKPOINTS", "1") != "0"
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "checkpoints.sqlite")),
+)
+CHECKPOINT_MAX_AGE_DAYS = float(os.getenv("CHECKPOINT_MAX_AGE_DAYS", "3"))
+
+# Question fields that change what the pipeline would produce
+HASHED_FIELDS = (
+    "title", "type", "description", "resolution_criteria", "fine_print", "options",
+    "scaling", "open_lower_bound", "open_upper_bound", "unit",
+)
+
+
+def write(x):
+    print(x)
+
+
+def input_hash(question_details: Dict[str, Any], pipeline: str, revision: int = 0) -> str:
+    blob = json.dumps(
+        {
+            "pipeline": pipeline,
+            "date": datetime.date.today().isoformat(),
+            "revision": revision,
+            "question": {k: question_details.get(k) for k in HASHED_FIELDS},
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _to_json(value: Any) -> Any:
+    if hasattr(value, "tolist"):  # numpy arrays and scalars
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class QuestionCheckpoint:
+    """Checkpointed stage results and submissions of one question run."""
+
+    def __init__(self, store: "CheckpointStore", question_id: str, key: str):
+        self.store = store
+        self.question_id = question_id
+        self.key = key
+
+    def load(self) -> Dict[str, Any]:
+        """All stage results saved so far."""
+        return self.store.load(self.question_id, self.key)
+
+    def get(self, stage: str) -> Optional[Any]:
+        return self.load().get(stage)
+
+    def save(self, stage: str, result: Any) -> None:
+        self.store.save(self.question_id, self.key, stage, result)
+
+    def submitted(self, kind: str) -> bool:
+        return self.store.submitted(self.question_id, self.key, kind)
+
+    def mark_submitted(self, kind: str) -> None:
+        self.store.mark_submitted(self.question_id, self.key, kind)
+
+
+class CheckpointStore:
+    """SQLite-backed store of stage results and submissions per question run."""
+
+    def __init__(self, path: str = CHECKPOINT_PATH, enabled: bool = CHECKPOINTS,
+                 max_age_days: float = CHECKPOINT_MAX_AGE_DAYS):
+        self.path = path
+        self.enabled = enabled
+        self.max_age = max_age_days * 24 * 3600
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS stages (
+                    question_id TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (question_id, input_hash, stage)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS submissions (
+                    question_id TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (question_id, input_hash, kind)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS research (
+                    question_id TEXT PRIMARY KEY,
+                    revision INTEGER NOT NULL,
+                    payload TEXT,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            cutoff = time.time() - self.max_age
+            self._conn.execute("DELETE FROM stages WHERE created_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM submissions WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+        return self._conn
+
+    def question(self, question_details: Dict[str, Any], pipeline: str) -> QuestionCheckpoint:
+        question_id = str(question_details.get("id"))
+        revision = self._research_row(question_id)[0]
+        return QuestionCheckpoint(self, question_id, input_hash(question_details, pipeline, revision))
+
+    ######################### RESEARCH RECORDS #########################
+
+    def _research_row(self, question_id: str):
+        if not self.enabled:
+            return 0, None
+        with self._lock:
+            row = self._db().execute(
+                "SELECT revision, payload FROM research WHERE question_id = ?", (question_id,)
+            ).fetchone()
+        return row or (0, None)
+
+    def research(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """The research record saved with the question's last full forecast, if any."""
+        payload = self._research_row(str(question_id))[1]
+        return json.loads(payload) if payload else None
+
+    def save_research(self, question_id: str, record: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        question_id = str(question_id)
+        revision = self._research_row(question_id)[0]
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO research VALUES (?, ?, ?, ?)",
+                (question_id, revision, json.dumps(record, ensure_ascii=False), time.time()),
+            )
+            db.commit()
+
+    def new_revision(self, question_id: str) -> None:
+        """Give the question fresh checkpoints, so the next run forecasts it again from scratch."""
+        if not self.enabled:
+            return
+        question_id = str(question_id)
+        revision, payload = self._research_row(question_id)
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO research VALUES (?, ?, ?, ?)",
+                (question_id, revision + 1, payload, time.time()),
+            )
+            db.commit()
+
+    def load(self, question_id: str, key: str) -> Dict[str, Any]:
+        if not self.enabled:
+            return {}
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT stage, payload FROM stages WHERE question_id = ? AND input_hash = ?", (question_id, key)
+            ).fetchall()
+        return {stage: json.loads(payload) for stage, payload in rows}
+
+    def save(self, question_id: str, key: str, stage: str, result: Any) -> None:
+        if not self.enabled:
+            return
+        try:
+            payload = json.dumps(result, ensure_ascii=False, default=_to_json)
+        except (TypeError, ValueError) as e:
+            write(f"[checkpoint] Not saving stage {stage} of question {question_id}: {e}")
+            return
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?)",
+                (question_id, key, stage, payload, time.time()),
+            )
+            db.commit()
+
+    def submitted(self, question_id: str, key: str, kind: str) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            row = self._db().execute(
+                "SELECT 1 FROM submissions WHERE question_id = ? AND input_hash = ? AND kind = ?",
+                (question_id, key, kind),
+            ).fetchone()
+        return row is not None
+
+    def mark_submitted(self, question_id: str, key: str, kind: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?)",
+                (question_id, key, kind, time.time()),
+            )
+            db.commit()
+
+
+checkpoint_store = CheckpointStore()
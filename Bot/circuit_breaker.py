@@ -0,0 +1,164 @@
+"""
+Circuit breakers for LLM providers and models.
+
+Each (provider, model) pair gets a breaker that llm_client consults before every
+attempt and feeds with the attempt's outcome:
+
+- closed    - calls flow normally; consecutive health failures are counted
+- open      - after CIRCUIT_FAILURE_THRESHOLD consecutive failures calls fail fast
+              with LLMCircuitOpenError (callers may reroute to a substitute model)
+- half-open - once the cool-down has passed, a single probe call is let through
+              while other calls wait for its verdict; success closes the breaker,
+              failure re-opens it with a doubled cool-down
+
+Only failures that say something about the provider's health count: timeouts,
+5xx/overloaded, dropped connections, empty answers. A 400 means the provider is up.
+
+Configured with environment variables:
+- CIRCUIT_BREAKERS: set to 0 to disable (default 1)
+- CIRCUIT_FAILURE_THRESHOLD: consecutive failures that open a breaker (default 5)
+- CIRCUIT_COOLDOWN: seconds an open breaker waits before probing (default 60)
+- CIRCUIT_MAX_COOLDOWN: cap on the doubled cool-down (default 600)
+"""
+
+import os
+import time
+from typing import Dict, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CIRCUIT_BREAKERS = os.getenv("CIRCUIT_BREAKERS", "1") != "0"
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "60"))
+CIRCUIT_MAX_COOLDOWN = float(os.getenv("CIRCUIT_MAX_COOLDOWN", "600"))
+# Seconds between checks while waiting on another call's half-open probe
+CIRCUIT_PROBE_POLL = 0.5
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+def write(x):
+    print(x)
+
+
+class CircuitBreaker:
+    """Breaker state for one (provider, model) pair."""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = CIRCUIT_COOLDOWN
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.failures = 0
+        self.successes = 0
+        self.rejected = 0
+
+    def _transition(self, state: str, reason: str) -> None:
+        if state != self.state:
+            write(f"[circuit] {self.provider} {self.model}: {self.state} -> {state} ({reason})")
+        self.state = state
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker will let a probe through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Whether an attempt may be sent now. In half-open state only one probe is
+        allowed at a time; the caller must report its outcome.
+        """
+        if self.state == OPEN and self.retry_in() == 0:
+            self._transition(HALF_OPEN, "cool-down over, probing")
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        if self.state == OPEN:
+            self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != CLOSED:
+            self.cooldown = CIRCUIT_COOLDOWN
+            self._transition(CLOSED, "probe succeeded")
+
+    def record_failure(self, reason: str = "") -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self.cooldown = min(CIRCUIT_MAX_COOLDOWN, self.cooldown * 2)
+            self.opened_at = time.monotonic()
+            self._transition(OPEN, f"probe failed, retrying in {self.cooldown:.0f}s: {reason}")
+        elif self.state == CLOSED and self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self.opened_at = time.monotonic()
+            self._transition(OPEN, f"{self.consecutive_failures} consecutive failures: {reason}")
+
+    def release(self) -> None:
+        """The probe was cancelled before it produced an outcome; let another one through."""
+        self.probe_in_flight = False
+
+
+class CircuitBreakers:
+    """Registry of CircuitBreakers keyed by (provider, model)."""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.enabled = CIRCUIT_BREAKERS
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = (provider, model)
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(provider, model)
+        return self._breakers[key]
+
+    def allow(self, provider: str, model: str) -> bool:
+        return not self.enabled or self.get(provider, model).allow()
+
+    def is_open(self, provider: str, model: str) -> bool:
+        """True while calls to this pair would be rejected without probing."""
+        if not self.enabled:
+            return False
+        breaker = self._breakers.get((provider, model))
+        return breaker is not None and breaker.state == OPEN and breaker.retry_in() > 0
+
+    def record_success(self, provider: str, model: str) -> None:
+        if self.enabled:
+            self.get(provider, model).record_success()
+
+    def record_failure(self, provider: str, model: str, reason: str = "") -> None:
+        if self.enabled:
+            self.get(provider, model).record_failure(reason)
+
+    def release(self, provider: str, model: str) -> None:
+        if self.enabled:
+            self.get(provider, model).release()
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """Current state and counters per provider/model, for logging."""
+        return {
+            f"{b.provider}:{b.model}": {
+                "state": b.state,
+                "failures": b.failures,
+                "successes": b.successes,
+                "rejected": b.rejected,
+                "retry_in": round(b.retry_in(), 1),
+            }
+            for b in self._breakers.values()
+        }
+
+
+circuit_breakers = CircuitBreakers()
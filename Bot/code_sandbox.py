@@ -0,0 +1,87 @@
+"""
+Isolated execution of model-written Python for llm_calls.extract_and_run_python_code.
+
+Nothing in the forecast pipelines runs model code at the moment: no
+*_PROMPT_MONTE_CARLO prompt is used by a forecaster, and extract_and_run_python_code
+has no callers. The module is kept for when a simulation-based forecaster is added;
+it starts nothing until it is called.
+
+Each call runs the code in a fresh `python -I` subprocess (the event loop stays
+free, and a crash or hang cannot take the bot down) with CPU-time, wall-clock and
+memory limits, and returns what it printed, truncated to SANDBOX_MAX_OUTPUT
+characters.
+
+Configured with environment variables:
+- SANDBOX_CPU_SECONDS: CPU seconds per run (default 60)
+- SANDBOX_WALL_SECONDS: wall-clock seconds per run (default 90)
+- SANDBOX_MEMORY_MB: address-space limit in MB (default 2048, 0 disables)
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SANDBOX_CPU_SECONDS = float(os.getenv("SANDBOX_CPU_SECONDS", "60"))
+SANDBOX_WALL_SECONDS = float(os.getenv("SANDBOX_WALL_SECONDS", "90"))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))
+SANDBOX_MAX_OUTPUT = 20000
+
+
+@dataclass
+class SandboxResult:
+    output: str
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _limit_resources(cpu_seconds: float, memory_mb: int) -> None:
+    # Runs in the child between fork and exec
+    import resource
+
+    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_seconds) + 1, resource.RLIM_INFINITY))
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+async def run_python(code: str, cpu_seconds: float = SANDBOX_CPU_SECONDS,
+                     wall_seconds: float = SANDBOX_WALL_SECONDS,
+                     memory_mb: int = SANDBOX_MEMORY_MB) -> SandboxResult:
+    """Execute `code` in its own interpreter and return whatever it printed."""
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-I", "-",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        preexec_fn=lambda: _limit_resources(cpu_seconds, memory_mb),
+    )
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(code.encode("utf-8")), wall_seconds)
+    except BaseException as e:
+        # Timed out or cancelled: the interpreter must not outlive the call
+        process.kill()
+        await process.wait()
+        if isinstance(e, asyncio.TimeoutError):
+            return SandboxResult("", "wall-clock limit exceeded", time.monotonic() - started)
+        raise
+
+    text = output.decode("utf-8", errors="replace")[:SANDBOX_MAX_OUTPUT]
+    error = None
+    if process.returncode == -signal.SIGXCPU:
+        error = "CPU time limit exceeded"
+    elif process.returncode != 0:
+        error = text or f"exited with status {process.returncode}"
+    return SandboxResult(output=text, error=error, elapsed=time.monotonic() - started)
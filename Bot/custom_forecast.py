@@ -27,6 +27,7 @@ from typing import Dict, Any, List, Union
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from forecaster import binary_forecast, numeric_forecast, multiple_choice_forecast
+from http_sessions import close_sessions
 
 def create_question_structure(
     question_type: str,
@@ -245,6 +246,8 @@ async def forecast_custom_question(question_params: Dict[str, Any]) -> None:
             print(f"ERROR: {error_msg}")
             write_to_file(f"\nERROR: {error_msg}")
             raise
+        finally:
+            await close_sessions()
     
     print(f"\nForecast completed! Results saved to: {output_path}")
 
@@ -0,0 +1,192 @@
+"""
+Resident service mode for the bot (python main.py --daemon).
+
+Instead of a cold start every hour, one process keeps running and forecasts the
+tournament once per interval on the same event loop, so everything that is
+expensive to build stays warm between cycles: pooled HTTP sessions, the
+extraction worker processes, the headless browser, the Metaculus client's ETag
+cache, the checkpoint database, and circuit breaker and rate limiter state.
+
+A local status endpoint reports what the daemon is doing:
+
+    GET /status   JSON: state, cycle counts and timings, last error, the running
+                  cycle's scheduler progress and the stats of the shared pools
+    GET /healthz  200 while the daemon loop is alive
+
+The first SIGINT/SIGTERM lets the running cycle finish its questions in flight
+(queued ones do not start) and then exits; a second one cancels the questions in
+flight.
+
+Configured with environment variables:
+- DAEMON_INTERVAL_MINUTES: minutes between the starts of two cycles (default 60)
+- DAEMON_STATUS_HOST: status endpoint host (default 127.0.0.1)
+- DAEMON_STATUS_PORT: status endpoint port (default 8787, 0 disables it)
+"""
+
+import asyncio
+import functools
+import json
+import os
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from question_scheduler import QuestionScheduler, add_stop_signal_handlers
+
+load_dotenv()
+
+DAEMON_INTERVAL_MINUTES = float(os.getenv("DAEMON_INTERVAL_MINUTES", "60"))
+DAEMON_STATUS_HOST = os.getenv("DAEMON_STATUS_HOST", "127.0.0.1")
+DAEMON_STATUS_PORT = int(os.getenv("DAEMON_STATUS_PORT", "8787"))
+
+
+def write(x):
+    print(x)
+
+
+class BotDaemon:
+    """Runs forecasting cycles on a fixed interval in one long-lived event loop."""
+
+    def __init__(
+        self,
+        cycle: Callable[[QuestionScheduler], Awaitable[Any]],
+        warm_up: Optional[List[Callable[[], Awaitable[Any]]]] = None,
+        shutdown: Optional[List[Callable[[], Awaitable[Any]]]] = None,
+        stats: Optional[Dict[str, Callable[[], Any]]] = None,
+        interval_minutes: float = DAEMON_INTERVAL_MINUTES,
+        status_host: str = DAEMON_STATUS_HOST,
+        status_port: int = DAEMON_STATUS_PORT,
+    ):
+        """
+        Args:
+            cycle: Forecasts the tournament once, using the scheduler it is given.
+            warm_up: Coroutine functions run once at start-up (e.g. starting worker pools).
+            shutdown: Coroutine functions run once on exit (closing the shared pools).
+            stats: name -> function returning that component's stats for /status.
+        """
+        self.cycle = cycle
+        self.warm_up = warm_up or []
+        self.shutdown = shutdown or []
+        self.stats = stats or {}
+        self.interval = interval_minutes * 60
+        self.status_host = status_host
+        self.status_port = status_port
+        self.state = "starting"
+        self.started_at = time.time()
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.last_cycle: Dict[str, Any] = {}
+        self.next_cycle_at: Optional[float] = None
+        self.scheduler: Optional[QuestionScheduler] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def stop(self) -> None:
+        """First call: finish the running cycle's questions in flight, then exit. Second call: cancel them."""
+        if self._stop.is_set():
+            if self.scheduler:
+                self.scheduler.cancel()
+            return
+        write("[daemon] Stopping after the questions in flight")
+        self._stop.set()
+        if self.scheduler:
+            self.scheduler.drain()
+
+    ######################### STATUS ENDPOINT #########################
+
+    def status(self) -> Dict[str, Any]:
+        components = {}
+        for name, stats in self.stats.items():
+            try:
+                components[name] = stats()
+            except Exception as e:
+                components[name] = {"error": repr(e)}
+        return {
+            "state": self.state,
+            "uptime": round(time.time() - self.started_at, 1),
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "last_cycle": self.last_cycle,
+            "next_cycle_in": round(self.next_cycle_at - time.time(), 1) if self.next_cycle_at else None,
+            "scheduler": self.scheduler.stats() if self.scheduler else None,
+            "components": components,
+        }
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status(), dumps=functools.partial(json.dumps, default=str))
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"ok": True, "state": self.state})
+
+    async def _start_status_server(self) -> Optional[web.AppRunner]:
+        if self.status_port <= 0:
+            return None
+        app = web.Application()
+        app.router.add_get("/status", self._handle_status)
+        app.router.add_get("/healthz", self._handle_health)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.status_host, self.status_port).start()
+        write(f"[daemon] Status endpoint on http://{self.status_host}:{self.status_port}/status")
+        return runner
+
+    ######################### MAIN LOOP #########################
+
+    async def _run_cycle(self) -> None:
+        self.state = "forecasting"
+        self.scheduler = QuestionScheduler()
+        started = time.time()
+        error = None
+        write(f"[daemon] Cycle {self.cycles + 1} started")
+        try:
+            await self.cycle(self.scheduler)
+        except Exception as e:
+            # A failed cycle (e.g. some questions errored) must not stop the daemon
+            error = f"{e.__class__.__name__}: {e}"
+            self.failed_cycles += 1
+            write(f"[daemon] Cycle {self.cycles + 1} failed: {error}\n{traceback.format_exc()}")
+        self.cycles += 1
+        self.last_cycle = {
+            "started": started,
+            "duration": round(time.time() - started, 1),
+            "questions": self.scheduler.stats(),
+            "error": error,
+        }
+        self.scheduler = None
+        write(f"[daemon] Cycle {self.cycles} finished in {self.last_cycle['duration']}s")
+
+    async def run(self) -> None:
+        """Run cycles until stopped by a signal."""
+        self._stop = asyncio.Event()
+        remove_signal_handlers = add_stop_signal_handlers(self.stop)
+        runner = await self._start_status_server()
+        try:
+            for warm_up in self.warm_up:
+                await warm_up()
+            while not self._stop.is_set():
+                cycle_start = time.monotonic()
+                await self._run_cycle()
+                if self._stop.is_set():
+                    break
+                delay = max(0.0, self.interval - (time.monotonic() - cycle_start))
+                self.state = "idle"
+                self.next_cycle_at = time.time() + delay
+                write(f"[daemon] Next cycle in {delay / 60:.1f} minutes")
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self.next_cycle_at = None
+        finally:
+            self.state = "stopping"
+            remove_signal_handlers()
+            for shutdown in self.shutdown:
+                try:
+                    await shutdown()
+                except Exception as e:
+                    write(f"[daemon] Shutdown step failed: {e!r}")
+            if runner:
+                await runner.cleanup()
+            write("[daemon] Stopped")
@@ -0,0 +1,50 @@
+"""
+Base URLs of every external service the bot talks to.
+
+Each one can be overridden with its own environment variable. Setting
+MOCK_SERVER_URL (e.g. http://127.0.0.1:8900, see mock_server.py) points all of
+them at the local record/replay server at once, so the whole pipeline can run
+without network access or API keys.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MOCK_SERVER_URL = os.getenv("MOCK_SERVER_URL", "").rstrip("/")
+
+
+def _endpoint(env_var: str, default: str, mock_path: str) -> str:
+    override = os.getenv(env_var)
+    if override:
+        return override.rstrip("/")
+    if MOCK_SERVER_URL:
+        return MOCK_SERVER_URL + mock_path
+    return default
+
+
+# (environment variable, real base URL, path prefix on the mock server)
+SERVICES = {
+    "metaculus": ("METACULUS_API_BASE_URL", "https://www.metaculus.com/api", "/metaculus/api"),
+    "metaculus-proxy": ("METACULUS_PROXY_BASE_URL", "https://llm-proxy.metaculus.com/proxy", "/metaculus-proxy"),
+    "openrouter": ("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1", "/openrouter/api/v1"),
+    # Same variable the OpenAI SDK reads on its own
+    "openai": ("OPENAI_BASE_URL", "https://api.openai.com/v1", "/openai/v1"),
+    "serper": ("SERPER_BASE_URL", "https://google.serper.dev", "/serper"),
+    "perplexity": ("PERPLEXITY_BASE_URL", "https://api.perplexity.ai", "/perplexity"),
+    "brightdata": ("BRIGHT_DATA_API_URL", "https://api.brightdata.com/request", "/brightdata/request"),
+    "asknews": ("ASKNEWS_BASE_URL", "https://api.asknews.app", "/asknews"),
+    "asknews-auth": ("ASKNEWS_TOKEN_URL", "https://auth.asknews.app/oauth2/token", "/asknews-auth/oauth2/token"),
+}
+
+METACULUS_API_BASE_URL = _endpoint(*SERVICES["metaculus"])
+METACULUS_PROXY_BASE_URL = _endpoint(*SERVICES["metaculus-proxy"])
+OPENROUTER_BASE_URL = _endpoint(*SERVICES["openrouter"])
+OPENAI_BASE_URL = _endpoint(*SERVICES["openai"])
+SERPER_BASE_URL = _endpoint(*SERVICES["serper"])
+PERPLEXITY_BASE_URL = _endpoint(*SERVICES["perplexity"])
+BRIGHT_DATA_API_URL = _endpoint(*SERVICES["brightdata"])
+ASKNEWS_BASE_URL = _endpoint(*SERVICES["asknews"])
+ASKNEWS_TOKEN_URL = _endpoint(*SERVICES["asknews-auth"])
@@ -0,0 +1,290 @@
+"""
+Page content extraction in a pool of worker processes.
+
+HTMLContentExtractor.extract is pure CPU work (lxml parsing plus trafilatura,
+readability and boilerpy3) taking tens to hundreds of milliseconds per page; run
+on the event loop it stalls every other LLM and HTTP call in the process. Pages
+are instead sent to pre-warmed worker processes that import the extraction stack
+once at start, so the pages of all queries are extracted in parallel on separate
+cores while the event loop keeps serving requests.
+
+Each worker extracts one page at a time. When every worker is busy, extract()
+waits for a free one, so a burst of scraped pages queues up in front of the pool
+instead of piling CPU work onto the loop. A page that takes longer than
+EXTRACTION_TIMEOUT gets its worker killed and replaced. If the workers cannot be
+started, pages are extracted in a thread of this process instead.
+
+Every page reports which of HTMLContentExtractor's strategies ran, how long each
+took and which one was selected; stats() sums these up per strategy (runs,
+average time, wins, win rate) so EXTRACTION_STRATEGIES can be ordered by data.
+
+Configured with environment variables:
+- EXTRACTION_WORKERS: worker processes (default: number of CPUs)
+- EXTRACTION_TIMEOUT: seconds one page may take (default 30)
+"""
+
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+
+
+def write(x):
+    print(x)
+
+
+class ExtractionError(RuntimeError):
+    """Extraction of a page failed in its worker or ran out of time."""
+
+
+class StrategyStats:
+    """Per-strategy run time and win counts, summed from HTMLContentExtractor's page reports."""
+
+    def __init__(self):
+        self.pages = 0
+        self.early_exits = 0
+        self.fallbacks = 0
+        self.runs: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.wins: Dict[str, int] = {}
+
+    def record(self, report: Dict) -> None:
+        self.pages += 1
+        self.early_exits += report["early_exit"]
+        for label, seconds in report["strategies"].items():
+            self.runs[label] = self.runs.get(label, 0) + 1
+            self.seconds[label] = self.seconds.get(label, 0.0) + seconds
+        if report["selected"] == "fallback":
+            self.fallbacks += 1
+        elif report["selected"]:
+            self.wins[report["selected"]] = self.wins.get(report["selected"], 0) + 1
+
+    def summary(self) -> dict:
+        return {
+            "pages": self.pages,
+            "early_exits": self.early_exits,
+            "fallbacks": self.fallbacks,
+            "strategies": {
+                label: {
+                    "runs": runs,
+                    "avg_ms": round(1000 * self.seconds[label] / runs, 1),
+                    "wins": self.wins.get(label, 0),
+                    "win_rate": round(self.wins.get(label, 0) / runs, 2),
+                }
+                for label, runs in self.runs.items()
+            },
+        }
+
+
+######################### WORKER PROCESS #########################
+
+def _worker_main(conn) -> None:
+    # Ctrl-C is handled by the parent (drain/cancel), not by the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from HTMLContentExtractor import HTMLContentExtractor  # pre-import so pages don't pay for it
+
+    extractor = HTMLContentExtractor()
+    conn.send("ready")
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        url, html, mode = job
+
+        # The extractor's debug prints go back to the parent with the result
+        output = io.StringIO()
+        content, report, error = None, None, None
+        try:
+            with contextlib.redirect_stdout(output):
+                content, report = extractor.extract_with_report(url, html, mode)
+        except BaseException:
+            error = traceback.format_exc()
+        conn.send((content, report, error, output.getvalue()))
+
+
+######################### POOL #########################
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            return self.conn.poll(timeout) and self.conn.recv() == "ready"
+        except EOFError:
+            return False
+
+    def exchange(self, job: tuple, timeout: float) -> Optional[tuple]:
+        """Send a job and wait for its answer; None if none came in time. Blocks, so it runs in a thread."""
+        # Pickling and writing a multi-MB page is as much blocking work as the read
+        self.conn.send(job)
+        return self.conn.recv() if self.conn.poll(timeout) else None
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Pool of pre-warmed worker processes running HTMLContentExtractor.extract."""
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, timeout: float = EXTRACTION_TIMEOUT):
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._local = None
+        self.unavailable: Optional[str] = None
+        self.pages = 0
+        self.failures = 0
+        self.replaced = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.busy_seconds = 0.0
+        self.strategies = StrategyStats()
+
+    async def _spawn(self) -> _Worker:
+        worker = _Worker(self._context)
+        if not await asyncio.to_thread(worker.wait_ready, 60):
+            worker.kill()
+            raise RuntimeError("Extraction worker failed to start")
+        self._workers.append(worker)
+        return worker
+
+    async def start(self) -> None:
+        """Start and warm up all workers; called automatically by the first extract()."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is not None or self.unavailable:
+                return
+            try:
+                idle = asyncio.Queue()
+                for worker in await asyncio.gather(*[self._spawn() for _ in range(self.size)]):
+                    idle.put_nowait(worker)
+            except Exception as e:
+                self.unavailable = f"{e.__class__.__name__}: {str(e).strip().splitlines()[0] if str(e).strip() else ''}"
+                write(f"[extraction] Worker processes unavailable ({self.unavailable}), extracting in threads instead")
+                for worker in self._workers:
+                    worker.kill()
+                self._workers = []
+                return
+            self._idle = idle
+            write(f"[extraction] {self.size} workers ready")
+
+    async def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        self._workers.remove(worker)
+        self.replaced += 1
+        self._idle.put_nowait(await self._spawn())
+
+    async def _extract_in_thread(self, url: str, html: str, mode: Optional[str]) -> Optional[str]:
+        if self._local is None:
+            from HTMLContentExtractor import HTMLContentExtractor
+
+            self._local = HTMLContentExtractor()
+        content, report = await asyncio.to_thread(self._local.extract_with_report, url, html, mode)
+        self.strategies.record(report)
+        return content
+
+    async def extract(self, url: str, html: str, mode: Optional[str] = None) -> Optional[str]:
+        """
+        Extracted article text of a page (HTMLContentExtractor.extract), computed in a worker process.
+
+        `mode` is HTMLContentExtractor's extraction mode ("tiered", "fast" or "full");
+        None uses EXTRACTION_MODE.
+        """
+        await self.start()
+        self.pages += 1
+        if self.unavailable:
+            return await self._extract_in_thread(url, html, mode)
+
+        # Backpressure: wait here while every worker is busy
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            worker = await self._idle.get()
+        finally:
+            self.waiting -= 1
+
+        started = time.monotonic()
+        try:
+            answer = await asyncio.to_thread(worker.exchange, (url, html, mode), self.timeout)
+            answered = answer is not None
+            content, report, error, output = answer if answered else (None, None, None, "")
+        except (EOFError, OSError) as e:
+            answered, content, report, error, output = False, None, None, f"extraction worker died: {e!r}", ""
+        except BaseException:
+            # Cancelled mid-page: the worker may still be busy, so it is not reused
+            await self._replace(worker)
+            raise
+        finally:
+            self.busy_seconds += time.monotonic() - started
+
+        if answered:
+            self._idle.put_nowait(worker)
+        else:
+            await self._replace(worker)
+            error = error or f"extraction took longer than {self.timeout:.0f}s"
+        if output:
+            write(output.rstrip())
+        if report:
+            self.strategies.record(report)
+        if error:
+            self.failures += 1
+            raise ExtractionError(f"{url}: {error}")
+        return content
+
+    async def close(self) -> None:
+        """Stop all workers; the next extract() starts a fresh pool."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            await asyncio.to_thread(worker.process.join, 2)
+            worker.kill()
+        self._workers = []
+        self._idle = None
+        self._start_lock = None
+        self.unavailable = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "unavailable": self.unavailable,
+            "pages": self.pages,
+            "failures": self.failures,
+            "replaced": self.replaced,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "busy_seconds": round(self.busy_seconds, 1),
+            "strategies": self.strategies.summary(),
+        }
+
+
+extraction_pool = ExtractionPool()
@@ -4,14 +4,12 @@ import numpy as np
 from numeric import get_numeric_forecast
 from binary import get_binary_forecast
 import os
-import requests
 from aiohttp import ClientSession, ClientTimeout, ClientError
 import json
 import sys
 import re
 import io
 from multiple_choice import get_multiple_choice_forecast
-from asknews_sdk import AskNewsSDK
 from prompts import context
 from dotenv import load_dotenv
 import aiohttp
@@ -2,11 +2,11 @@ import datetime
 import re
 import numpy as np
 import os
-from aiohttp import ClientSession, ClientTimeout
 import dotenv
 from search import call_asknews, call_perplexity
 from llm_calls import call_claude, call_claude_with_fallback, call_gpt_o4_mini_with_fallback, call_forecaster_1, call_forecaster_2, call_forecaster_3, call_forecaster_4, call_forecaster_5
-from openai import OpenAI
+from http_sessions import get_openai_client
+from llm_client import llm_client, LLMRequest, METACULUS_OPENAI
 import asyncio
 
 def write(x):
@@ -20,8 +20,6 @@ ASKNEWS_SECRET = os.getenv("ASKNEWS_SECRET")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 NUM_RUNS = 5
 
 BINARY_PROMPT_TEMPLATE = """
@@ -111,8 +109,8 @@ async def run_research(question: str, write=print) -> str:
 
 # Calls o4-mini using personal OpenAI credentials
 async def call_llm(prompt):
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.responses.create(
+    client = get_openai_client()
+    response = await client.responses.create(
         model="o4-mini",
         input= prompt
     )
@@ -121,38 +119,9 @@ async def call_llm(prompt):
 
 async def call_gpt(prompt):
     # We are temporarily going to short gpt while my o1 credits are out
-    prompt = prompt
-    try:
-        url = "https://llm-proxy.metaculus.com/proxy/openai/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {METACULUS_TOKEN}"
-        }
-        
-        data = {
-            "model": "o1",
-            "messages": [{"role": "user", "content": prompt}],
-        }
-        
-        timeout = ClientTimeout(total=300)  # 5 minutes total timeout
-        
-        async with ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    write(f"API error (status {response.status}): {error_text}")
-                    response.raise_for_status()
-                
-                result = await response.json()
-                
-                answer = result['choices'][0]['message']['content']
-                if answer is None:
-                    raise ValueError("No answer returned from GPT")
-                return answer
-                
-    except Exception as e:
-        write(f"Error in call_gpt: {str(e)}")
-        return f"Error generating response: {str(e)}"
+    request = LLMRequest(model="o1", prompt=prompt)
+    response = await llm_client.complete(METACULUS_OPENAI, request)
+    return response.text
 
 
 def extract_binary_probability(text: str) -> float:
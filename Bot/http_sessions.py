@@ -0,0 +1,149 @@
+"""
+Process-wide pooled HTTP sessions.
+
+Every provider call goes through a shared aiohttp session keyed by host, so the
+TCP + TLS handshake is paid once per provider instead of once per request (and
+once per retry). Each host gets its own keep-alive connection pool with DNS
+caching. Sessions are bound to the running event loop and are rebuilt
+transparently if the loop changes (e.g. several asyncio.run calls in one process).
+
+The same registry owns the shared AsyncOpenAI client used for personal-key OpenAI
+calls, so those never block the event loop and share one connection pool too. The
+openai SDK is only imported when that client is first needed (it is the slowest
+import of the bot).
+
+Pool settings can be overridden with environment variables:
+- HTTP_POOL_LIMIT_PER_HOST: max open connections per provider host (0 = unlimited)
+- HTTP_DNS_CACHE_TTL: seconds to cache DNS lookups
+- HTTP_KEEPALIVE_TIMEOUT: seconds an idle connection is kept open
+- HTTP_CONNECT_TIMEOUT: seconds allowed to establish a new connection
+"""
+
+import asyncio
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from dotenv import load_dotenv
+
+from endpoints import OPENAI_BASE_URL
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+load_dotenv()
+
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "50"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "30"))
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# host -> (event loop the session belongs to, session)
+_sessions: Dict[str, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+_openai_client: Optional[Tuple[asyncio.AbstractEventLoop, "AsyncOpenAI"]] = None
+# host -> {"created": sessions built, "reused": get_session calls served by an existing session}
+_session_counts: Dict[str, Dict[str, int]] = {}
+
+
+def _host_of(url: str) -> str:
+    parsed = urlparse(url)
+    return parsed.netloc or url
+
+
+def get_session(url: str) -> aiohttp.ClientSession:
+    """
+    Get the shared session for the host of `url`, creating it on first use.
+
+    Must be called from inside a running event loop. Callers should pass a
+    per-request `timeout=` to `session.post/get`; the session itself only
+    bounds connection setup.
+
+    Args:
+        url: Full request URL (or bare host) the session will be used for
+
+    Returns:
+        A pooled aiohttp.ClientSession for that host
+    """
+    loop = asyncio.get_running_loop()
+    host = _host_of(url)
+    counts = _session_counts.setdefault(host, {"created": 0, "reused": 0})
+
+    entry = _sessions.get(host)
+    if entry is not None:
+        session_loop, session = entry
+        if session_loop is loop and not session.closed:
+            counts["reused"] += 1
+            return session
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT_PER_HOST,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=HTTP_CONNECT_TIMEOUT),
+    )
+    _sessions[host] = (loop, session)
+    counts["created"] += 1
+    return session
+
+
+def get_openai_client() -> "AsyncOpenAI":
+    """
+    Get the shared AsyncOpenAI client for the running event loop.
+
+    Returns:
+        An AsyncOpenAI client using the personal OPENAI_API_KEY
+    """
+    global _openai_client
+    loop = asyncio.get_running_loop()
+    if _openai_client is not None:
+        client_loop, client = _openai_client
+        if client_loop is loop:
+            return client
+
+    from openai import AsyncOpenAI
+
+    # Keeps the SDK's retries for direct callers (call_gpt, call_llm); llm_client turns them off
+    # per request with with_options(max_retries=0), since its backoff engine retries instead
+    client = AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+    _openai_client = (loop, client)
+    return client
+
+
+async def close_sessions() -> None:
+    """Close every session owned by the running event loop. Safe to call more than once."""
+    global _openai_client
+    loop = asyncio.get_running_loop()
+    if _openai_client is not None:
+        client_loop, client = _openai_client
+        if client_loop is loop:
+            await client.close()
+        _openai_client = None
+
+    for host, (session_loop, session) in list(_sessions.items()):
+        if session_loop is not loop:
+            # Sessions from a finished loop cannot be closed from here; just drop them.
+            if session_loop.is_closed():
+                del _sessions[host]
+            continue
+        if not session.closed:
+            await session.close()
+        del _sessions[host]
+
+
+def session_stats() -> Dict[str, Dict[str, int]]:
+    """Connection limit, open state and session reuse per host, for logging."""
+    stats = {}
+    for host, (_, session) in _sessions.items():
+        connector = session.connector
+        stats[host] = {
+            "open": int(not session.closed),
+            "limit": connector.limit if connector is not None else 0,
+            **_session_counts.get(host, {}),
+        }
+    return stats
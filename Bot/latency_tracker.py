@@ -0,0 +1,72 @@
+"""
+Observed LLM call latencies per provider/model.
+
+llm_client records how long every successful call took (including its retries).
+Hedged calls use these distributions to decide when the primary provider is
+"slow": if it has not answered by the configured percentile of its own recent
+latencies, the same request is also sent to the fallback provider.
+
+Configured with environment variables:
+- LLM_HEDGE_PERCENTILE: latency percentile after which a call is hedged (default 90)
+- LLM_HEDGE_DEFAULT_DELAY: hedge delay in seconds until enough samples exist (default 120)
+- LLM_HEDGE_MIN_DELAY: never hedge sooner than this many seconds (default 5)
+- LLM_HEDGE_MIN_SAMPLES: samples needed before the percentile is trusted (default 5)
+- LLM_LATENCY_WINDOW: number of recent samples kept per provider/model (default 200)
+"""
+
+import os
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "120"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "5"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "5"))
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies keyed by (provider, model)."""
+
+    def __init__(self, window: int = LLM_LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def record(self, provider: str, model: str, seconds: float) -> None:
+        key = (provider, model)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self.window)
+        self._samples[key].append(seconds)
+
+    def percentile(self, provider: str, model: str, q: float) -> Optional[float]:
+        """The q-th percentile latency in seconds, or None with too few samples."""
+        samples = self._samples.get((provider, model))
+        if not samples or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return float(np.percentile(samples, q))
+
+    def hedge_delay(self, provider: str, model: str) -> float:
+        """Seconds to wait on the primary before also sending the request to the fallback."""
+        observed = self.percentile(provider, model, LLM_HEDGE_PERCENTILE)
+        if observed is None:
+            return LLM_HEDGE_DEFAULT_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, observed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Sample count and p50/p90 per provider/model, for logging."""
+        return {
+            f"{provider}:{model}": {
+                "n": len(samples),
+                "p50": round(float(np.percentile(samples, 50)), 1),
+                "p90": round(float(np.percentile(samples, 90)), 1),
+            }
+            for (provider, model), samples in self._samples.items()
+        }
+
+
+latency_tracker = LatencyTracker()
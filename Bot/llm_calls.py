@@ -1,17 +1,29 @@
 import asyncio
 import numpy as np
 import os
-from aiohttp import ClientSession, ClientTimeout, ClientError
 import json
-import sys
-from openai import OpenAI
 import re
-import io
+from dataclasses import replace
 from dotenv import load_dotenv
 from prompts import claude_context, gpt_context
-from model_config import get_forecaster_model
+from model_config import get_forecaster_model, get_substitute_model
+from code_sandbox import run_python
+from llm_client import (
+    llm_client,
+    LLMError,
+    LLMCircuitOpenError,
+    LLMRequest,
+    METACULUS_ANTHROPIC,
+    METACULUS_OPENAI,
+    OPENROUTER,
+    OPENAI,
+)
 """
 This file contains the main forecasting logic, question-type specific functions are abstracted.
+
+Every call_* function is a thin wrapper over llm_client: they pick the provider adapter,
+model and prompt layout, and let the shared retry engine handle timeouts and backoff.
+Failures are raised as llm_client.LLMError subclasses.
 """
 def write(x):
     print(x)
@@ -23,106 +35,57 @@ METACULUS_TOKEN = os.getenv("METACULUS_TOKEN")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-async def call_anthropic_api(prompt, max_tokens=16000, max_retries=7, cached_content=claude_context):
-    url = "https://llm-proxy.metaculus.com/proxy/anthropic/v1/messages/"
-    headers = {
-        "Authorization": f"Token {METACULUS_TOKEN}",
-        "anthropic-version": "2023-06-01",
-        "Content-Type": "application/json",
-        "anthropic-metadata": json.dumps({
-            "task_type": "qualitative_forecasting",
-            "emphasis": "detailed_reasoning"
-        })
-    }
-    
-    data = {
-        "model": "claude-sonnet-4-20250514",
-        "max_tokens": max_tokens,
-        "thinking" : {
-            "type": "enabled",
-            "budget_tokens": 12000
-        },
-        "system": [
-            {
-                "type": "text",
-                "text": cached_content,
-                "cache_control": {"type": "ephemeral"}
-            }
-        ],
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
+def cacheable_prefix(prompt, shared_context):
+    """
+    The leading part of `prompt` up to and including `shared_context`, e.g. the research block
+    every forecaster receives. Providers can cache it across the fan-out; None if it is absent.
+    """
+    if not shared_context:
+        return None
+    end = prompt.find(shared_context)
+    if end == -1:
+        return None
+    return prompt[:end + len(shared_context)]
+
+
+def _anthropic_request(prompt, max_tokens=16000, cached_content=claude_context, answer_ready=None,
+                       shared_context=None):
+    return LLMRequest(
+        model="claude-sonnet-4-20250514",
+        prompt=prompt,
+        system=cached_content,
+        max_tokens=max_tokens,
+        extra={
+            "thinking": {
+                "type": "enabled",
+                "budget_tokens": 12000
             }
-        ]
-    }
-
-    for attempt in range(max_retries):
-        backoff_delay = min(2 ** attempt, 60)
-        
-        try:
-            write(f"Starting API call attempt {attempt + 1}")
-            timeout = ClientTimeout(total=300)  # 5 minutes total timeout
-            
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        write(f"API error (status {response.status}): {error_text}")
-                        
-                        if response.status in [429, 503]:  # Rate limit or service unavailable
-                            write(f"Retryable error. Waiting {backoff_delay} seconds...")
-                            await asyncio.sleep(backoff_delay)
-                            continue
-                            
-                        response.raise_for_status()
-                    
-                    result = await response.json()
-                    text = ""
-                    thinking = ""
-                    for block in result.get("content", []):
-                        if block.get("type") == "text":
-                           text = block.get("text")
-                        if block.get("type") == "thinking":
-                            thinking = block.get("thinking")
-                    
-                    print(f"Claude's thinking: {thinking}")
-                    return text
-                    
-                    write("No 'text' block found in content.")
-                    return "No final answer found in Claude response."
-                        
-        except (ClientError, asyncio.TimeoutError) as e:
-            write(f"Retryable error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-            
-        except Exception as e:
-            write(f"Unexpected error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-
-    raise Exception(f"Failed after {max_retries} attempts")
-
-
-async def call_claude(prompt):
-    try:
-        response = await call_anthropic_api(prompt)
-        
-        if not response:
-            write("Warning: Empty response from Anthropic API")
-            return "API returned empty response"
-            
-        return response
-        
-    except Exception as e:
-        write(f"Error in call_claude: {str(e)}")
-        return f"Error generating response: {str(e)}"
-    
-
-def extract_and_run_python_code(llm_output: str) -> str:
+        },
+        answer_ready=answer_ready,
+        cache_prefix=cacheable_prefix(prompt, shared_context),
+    )
+
+
+async def call_anthropic_api(prompt, max_tokens=16000, max_retries=7, cached_content=claude_context, answer_ready=None,
+                             shared_context=None):
+    request = _anthropic_request(prompt, max_tokens, cached_content, answer_ready, shared_context)
+    response = await llm_client.complete(
+        METACULUS_ANTHROPIC, request, llm_client.with_policy(max_attempts=max_retries)
+    )
+    print(f"Claude's thinking: {response.thinking}")
+    return response.text
+
+
+async def call_claude(prompt, answer_ready=None, shared_context=None):
+    return await call_anthropic_api(prompt, answer_ready=answer_ready, shared_context=shared_context)
+
+
+async def extract_and_run_python_code(llm_output: str) -> str:
+    """
+    Run the first <python> block of a Monte Carlo answer in the code sandbox
+    (its own interpreter with CPU, wall-clock and memory limits) and return
+    what it printed. Not used by the current pipelines (see code_sandbox).
+    """
     pattern = re.compile(r'<python>(.*?)</python>', re.DOTALL)
     matches = pattern.findall(llm_output)
 
@@ -130,114 +93,37 @@ def extract_and_run_python_code(llm_output: str) -> str:
         return "No <python> block found."
 
     python_code = matches[0].strip()
-
-    old_stdout = sys.stdout
-    new_stdout = io.StringIO()
-    sys.stdout = new_stdout
-
-    try:
-        exec(python_code, {})  # use isolated globals
-    except Exception as e:
-        import traceback
-        tb = traceback.format_exc()
-        return f"Error executing the extracted Python code:\n{tb}"
-    finally:
-        sys.stdout = old_stdout
-
-    return new_stdout.getvalue()
+    result = await run_python(python_code)
+    if not result.ok:
+        return f"Error executing the extracted Python code:\n{result.error}"
+    return result.output
 
 # Calls o4-mini using personal OpenAI credentials
 async def call_gpt(prompt):
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.chat.completions.create(
-        model="o4-mini",
-        messages=[
-            {"role": "user", "content": gpt_context + "\n" + prompt}
-        ]
-    )
-    return response.choices[0].message.content
-
-async def call_gpt_o3_personal(prompt):
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.chat.completions.create(
-        model="o3",
-        messages=[
-            {"role": "user", "content": gpt_context + "\n" + prompt}
-        ]
-    )
-    return response.choices[0].message.content
+    request = LLMRequest(model="o4-mini", prompt=gpt_context + "\n" + prompt)
+    response = await llm_client.complete(OPENAI, request)
+    return response.text
+
+# answer_ready is accepted for call-site symmetry; the personal OpenAI adapter does not stream
+async def call_gpt_o3_personal(prompt, answer_ready=None, shared_context=None):
+    prompt = gpt_context + "\n" + prompt
+    request = LLMRequest(model="o3", prompt=prompt, cache_prefix=cacheable_prefix(prompt, shared_context))
+    response = await llm_client.complete(OPENAI, request)
+    return response.text
 
 
-async def call_gpt_o3(prompt):
+async def call_gpt_o3(prompt, answer_ready=None, shared_context=None):
     # Temporarily short metaculus proxy using personal credits.
-    ans = await call_gpt_o3_personal(prompt)
-    return ans
-    try:
-        url = "https://llm-proxy.metaculus.com/proxy/openai/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {METACULUS_TOKEN}"
-        }
-        
-        data = {
-            "model": "o3",
-            "messages": [{"role": "user", "content": prompt}],
-        }
-        
-        timeout = ClientTimeout(total=300)  # 5 minutes total timeout
-        
-        async with ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    write(f"API error (status {response.status}): {error_text}")
-                    response.raise_for_status()
-                
-                result = await response.json()
-                
-                answer = result['choices'][0]['message']['content']
-                if answer is None:
-                    raise ValueError("No answer returned from GPT")
-                return answer
-                
-    except Exception as e:
-        write(f"Error in call_gpt: {str(e)}")
-        return f"Error generating response: {str(e)}"
-
-
-async def call_gpt_o4_mini(prompt):
+    # To go back to the proxy: llm_client.complete(METACULUS_OPENAI, LLMRequest(model="o3", prompt=prompt))
+    return await call_gpt_o3_personal(prompt, answer_ready=answer_ready, shared_context=shared_context)
+
+
+async def call_gpt_o4_mini(prompt, answer_ready=None, shared_context=None):
     prompt = gpt_context + "\n" + prompt
-    try:
-        url = "https://llm-proxy.metaculus.com/proxy/openai/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {METACULUS_TOKEN}"
-        }
-        
-        data = {
-            "model": "o4-mini",
-            "messages": [{"role": "user", "content": prompt}],
-        }
-        
-        timeout = ClientTimeout(total=300)  # 5 minutes total timeout
-        
-        async with ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    write(f"API error (status {response.status}): {error_text}")
-                    response.raise_for_status()
-                
-                result = await response.json()
-                
-                answer = result['choices'][0]['message']['content']
-                if answer is None:
-                    raise ValueError("No answer returned from GPT")
-                return answer
-                
-    except Exception as e:
-        write(f"Error in call_gpt: {str(e)}")
-        return f"Error generating response: {str(e)}"
+    request = LLMRequest(model="o4-mini", prompt=prompt, answer_ready=answer_ready,
+                         cache_prefix=cacheable_prefix(prompt, shared_context))
+    response = await llm_client.complete(METACULUS_OPENAI, request)
+    return response.text
 
 
 # OpenRouter API functions
@@ -245,220 +131,97 @@ async def call_openrouter_claude(prompt, max_tokens=16000, max_retries=3):
     """Call Claude via OpenRouter as fallback for Metaculus proxy"""
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY not found in environment variables")
-    
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/your-repo",  # Optional: replace with your repo
-        "X-Title": "Forecasting Bot"  # Optional: replace with your app name
-    }
-    
-    data = {
-        "model": "anthropic/claude-3.5-sonnet",
-        "max_tokens": max_tokens,
-        "messages": [
-            {
-                "role": "system",
-                "content": claude_context
-            },
-            {
-                "role": "user", 
-                "content": prompt
-            }
-        ]
-    }
-    
-    for attempt in range(max_retries):
-        backoff_delay = min(2 ** attempt, 30)
-        
-        try:
-            write(f"OpenRouter Claude attempt {attempt + 1}")
-            timeout = ClientTimeout(total=300)
-            
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        write(f"OpenRouter API error (status {response.status}): {error_text}")
-                        
-                        if response.status in [429, 503]:
-                            write(f"Rate limited. Waiting {backoff_delay} seconds...")
-                            await asyncio.sleep(backoff_delay)
-                            continue
-                            
-                        response.raise_for_status()
-                    
-                    result = await response.json()
-                    return result['choices'][0]['message']['content']
-                    
-        except (ClientError, asyncio.TimeoutError) as e:
-            write(f"OpenRouter retryable error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-            
-        except Exception as e:
-            write(f"OpenRouter unexpected error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-
-    raise Exception(f"OpenRouter Claude failed after {max_retries} attempts")
+
+    request = LLMRequest(
+        model="anthropic/claude-3.5-sonnet",
+        prompt=prompt,
+        system=claude_context,
+        max_tokens=max_tokens,
+    )
+    response = await llm_client.complete(OPENROUTER, request, llm_client.with_policy(max_attempts=max_retries))
+    return response.text
 
 
 async def call_openrouter_gpt(prompt, model="openai/gpt-4o", max_tokens=16000, max_retries=3):
     """Call GPT via OpenRouter as fallback for Metaculus proxy"""
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY not found in environment variables")
-    
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/your-repo",
-        "X-Title": "Forecasting Bot"
-    }
-    
-    data = {
-        "model": model,
-        "max_tokens": max_tokens,
-        "messages": [
-            {
-                "role": "system",
-                "content": gpt_context
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-    
-    for attempt in range(max_retries):
-        backoff_delay = min(2 ** attempt, 30)
-        
-        try:
-            write(f"OpenRouter GPT attempt {attempt + 1}")
-            timeout = ClientTimeout(total=300)
-            
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        write(f"OpenRouter API error (status {response.status}): {error_text}")
-                        
-                        if response.status in [429, 503]:
-                            write(f"Rate limited. Waiting {backoff_delay} seconds...")
-                            await asyncio.sleep(backoff_delay)
-                            continue
-                            
-                        response.raise_for_status()
-                    
-                    result = await response.json()
-                    return result['choices'][0]['message']['content']
-                    
-        except (ClientError, asyncio.TimeoutError) as e:
-            write(f"OpenRouter retryable error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-            
-        except Exception as e:
-            write(f"OpenRouter unexpected error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-
-    raise Exception(f"OpenRouter GPT failed after {max_retries} attempts")
-
-
-# Enhanced functions with fallback logic
+
+    request = LLMRequest(model=model, prompt=prompt, system=gpt_context, max_tokens=max_tokens)
+    response = await llm_client.complete(OPENROUTER, request, llm_client.with_policy(max_attempts=max_retries))
+    return response.text
+
+
+# Enhanced functions with hedged fallback: if the Metaculus proxy is slower than usual
+# (see latency_tracker) or fails, the same prompt also goes to OpenRouter and the first answer wins.
 async def call_claude_with_fallback(prompt):
-    """Call Claude with fallback to OpenRouter if Metaculus proxy fails"""
-    try:
-        # Try Metaculus proxy first
-        response = await call_anthropic_api(prompt)
-        if response and not response.startswith("Error generating response"):
-            return response
-    except Exception as e:
-        write(f"Metaculus Claude failed: {str(e)}")
-    
-    # Fallback to OpenRouter
-    try:
-        write("Falling back to OpenRouter Claude...")
-        return await call_openrouter_claude(prompt)
-    except Exception as e:
-        write(f"OpenRouter Claude also failed: {str(e)}")
-        return f"Error generating response: {str(e)}"
+    """Call Claude on the Metaculus proxy, hedged with OpenRouter Claude"""
+    if not OPENROUTER_API_KEY:
+        return await call_anthropic_api(prompt)
+
+    response = await llm_client.complete_hedged(
+        (METACULUS_ANTHROPIC, _anthropic_request(prompt), llm_client.with_policy(max_attempts=7)),
+        (
+            OPENROUTER,
+            LLMRequest(model="anthropic/claude-3.5-sonnet", prompt=prompt, system=claude_context, max_tokens=16000),
+            llm_client.with_policy(max_attempts=3),
+        ),
+    )
+    return response.text
 
 
 async def call_gpt_o4_mini_with_fallback(prompt):
-    """Call GPT-o4-mini with fallback to OpenRouter if Metaculus proxy fails"""
-    try:
-        # Try Metaculus proxy first
-        prompt_with_context = gpt_context + "\n" + prompt
-        url = "https://llm-proxy.metaculus.com/proxy/openai/v1/chat/completions"
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Token {METACULUS_TOKEN}"
-        }
-        
-        data = {
-            "model": "o4-mini",
-            "messages": [{"role": "user", "content": prompt_with_context}],
-        }
-        
-        timeout = ClientTimeout(total=300)
-        
-        async with ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result['choices'][0]['message']['content']
-                else:
-                    raise Exception(f"Metaculus proxy returned status {response.status}")
-                    
-    except Exception as e:
-        write(f"Metaculus GPT-o4-mini failed: {str(e)}")
-    
-    # Fallback to OpenRouter
-    try:
-        write("Falling back to OpenRouter GPT-4o...")
-        return await call_openrouter_gpt(prompt, model="openai/gpt-4o")
-    except Exception as e:
-        write(f"OpenRouter GPT-4o also failed: {str(e)}")
-        return f"Error generating response: {str(e)}"
+    """Call GPT-o4-mini on the Metaculus proxy, hedged with OpenRouter GPT-4o"""
+    # A single attempt on the proxy; retries are left to the OpenRouter leg
+    primary = (
+        METACULUS_OPENAI,
+        LLMRequest(model="o4-mini", prompt=gpt_context + "\n" + prompt),
+        llm_client.with_policy(max_attempts=1),
+    )
+    if not OPENROUTER_API_KEY:
+        response = await llm_client.complete(*primary)
+        return response.text
+
+    response = await llm_client.complete_hedged(
+        primary,
+        (
+            OPENROUTER,
+            LLMRequest(model="openai/gpt-4o", prompt=prompt, system=gpt_context, max_tokens=16000),
+            llm_client.with_policy(max_attempts=3),
+        ),
+    )
+    return response.text
 
 
 # Configurable forecaster functions using OpenRouter
-async def call_forecaster_model(forecaster_id: int, prompt: str, max_tokens: int = 16000, max_retries: int = 3) -> str:
+async def call_forecaster_model(forecaster_id: int, prompt: str, max_tokens: int = 16000, max_retries: int = 3,
+                                answer_ready=None, shared_context=None) -> str:
     """
     Call a specific forecaster's configured model via OpenRouter.
-    
+
     Args:
         forecaster_id: Forecaster number (1-5)
         prompt: The prompt to send
         max_tokens: Maximum tokens to generate
         max_retries: Number of retry attempts
-        
+        answer_ready: Optional predicate on the streamed text; returning True stops the stream early
+        shared_context: Block of `prompt` every forecaster receives; the prompt up to its end is sent as a cacheable prefix
+
     Returns:
         Model response text
+
+    Raises:
+        LLMError: if the model could not produce an answer
+
+    While the model's circuit breaker is open the call is rerouted to the forecaster's
+    substitute model (model_config.get_substitute_model), if one is configured.
     """
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY not found in environment variables")
-    
+
     model = get_forecaster_model(forecaster_id)
     write(f"Using {model} for forecaster {forecaster_id}")
-    
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/your-repo",
-        "X-Title": "Forecasting Bot"
-    }
-    
+
     # Choose appropriate context based on model type
     if "claude" in model.lower():
         system_content = claude_context
@@ -467,78 +230,38 @@ async def call_forecaster_model(forecaster_id: int, prompt: str, max_tokens: int
     else:
         # Default to gpt context for other models
         system_content = gpt_context
-    
-    data = {
-        "model": model,
-        "max_tokens": max_tokens,
-        "messages": [
-            {
-                "role": "system",
-                "content": system_content
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-    
-    for attempt in range(max_retries):
-        backoff_delay = min(2 ** attempt, 30)
-        
-        try:
-            write(f"OpenRouter {model} attempt {attempt + 1} for forecaster {forecaster_id}")
-            timeout = ClientTimeout(total=300)
-            
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        write(f"OpenRouter API error (status {response.status}): {error_text}")
-                        
-                        if response.status in [429, 503]:
-                            write(f"Rate limited. Waiting {backoff_delay} seconds...")
-                            await asyncio.sleep(backoff_delay)
-                            continue
-                            
-                        response.raise_for_status()
-                    
-                    result = await response.json()
-                    return result['choices'][0]['message']['content']
-                    
-        except (ClientError, asyncio.TimeoutError) as e:
-            write(f"OpenRouter retryable error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-            
-        except Exception as e:
-            write(f"OpenRouter unexpected error on attempt {attempt + 1}: {str(e)}")
-            if attempt == max_retries - 1:
-                raise
-            await asyncio.sleep(backoff_delay)
-
-    raise Exception(f"OpenRouter {model} failed after {max_retries} attempts")
+
+    request = LLMRequest(model=model, prompt=prompt, system=system_content, max_tokens=max_tokens,
+                         answer_ready=answer_ready, cache_prefix=cacheable_prefix(prompt, shared_context))
+    policy = llm_client.with_policy(max_attempts=max_retries)
+    try:
+        response = await llm_client.complete(OPENROUTER, request, policy)
+    except LLMCircuitOpenError as e:
+        substitute = get_substitute_model(forecaster_id)
+        if not substitute or substitute == model:
+            raise
+        write(f"{e}; rerouting forecaster {forecaster_id} to {substitute}")
+        response = await llm_client.complete(OPENROUTER, replace(request, model=substitute), policy)
+    return response.text
 
 
 # Convenience functions for each forecaster
-async def call_forecaster_1(prompt: str) -> str:
+async def call_forecaster_1(prompt: str, answer_ready=None, shared_context=None) -> str:
     """Call forecaster 1's configured model."""
-    return await call_forecaster_model(1, prompt)
+    return await call_forecaster_model(1, prompt, answer_ready=answer_ready, shared_context=shared_context)
 
-async def call_forecaster_2(prompt: str) -> str:
+async def call_forecaster_2(prompt: str, answer_ready=None, shared_context=None) -> str:
     """Call forecaster 2's configured model."""
-    return await call_forecaster_model(2, prompt)
+    return await call_forecaster_model(2, prompt, answer_ready=answer_ready, shared_context=shared_context)
 
-async def call_forecaster_3(prompt: str) -> str:
+async def call_forecaster_3(prompt: str, answer_ready=None, shared_context=None) -> str:
     """Call forecaster 3's configured model."""
-    return await call_forecaster_model(3, prompt)
+    return await call_forecaster_model(3, prompt, answer_ready=answer_ready, shared_context=shared_context)
 
-async def call_forecaster_4(prompt: str) -> str:
+async def call_forecaster_4(prompt: str, answer_ready=None, shared_context=None) -> str:
     """Call forecaster 4's configured model."""
-    return await call_forecaster_model(4, prompt)
+    return await call_forecaster_model(4, prompt, answer_ready=answer_ready, shared_context=shared_context)
 
-async def call_forecaster_5(prompt: str) -> str:
+async def call_forecaster_5(prompt: str, answer_ready=None, shared_context=None) -> str:
     """Call forecaster 5's configured model."""
-    return await call_forecaster_model(5, prompt)
-    
+    return await call_forecaster_model(5, prompt, answer_ready=answer_ready, shared_context=shared_context)
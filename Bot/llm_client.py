@@ -0,0 +1,827 @@
+"""
+Unified LLM client.
+
+Every model call in the bot goes through `llm_client.complete(adapter, request)`.
+Provider differences (URL, auth, payload shape, response parsing) live in small
+adapter classes; retries, backoff, timeouts and error classification live in one
+place so latency behaviour is consistent and tunable from the environment:
+
+- LLM_MAX_ATTEMPTS: attempts per call (default 3)
+- LLM_ATTEMPT_TIMEOUT: seconds allowed for a single attempt (default 300)
+- LLM_CALL_DEADLINE: seconds allowed for a call across all attempts and backoff (default 600)
+- LLM_BACKOFF_BASE / LLM_BACKOFF_MAX: exponential backoff base and cap, in seconds
+- LLM_STREAMING: stream responses over SSE from adapters that support it (default 1)
+- LLM_STREAM_IDLE_TIMEOUT: seconds a stream may go silent before the attempt is retried (default 120)
+
+Requests may mark a leading `cache_prefix` of their prompt (system context plus the shared
+research block) that adapters send as a separate, cacheable block. Concurrent streaming
+requests with the same prefix wait briefly for the first one to start answering, so the
+provider has the prefix cached before the rest arrive (only a stream can signal its first
+token, so requests to non-streaming adapters never wait):
+- LLM_CACHE_WARMUP_WAIT: seconds a request waits for another one to warm its prefix (default 30)
+
+While streaming, a request's `answer_ready` predicate is checked as text arrives; once it
+reports that the final answer block is complete the stream is closed and the text so far is
+returned, so the pipeline does not wait for trailing tokens or a stalled connection.
+
+Failures are raised as typed LLMError subclasses instead of being returned as
+"Error generating response" strings. Every attempt's outcome feeds the
+provider/model's circuit breaker (see circuit_breaker); while it is open calls
+fail fast with LLMCircuitOpenError instead of walking the retry ladder.
+"""
+
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import ClientError, ClientTimeout
+from dotenv import load_dotenv
+
+from endpoints import METACULUS_PROXY_BASE_URL, OPENROUTER_BASE_URL
+from circuit_breaker import circuit_breakers, CIRCUIT_PROBE_POLL, HALF_OPEN
+from http_sessions import get_session, get_openai_client
+from latency_tracker import latency_tracker
+from rate_limiter import rate_limiter, estimate_tokens
+from response_cache import response_cache, cache_key
+
+load_dotenv()
+
+METACULUS_TOKEN = os.getenv("METACULUS_TOKEN")
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "300"))
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "600"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") != "0"
+LLM_STREAM_IDLE_TIMEOUT = float(os.getenv("LLM_STREAM_IDLE_TIMEOUT", "120"))
+LLM_CACHE_WARMUP_WAIT = float(os.getenv("LLM_CACHE_WARMUP_WAIT", "30"))
+# Seconds between "still streaming" progress lines
+LLM_STREAM_LOG_INTERVAL = float(os.getenv("LLM_STREAM_LOG_INTERVAL", "30"))
+
+RETRYABLE_STATUSES = {408, 409, 425, 500, 502, 503, 504, 520, 522, 524, 529}
+
+
+def write(x):
+    print(x)
+
+
+######################### ERRORS #########################
+
+class LLMError(Exception):
+    """Base class for every failed LLM call."""
+
+    def __init__(self, message: str, provider: str = "", model: str = "", status: Optional[int] = None):
+        super().__init__(message)
+        self.provider = provider
+        self.model = model
+        self.status = status
+
+
+class LLMRetryableError(LLMError):
+    """
+    Transient failure (5xx, overloaded, dropped connection); worth another attempt.
+    `retry_after` holds the provider's requested wait in seconds, if it sent one.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMRetryableError):
+    """The provider answered 429."""
+
+
+class LLMTimeoutError(LLMRetryableError):
+    """A single attempt exceeded its timeout."""
+
+
+class LLMDeadlineExceeded(LLMError):
+    """The call ran out of its overall deadline before any attempt succeeded."""
+
+
+class LLMResponseError(LLMError):
+    """Non-retryable failure: bad request, auth error, or a response we cannot parse."""
+
+
+class LLMEmptyResponseError(LLMResponseError):
+    """The provider answered successfully but returned no text."""
+
+
+class LLMCircuitOpenError(LLMError):
+    """The provider/model's circuit breaker is open; the call was rejected without being sent."""
+
+
+class LLMCacheMiss(LLMError):
+    """Replay mode was requested but the response cache has no entry for this request."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_for_status(status: int, body: str, headers: Dict[str, str], provider: str, model: str) -> LLMError:
+    """Map an HTTP error status to the matching LLMError subclass."""
+    message = f"{provider} {model} returned HTTP {status}: {body[:500]}"
+    retry_after = parse_retry_after(headers.get("Retry-After"))
+    if status == 429:
+        return LLMRateLimitError(message, retry_after=retry_after, provider=provider, model=model, status=status)
+    if status in RETRYABLE_STATUSES:
+        return LLMRetryableError(message, retry_after=retry_after, provider=provider, model=model, status=status)
+    return LLMResponseError(message, provider=provider, model=model, status=status)
+
+
+######################### REQUESTS #########################
+
+@dataclass
+class LLMRequest:
+    """A provider-agnostic completion request."""
+    model: str
+    prompt: str
+    system: Optional[str] = None
+    max_tokens: Optional[int] = None
+    # Provider-specific payload fields merged in verbatim (e.g. Anthropic "thinking")
+    extra: Dict[str, Any] = field(default_factory=dict)
+    # Ignored by adapters that cannot stream
+    stream: bool = LLM_STREAMING
+    # Called with the text streamed so far; returning True ends the stream early
+    answer_ready: Optional[Callable[[str], bool]] = None
+    # Leading part of `prompt` shared with other requests; sent as its own cacheable block
+    cache_prefix: Optional[str] = None
+    # Set by the adapter once the first token arrives (the provider has cached the prefix by then)
+    first_token: Optional[asyncio.Event] = field(default=None, repr=False)
+
+    def split_prompt(self) -> Tuple[str, str]:
+        """(cacheable prefix, per-request suffix) of the prompt; the prefix is empty if not set."""
+        if self.cache_prefix and self.prompt.startswith(self.cache_prefix):
+            return self.cache_prefix, self.prompt[len(self.cache_prefix):]
+        return "", self.prompt
+
+
+@dataclass
+class LLMResponse:
+    """Text returned by a provider, plus whatever metadata it reported."""
+    text: str
+    provider: str
+    model: str
+    thinking: str = ""
+    usage: Dict[str, Any] = field(default_factory=dict)
+    cached: bool = False
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Prompt tokens billed for this call, including those read from the provider's prompt cache."""
+        usage = self.usage or {}
+        if "prompt_tokens" in usage:
+            return usage.get("prompt_tokens") or 0
+        # Anthropic reports cache reads/writes separately from uncached input
+        return sum(usage.get(k) or 0 for k in ("input_tokens", "cache_read_input_tokens",
+                                               "cache_creation_input_tokens"))
+
+    @property
+    def cache_read_tokens(self) -> int:
+        """Prompt tokens the provider served from its prompt cache."""
+        usage = self.usage or {}
+        if "cache_read_input_tokens" in usage:
+            return usage.get("cache_read_input_tokens") or 0
+        details = usage.get("prompt_tokens_details") or {}
+        return details.get("cached_tokens") or 0
+
+
+# Run-wide prompt cache accounting, for logging
+prompt_cache_stats = {"calls": 0, "prompt_tokens": 0, "cache_read_tokens": 0}
+
+
+@dataclass
+class StreamState:
+    """Accumulates one streamed response."""
+    text_parts: List[str] = field(default_factory=list)
+    thinking_parts: List[str] = field(default_factory=list)
+    usage: Dict[str, Any] = field(default_factory=dict)
+    done: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+    @property
+    def thinking(self) -> str:
+        return "".join(self.thinking_parts)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry/backoff settings for one call.
+
+    Backoff is "full jitter" exponential: a uniform draw in [0, min(max_delay, base * 2**attempt)],
+    so concurrent callers that fail together do not retry together. A provider's Retry-After
+    always takes precedence.
+    """
+    max_attempts: int = LLM_MAX_ATTEMPTS
+    attempt_timeout: float = LLM_ATTEMPT_TIMEOUT
+    deadline: Optional[float] = LLM_CALL_DEADLINE
+    base_delay: float = LLM_BACKOFF_BASE
+    max_delay: float = LLM_BACKOFF_MAX
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+######################### PROVIDER ADAPTERS #########################
+
+class ProviderAdapter:
+    """
+    Knows how to talk to one provider endpoint. Subclasses build the payload and
+    parse the response; `send` performs a single attempt and raises LLMError on failure.
+
+    Adapters that set `supports_streaming` also implement `parse_event`, which folds one
+    server-sent event into a StreamState.
+    """
+    name = "provider"
+    url = ""
+    supports_streaming = False
+
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": "application/json"}
+
+    def payload(self, request: LLMRequest) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def parse(self, body: Dict[str, Any], request: LLMRequest) -> LLMResponse:
+        raise NotImplementedError
+
+    def parse_event(self, event: Dict[str, Any], state: StreamState, request: LLMRequest) -> None:
+        raise NotImplementedError
+
+    async def send(self, request: LLMRequest, timeout: float) -> LLMResponse:
+        streaming = request.stream and self.supports_streaming
+        payload = self.payload(request)
+        if streaming:
+            payload["stream"] = True
+        session = get_session(self.url)
+        async with session.post(
+            self.url,
+            headers=self.headers(),
+            json=payload,
+            timeout=ClientTimeout(total=timeout),
+        ) as response:
+            rate_limiter.on_headers(self.name, request.model, response.headers)
+            if response.status != 200:
+                body = await response.text()
+                raise error_for_status(response.status, body, response.headers, self.name, request.model)
+            if streaming and response.content_type == "text/event-stream":
+                state = await self.read_stream(response, request)
+                return self.finish_stream(state, request)
+            body = await response.json(content_type=None)
+        return self.parse(body, request)
+
+    async def read_stream(self, response, request: LLMRequest) -> StreamState:
+        """
+        Consume an SSE body event by event until the provider finishes or
+        `request.answer_ready` reports the answer block is complete.
+        Leaving the response early closes the connection instead of returning it to the pool.
+        """
+        loop = asyncio.get_running_loop()
+        state = StreamState()
+        started = last_log = loop.time()
+        while True:
+            try:
+                line = await asyncio.wait_for(response.content.readline(), LLM_STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(
+                    f"{self.name} {request.model} stream stalled for {LLM_STREAM_IDLE_TIMEOUT:.0f}s "
+                    f"after {len(state.text)} chars",
+                    provider=self.name, model=request.model,
+                )
+            if not line:
+                break
+            line = line.decode("utf-8", errors="replace").strip()
+            # Skip "event:" names, blank separators and ": keep-alive" comments
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+
+            before = len(state.text_parts)
+            self.parse_event(event, state, request)
+            if request.first_token is not None and (state.text_parts or state.thinking_parts):
+                request.first_token.set()
+            if state.done:
+                break
+            # Only re-check for the answer when a line or bracket has just been closed
+            new_text = "".join(state.text_parts[before:])
+            if request.answer_ready and any(c in new_text for c in "\n%]") and request.answer_ready(state.text):
+                write(f"[{self.name}] {request.model} answer block complete after "
+                      f"{loop.time() - started:.0f}s, closing stream")
+                break
+            if loop.time() - last_log >= LLM_STREAM_LOG_INTERVAL:
+                last_log = loop.time()
+                write(f"[{self.name}] {request.model} streaming: {len(state.text)} chars, "
+                      f"{len(state.thinking)} thinking chars, {last_log - started:.0f}s")
+        return state
+
+    def finish_stream(self, state: StreamState, request: LLMRequest) -> LLMResponse:
+        text = state.text
+        if not text:
+            raise LLMEmptyResponseError(
+                f"{self.name} {request.model} streamed no text",
+                provider=self.name, model=request.model,
+            )
+        return LLMResponse(text=text, provider=self.name, model=request.model,
+                           thinking=state.thinking, usage=state.usage)
+
+
+class AnthropicMessagesAdapter(ProviderAdapter):
+    """Anthropic Messages API, reached through the Metaculus proxy."""
+    name = "metaculus-anthropic"
+    url = f"{METACULUS_PROXY_BASE_URL}/anthropic/v1/messages/"
+    supports_streaming = True
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Token {METACULUS_TOKEN}",
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json",
+            "anthropic-metadata": json.dumps({
+                "task_type": "qualitative_forecasting",
+                "emphasis": "detailed_reasoning"
+            }),
+        }
+
+    def payload(self, request: LLMRequest) -> Dict[str, Any]:
+        prefix, suffix = request.split_prompt()
+        content = request.prompt
+        if prefix:
+            content = [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": suffix},
+            ]
+        data = {
+            "model": request.model,
+            "max_tokens": request.max_tokens or 16000,
+            "messages": [{"role": "user", "content": content}],
+        }
+        if request.system:
+            data["system"] = [
+                {"type": "text", "text": request.system, "cache_control": {"type": "ephemeral"}}
+            ]
+        data.update(request.extra)
+        return data
+
+    def parse(self, body: Dict[str, Any], request: LLMRequest) -> LLMResponse:
+        text = ""
+        thinking = ""
+        for block in body.get("content", []):
+            if block.get("type") == "text":
+                text = block.get("text")
+            if block.get("type") == "thinking":
+                thinking = block.get("thinking")
+        if not text:
+            raise LLMEmptyResponseError(
+                f"{self.name} {request.model} returned no text block",
+                provider=self.name, model=request.model,
+            )
+        return LLMResponse(text=text, provider=self.name, model=request.model,
+                           thinking=thinking, usage=body.get("usage", {}))
+
+    def parse_event(self, event: Dict[str, Any], state: StreamState, request: LLMRequest) -> None:
+        kind = event.get("type")
+        if kind == "message_start":
+            state.usage.update((event.get("message") or {}).get("usage") or {})
+        elif kind == "content_block_start":
+            # Like `parse`, keep only the last text block
+            if (event.get("content_block") or {}).get("type") == "text":
+                state.text_parts.clear()
+        elif kind == "content_block_delta":
+            delta = event.get("delta") or {}
+            if delta.get("type") == "text_delta":
+                state.text_parts.append(delta.get("text", ""))
+            elif delta.get("type") == "thinking_delta":
+                state.thinking_parts.append(delta.get("thinking", ""))
+        elif kind == "message_delta":
+            state.usage.update(event.get("usage") or {})
+        elif kind == "message_stop":
+            state.done = True
+        elif kind == "error":
+            error = event.get("error") or {}
+            message = f"{self.name} {request.model} stream error: {error}"
+            if error.get("type") == "rate_limit_error":
+                raise LLMRateLimitError(message, provider=self.name, model=request.model)
+            if error.get("type") in ("overloaded_error", "api_error"):
+                raise LLMRetryableError(message, provider=self.name, model=request.model)
+            raise LLMResponseError(message, provider=self.name, model=request.model)
+
+
+class ChatCompletionsAdapter(ProviderAdapter):
+    """OpenAI-compatible /chat/completions endpoint (Metaculus OpenAI proxy, OpenRouter)."""
+
+    def __init__(self, name: str, url: str, auth_header: str, extra_headers: Optional[Dict[str, str]] = None,
+                 supports_streaming: bool = False, extra_payload: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.url = url
+        self.auth_header = auth_header
+        self.extra_headers = extra_headers or {}
+        self.supports_streaming = supports_streaming
+        self.extra_payload = extra_payload or {}
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": self.auth_header,
+            "Content-Type": "application/json",
+            **self.extra_headers,
+        }
+
+    @staticmethod
+    def _text_part(text: str, cacheable: bool) -> Dict[str, Any]:
+        part = {"type": "text", "text": text}
+        if cacheable:
+            part["cache_control"] = {"type": "ephemeral"}
+        return part
+
+    def payload(self, request: LLMRequest) -> Dict[str, Any]:
+        # OpenAI-family models cache long prefixes automatically; Anthropic and Gemini
+        # models behind OpenRouter need explicit cache_control breakpoints.
+        explicit_cache = request.model.startswith(("anthropic/", "google/"))
+        prefix, suffix = request.split_prompt()
+        messages = []
+        if request.system:
+            system = request.system
+            if explicit_cache:
+                system = [self._text_part(request.system, True)]
+            messages.append({"role": "system", "content": system})
+        content = request.prompt
+        if prefix:
+            content = [self._text_part(prefix, explicit_cache), self._text_part(suffix, False)]
+        messages.append({"role": "user", "content": content})
+        data = {"model": request.model, "messages": messages, **self.extra_payload}
+        if request.max_tokens:
+            data["max_tokens"] = request.max_tokens
+        data.update(request.extra)
+        return data
+
+    def raise_for_error(self, body: Dict[str, Any], request: LLMRequest) -> None:
+        # OpenRouter reports upstream failures as HTTP 200 (or mid-stream) with an "error" object
+        if "error" not in body:
+            return
+        error = body["error"] or {}
+        code = error.get("code") if isinstance(error, dict) else None
+        message = f"{self.name} {request.model} returned error: {error}"
+        if code == 429:
+            raise LLMRateLimitError(message, provider=self.name, model=request.model, status=code)
+        if isinstance(code, int) and 400 <= code < 500 and code not in RETRYABLE_STATUSES:
+            raise LLMResponseError(message, provider=self.name, model=request.model, status=code)
+        raise LLMRetryableError(message, provider=self.name, model=request.model, status=code)
+
+    def parse(self, body: Dict[str, Any], request: LLMRequest) -> LLMResponse:
+        self.raise_for_error(body, request)
+        try:
+            text = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMResponseError(
+                f"{self.name} {request.model} returned an unexpected body: {str(body)[:500]}",
+                provider=self.name, model=request.model,
+            )
+        if not text:
+            raise LLMEmptyResponseError(
+                f"{self.name} {request.model} returned an empty answer",
+                provider=self.name, model=request.model,
+            )
+        return LLMResponse(text=text, provider=self.name, model=request.model, usage=body.get("usage") or {})
+
+    def parse_event(self, event: Dict[str, Any], state: StreamState, request: LLMRequest) -> None:
+        self.raise_for_error(event, request)
+        if event.get("usage"):
+            state.usage = event["usage"]
+        for choice in event.get("choices") or []:
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                state.text_parts.append(delta["content"])
+            # OpenRouter streams reasoning tokens separately for models that expose them
+            if delta.get("reasoning"):
+                state.thinking_parts.append(delta["reasoning"])
+
+
+class OpenAIChatAdapter(ProviderAdapter):
+    """Personal-key OpenAI chat completions through the shared AsyncOpenAI client."""
+    name = "openai"
+    url = "https://api.openai.com/v1/chat/completions"
+
+    async def send(self, request: LLMRequest, timeout: float) -> LLMResponse:
+        # Retries are owned by the backoff engine, not the SDK
+        client = get_openai_client().with_options(timeout=timeout, max_retries=0)
+        messages = []
+        if request.system:
+            messages.append({"role": "system", "content": request.system})
+        # OpenAI caches long identical prefixes automatically; the prompt is sent as one block
+        messages.append({"role": "user", "content": request.prompt})
+        kwargs = dict(request.extra)
+        if request.max_tokens:
+            kwargs["max_completion_tokens"] = request.max_tokens
+        import openai  # already loaded by get_openai_client
+
+        try:
+            response = await client.chat.completions.create(model=request.model, messages=messages, **kwargs)
+        except openai.APITimeoutError as e:
+            raise LLMTimeoutError(f"openai {request.model} timed out: {e}", provider=self.name, model=request.model)
+        except openai.APIConnectionError as e:
+            raise LLMRetryableError(f"openai {request.model} connection error: {e}", provider=self.name, model=request.model)
+        except openai.APIStatusError as e:
+            rate_limiter.on_headers(self.name, request.model, e.response.headers)
+            raise error_for_status(e.status_code, str(e), e.response.headers, self.name, request.model)
+
+        text = response.choices[0].message.content
+        if not text:
+            raise LLMEmptyResponseError(f"openai {request.model} returned an empty answer",
+                                        provider=self.name, model=request.model)
+        usage = response.usage.model_dump() if response.usage else {}
+        return LLMResponse(text=text, provider=self.name, model=request.model, usage=usage)
+
+
+METACULUS_ANTHROPIC = AnthropicMessagesAdapter()
+METACULUS_OPENAI = ChatCompletionsAdapter(
+    name="metaculus-openai",
+    url=f"{METACULUS_PROXY_BASE_URL}/openai/v1/chat/completions",
+    auth_header=f"Token {METACULUS_TOKEN}",
+)
+OPENROUTER = ChatCompletionsAdapter(
+    name="openrouter",
+    url=f"{OPENROUTER_BASE_URL}/chat/completions",
+    auth_header=f"Bearer {OPENROUTER_API_KEY}",
+    extra_headers={
+        "HTTP-Referer": "https://github.com/your-repo",
+        "X-Title": "Forecasting Bot",
+    },
+    supports_streaming=True,
+    # Ask OpenRouter to report token usage, including prompt cache reads
+    extra_payload={"usage": {"include": True}},
+)
+OPENAI = OpenAIChatAdapter()
+
+
+######################### CLIENT #########################
+
+class LLMClient:
+    """Runs a request against an adapter under a RetryPolicy."""
+
+    def __init__(self, policy: RetryPolicy = DEFAULT_POLICY):
+        self.policy = policy
+        # (provider, model, prefix hash) -> set once the first request with that prefix starts answering
+        self._warming: Dict[Tuple[str, str, str], asyncio.Event] = {}
+
+    async def complete(self, adapter: ProviderAdapter, request: LLMRequest,
+                       policy: Optional[RetryPolicy] = None) -> LLMResponse:
+        """
+        Send `request` to `adapter`, retrying transient failures.
+
+        Identical requests are served from the response cache when LLM_CACHE_MODE allows it.
+
+        Args:
+            adapter: Provider adapter to call
+            request: The completion request
+            policy: Retry/timeout settings; defaults to the client's policy
+
+        Returns:
+            The provider's LLMResponse
+
+        Raises:
+            LLMResponseError: non-retryable failure
+            LLMDeadlineExceeded: the overall deadline ran out
+            LLMRetryableError: every attempt failed transiently
+            LLMCacheMiss: replay mode and nothing recorded for this request
+        """
+        policy = policy or self.policy
+        key = None
+        if response_cache.enabled:
+            key = cache_key(adapter.name, request.model, request.system, request.prompt,
+                            {"max_tokens": request.max_tokens, **request.extra})
+            cached = response_cache.get(key)
+            if cached is not None:
+                write(f"[{adapter.name}] {request.model} served from response cache")
+                return LLMResponse(**cached, cached=True)
+            if response_cache.mode == "replay":
+                raise LLMCacheMiss(f"{adapter.name} {request.model} has no recorded response",
+                                   provider=adapter.name, model=request.model)
+
+        started = time.monotonic()
+        warm_key = None
+        if request.cache_prefix and request.stream and adapter.supports_streaming:
+            warm_key = (adapter.name, request.model,
+                        hashlib.sha256(((request.system or "") + request.cache_prefix).encode("utf-8")).hexdigest())
+            warming = self._warming.get(warm_key)
+            if warming is None:
+                request = replace(request, first_token=asyncio.Event())
+                self._warming[warm_key] = request.first_token
+            else:
+                if not warming.is_set():
+                    # Another request is writing this prefix to the provider's cache; let it get there first
+                    try:
+                        await asyncio.wait_for(warming.wait(), LLM_CACHE_WARMUP_WAIT)
+                    except asyncio.TimeoutError:
+                        pass
+                warm_key = None
+        try:
+            response = await self._send_with_retries(adapter, request, policy)
+        finally:
+            if warm_key is not None:
+                self._warming.pop(warm_key, None)
+                request.first_token.set()
+        latency_tracker.record(adapter.name, request.model, time.monotonic() - started)
+        self._report_prompt_cache(adapter, response)
+        if key is not None:
+            payload = asdict(response)
+            payload.pop("cached")
+            response_cache.put(key, adapter.name, request.model, payload)
+        return response
+
+    @staticmethod
+    def _report_prompt_cache(adapter: ProviderAdapter, response: LLMResponse) -> None:
+        prompt_tokens = response.prompt_tokens
+        if not prompt_tokens:
+            return
+        prompt_cache_stats["calls"] += 1
+        prompt_cache_stats["prompt_tokens"] += prompt_tokens
+        prompt_cache_stats["cache_read_tokens"] += response.cache_read_tokens
+        if response.cache_read_tokens:
+            write(f"[{adapter.name}] {response.model} prompt cache hit: "
+                  f"{response.cache_read_tokens}/{prompt_tokens} prompt tokens")
+
+    async def _send_with_retries(self, adapter: ProviderAdapter, request: LLMRequest,
+                                 policy: RetryPolicy) -> LLMResponse:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.deadline if policy.deadline else None
+        last_error: Optional[LLMError] = None
+        prompt_tokens = estimate_tokens((request.system or "") + request.prompt)
+
+        for attempt in range(policy.max_attempts):
+            while not circuit_breakers.allow(adapter.name, request.model):
+                breaker = circuit_breakers.get(adapter.name, request.model)
+                # Another call is probing a half-open breaker: wait for its verdict rather than fail
+                if breaker.state == HALF_OPEN and (deadline is None or loop.time() < deadline):
+                    await asyncio.sleep(CIRCUIT_PROBE_POLL)
+                    continue
+                raise LLMCircuitOpenError(
+                    f"{adapter.name} {request.model} circuit is {breaker.state}, "
+                    f"next probe in {breaker.retry_in():.0f}s" + (f"; last error: {last_error}" if last_error else ""),
+                    provider=adapter.name, model=request.model,
+                )
+
+            # Wait for rate-limit budget; the wait counts against the call's deadline
+            try:
+                await asyncio.wait_for(
+                    rate_limiter.acquire(adapter.name, request.model, prompt_tokens),
+                    timeout=None if deadline is None else max(0.0, deadline - loop.time()),
+                )
+            except BaseException as e:
+                circuit_breakers.release(adapter.name, request.model)
+                if isinstance(e, asyncio.TimeoutError):
+                    break
+                raise
+
+            timeout = policy.attempt_timeout
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    circuit_breakers.release(adapter.name, request.model)
+                    break
+                timeout = min(timeout, remaining)
+
+            write(f"[{adapter.name}] {request.model} attempt {attempt + 1}/{policy.max_attempts}")
+            try:
+                response = await adapter.send(request, timeout)
+            except LLMRateLimitError as e:
+                # Throttling is the rate limiter's business, not a sign the provider is down
+                rate_limiter.on_rate_limited(adapter.name, request.model, e.retry_after)
+                circuit_breakers.release(adapter.name, request.model)
+                last_error = e
+            except LLMRetryableError as e:
+                circuit_breakers.record_failure(adapter.name, request.model, str(e))
+                last_error = e
+            except asyncio.TimeoutError:
+                last_error = LLMTimeoutError(
+                    f"{adapter.name} {request.model} timed out after {timeout:.0f}s",
+                    provider=adapter.name, model=request.model,
+                )
+                circuit_breakers.record_failure(adapter.name, request.model, str(last_error))
+            except ClientError as e:
+                last_error = LLMRetryableError(
+                    f"{adapter.name} {request.model} connection error: {e}",
+                    provider=adapter.name, model=request.model,
+                )
+                circuit_breakers.record_failure(adapter.name, request.model, str(last_error))
+            except LLMResponseError as e:
+                # The provider answered, so it is up, unless it had nothing to say or no model to serve
+                if isinstance(e, LLMEmptyResponseError) or e.status == 404:
+                    circuit_breakers.record_failure(adapter.name, request.model, str(e))
+                else:
+                    circuit_breakers.record_success(adapter.name, request.model)
+                raise
+            except BaseException:
+                # Cancelled (e.g. the losing leg of a hedge) or an unexpected bug: no verdict
+                circuit_breakers.release(adapter.name, request.model)
+                raise
+            else:
+                rate_limiter.on_success(adapter.name, request.model)
+                circuit_breakers.record_success(adapter.name, request.model)
+                return response
+
+            write(f"[{adapter.name}] {request.model} attempt {attempt + 1} failed: {last_error}")
+            if attempt == policy.max_attempts - 1:
+                raise last_error
+
+            delay = policy.backoff(attempt, last_error.retry_after)
+            if deadline is not None and loop.time() + delay >= deadline:
+                break
+            write(f"[{adapter.name}] Retrying {request.model} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        raise LLMDeadlineExceeded(
+            f"{adapter.name} {request.model} exceeded its {policy.deadline:.0f}s deadline: {last_error}",
+            provider=adapter.name, model=request.model,
+        )
+
+    async def complete_hedged(self, primary: Tuple[ProviderAdapter, LLMRequest, Optional[RetryPolicy]],
+                              fallback: Tuple[ProviderAdapter, LLMRequest, Optional[RetryPolicy]]) -> LLMResponse:
+        """
+        Run `primary`, and if it has not answered within its hedge delay (a percentile of its
+        observed latency, see latency_tracker) also run `fallback`. The first success wins and
+        the other call is cancelled. If the primary fails outright, the fallback runs at once.
+
+        Args:
+            primary: (adapter, request, policy) to try first
+            fallback: (adapter, request, policy) to hedge with
+
+        Returns:
+            The LLMResponse of whichever call succeeded first
+
+        Raises:
+            LLMError: both calls failed; the fallback's error is raised
+        """
+        primary_adapter, primary_request, _ = primary
+        fallback_adapter, fallback_request, _ = fallback
+        delay = latency_tracker.hedge_delay(primary_adapter.name, primary_request.model)
+        tasks = {asyncio.create_task(self.complete(*primary)): primary_adapter.name}
+        errors: Dict[str, BaseException] = {}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                errors[tasks.pop(task)] = task.exception()
+                write(f"[hedge] {primary_adapter.name} {primary_request.model} failed: {task.exception()}")
+            if not errors:
+                write(f"[hedge] {primary_adapter.name} {primary_request.model} has not answered after "
+                      f"{delay:.0f}s, also trying {fallback_adapter.name} {fallback_request.model}")
+            tasks[asyncio.create_task(self.complete(*fallback))] = fallback_adapter.name
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    if task.exception() is None:
+                        write(f"[hedge] {name} answered first")
+                        return task.result()
+                    errors[name] = task.exception()
+            raise errors.get(fallback_adapter.name) or next(iter(errors.values()))
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def with_policy(self, **overrides) -> RetryPolicy:
+        """A copy of the client's default policy with some fields overridden."""
+        return replace(self.policy, **overrides)
+
+
+llm_client = LLMClient()
@@ -1,16 +1,24 @@
+import argparse
 import asyncio
 import datetime
 import json
 import os
 import re
+from typing import Optional
 import dotenv
 dotenv.load_dotenv()
 from forecaster import binary_forecast, numeric_forecast, multiple_choice_forecast
 
-import numpy as np
-import requests
-from asknews_sdk import AskNewsSDK
 from search import call_gpt
+from http_sessions import close_sessions
+from browser import browser_pool
+from extraction_pool import extraction_pool
+from checkpoint_store import checkpoint_store
+from research_fingerprint import reforecast_decision, record_research
+from question_scheduler import QuestionJob, QuestionNotStarted, QuestionScheduler, add_stop_signal_handlers
+from circuit_breaker import circuit_breakers
+from llm_client import prompt_cache_stats
+from metaculus_client import metaculus_client
 
 
 OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Q2_tournament_forecasts"))
@@ -21,7 +29,11 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 SUBMIT_PREDICTION = True  # set to True to publish your predictions to Metaculus
 USE_EXAMPLE_QUESTIONS = False # set to True to forecast example questions rather than the tournament questions
 NUM_RUNS_PER_QUESTION = 5  # The median forecast is taken between NUM_RUNS_PER_QUESTION runs
-SKIP_PREVIOUSLY_FORECASTED_QUESTIONS = True
+# What to do with questions that already have a forecast: "never" skips them, "always" forecasts them
+# again every run, "incremental" forecasts them again only on new evidence or staleness (research_fingerprint.py).
+# Incremental runs the full ensemble again at least every REFORECAST_MAX_AGE_HOURS per question, and its first
+# run re-forecasts every question forecast before it was enabled (there is no research record for them yet)
+REFORECAST_MODE = "never"
 RUN = True
 
 # Environment variables
@@ -59,48 +71,19 @@ EXAMPLE_QUESTIONS = [  # (question_id, post_id)
 ######################### HELPER FUNCTIONS #########################
 
 # @title Helper functions
-AUTH_HEADERS = {"headers": {"Authorization": f"Token {METACULUS_TOKEN}"}}
-API_BASE_URL = "https://www.metaculus.com/api"
-
-
-def post_question_comment(post_id: int, comment_text: str) -> None:
+async def post_question_comment(post_id: int, comment_text: str) -> None:
     """
     Post a comment on the question page as the bot user.
     """
-
-    response = requests.post(
-        f"{API_BASE_URL}/comments/create/",
-        json={
-            "text": comment_text,
-            "parent": None,
-            "included_forecast": True,
-            "is_private": True,
-            "on_post": post_id,
-        },
-        **AUTH_HEADERS,  # type: ignore
-    )
-    if not response.ok:
-        raise RuntimeError(response.text)
+    await metaculus_client.post_comment(post_id, comment_text)
 
 
-def post_question_prediction(question_id: int, forecast_payload: dict) -> None:
+async def post_question_prediction(question_id: int, forecast_payload: dict) -> None:
     """
-    Post a forecast on a question.
+    Post a forecast on a question (batched with other questions' forecasts by metaculus_client).
     """
-    url = f"{API_BASE_URL}/questions/forecast/"
-    response = requests.post(
-        url,
-        json=[
-            {
-                "question": question_id,
-                **forecast_payload,
-            },
-        ],
-        **AUTH_HEADERS,  # type: ignore
-    )
-    print(f"Prediction Post status code: {response.status_code}")
-    if not response.ok:
-        raise RuntimeError(response.text)
+    await metaculus_client.submit_forecast(question_id, forecast_payload)
+    print(f"Prediction posted for question {question_id}")
 
 
 def create_forecast_payload(
@@ -136,82 +119,43 @@ def create_forecast_payload(
     }
 
 
-def list_posts_from_tournament(
+async def list_posts_from_tournament(
     tournament_id: int = TOURNAMENT_ID, offset: int = 0, count: int = 50
-) -> list[dict]:
+) -> dict:
     """
     List (all details) {count} posts from the {tournament_id}
     """
-    url_qparams = {
-        "limit": count,
-        "offset": offset,
-        "order_by": "-hotness",
-        "forecast_type": ",".join(
-            [
-                "binary",
-                "multiple_choice",
-                "numeric",
-            ]
-        ),
-        "tournaments": [tournament_id],
-        "statuses": "open",
-        "include_description": "true",
-    }
-    url = f"{API_BASE_URL}/posts/"
-    response = requests.get(url, **AUTH_HEADERS, params=url_qparams)  # type: ignore
-    if not response.ok:
-        raise Exception(response.text)
-    data = json.loads(response.content)
-    return data
+    return await metaculus_client.list_posts(tournament_id, offset, count)
 
-def get_question_details(question_id: int) -> dict:
-    url = f"https://www.metaculus.com/api/questions/{question_id}/"
-    response = requests.get(url, **AUTH_HEADERS)
-    if not response.ok:
-        print(f"Question extraction with url {url} failed")
-        raise Exception(response.text)
-    data = json.loads(response.content)
+async def get_question_details(question_id: int) -> dict:
+    data = await metaculus_client.get_question(question_id)
     print("Question data retrieved successfully")
     print(data)
     return data
 
-def get_open_question_ids_from_tournament() -> list[tuple[int, int]]:
-    posts = list_posts_from_tournament()
-
-    post_dict = dict()
-    for post in posts["results"]:
-        if question := post.get("question"):
-            # single question post
-            post_dict[post["id"]] = [question]
+async def get_open_questions_from_tournament(tournament_id: int = TOURNAMENT_ID) -> dict[tuple[int, int], dict]:
+    """
+    Open questions of the tournament (every page) as {(question_id, post_id): question details from the listing}.
+    """
+    open_questions = await metaculus_client.list_open_questions(tournament_id)
+    for question in open_questions.values():
+        print(
+            f"ID: {question['id']}\nQ: {question['title']}\nCloses: "
+            f"{question['scheduled_close_time']}"
+        )
+    return open_questions
 
-    open_question_id_post_id = []  # [(question_id, post_id)]
-    for post_id, questions in post_dict.items():
-        for question in questions:
-            if question.get("status") == "open":
-                print(
-                    f"ID: {question['id']}\nQ: {question['title']}\nCloses: "
-                    f"{question['scheduled_close_time']}"
-                )
-                open_question_id_post_id.append((question["id"], post_id))
 
-    return open_question_id_post_id
+async def get_open_question_ids_from_tournament() -> list[tuple[int, int]]:
+    return list(await get_open_questions_from_tournament())  # [(question_id, post_id)]
 
 
-def get_post_details(post_id: int) -> dict:
+async def get_post_details(post_id: int) -> dict:
     """
     Get all details about a post from the Metaculus API.
     """
-    url = f"{API_BASE_URL}/posts/{post_id}/"
-    print(f"Getting details for {url}")
-    response = requests.get(
-        url,
-        **AUTH_HEADERS,  # type: ignore
-    )
-    if not response.ok:
-        print(f"Post extraction with url {url} failed")
-        raise Exception(response.text)
-    details = json.loads(response.content)
-    return details
+    print(f"Getting details for post {post_id}")
+    return await metaculus_client.get_post(post_id)
 
 
 ################### FORECASTING ###################
@@ -227,22 +171,47 @@ async def forecast_individual_question(
     post_id: int,
     submit_prediction: bool,
     num_runs_per_question: int,
-    skip_previously_forecasted_questions: bool,
+    reforecast_mode: str,
 ) -> str:
     try:
-        post_details = get_post_details(post_id)
+        post_details = await get_post_details(post_id)
         question_details = post_details["question"]
     except KeyError:
         print(f"Fallback to question details API for question_id={question_id}")
-        question_details = get_question_details(question_id)
+        question_details = await get_question_details(question_id)
 
     title = question_details["title"]
     question_type = question_details["type"]
 
-    if forecast_is_already_made(question_details) and skip_previously_forecasted_questions:
+    # A previous run may have posted the forecast but died before posting the comment
+    checkpoint = checkpoint_store.question(question_details, question_type)
+    comment_pending = checkpoint.submitted("forecast") and not checkpoint.submitted("comment")
+
+    skip_reason = None
+    if forecast_is_already_made(question_details) and not comment_pending:
+        if reforecast_mode == "never":
+            skip_reason = "Forecast already made"
+        elif reforecast_mode == "incremental":
+            saved = checkpoint.load()
+            # Stages saved without a final forecast: an interrupted re-forecast, resume it as it is
+            if not saved or "forecast" in saved:
+                decision = await reforecast_decision(question_details)
+                print(f"Question {question_id}: {'re-forecasting' if decision.needed else 'keeping forecast'}, {decision.reason}")
+                if not decision.needed:
+                    skip_reason = f"Forecast already made and no new evidence ({decision.reason})"
+                elif saved:
+                    checkpoint_store.new_revision(question_id)
+                    checkpoint = checkpoint_store.question(question_details, question_type)
+
+    # A checkpoint whose forecast and comment were both posted is a finished run, not one to resume
+    if not skip_reason and checkpoint.submitted("forecast") and checkpoint.submitted("comment"):
+        checkpoint_store.new_revision(question_id)
+        checkpoint = checkpoint_store.question(question_details, question_type)
+
+    if skip_reason:
         summary_of_forecast = f"-----------------------------------------------\nQuestion: {title}\n"
         summary_of_forecast += f"URL: https://www.metaculus.com/questions/{post_id}/\n"
-        summary_of_forecast += "Skipped: Forecast already made\n"
+        summary_of_forecast += f"Skipped: {skip_reason}\n"
         return summary_of_forecast
 
     summary_of_forecast = f"-----------------------------------------------\nQuestion: {title}\n"
@@ -262,6 +231,7 @@ async def forecast_individual_question(
             summary_of_forecast += f"Options: {options}\n"
 
         # Forecasting per type
+        fresh_forecast = checkpoint.get("forecast") is None
         if question_type == "binary":
             forecast, comment = await binary_forecast(question_details, write=write_to_file)
             if forecast > 1:
@@ -273,6 +243,12 @@ async def forecast_individual_question(
         else:
             raise ValueError(f"Unknown question type: {question_type}")
 
+        # Fingerprint the research behind a fresh forecast while the comment is summarised
+        record_task = None
+        queries = checkpoint.get("current_queries")
+        if reforecast_mode == "incremental" and fresh_forecast and queries:
+            record_task = asyncio.create_task(record_research(question_details, queries))
+
         print(f"-----------------------------------------------\nPost {post_id} Question {question_id}:\n")
         print(f"Forecast for post {post_id} (question {question_id}):\n{forecast}")
         print(f"Comment for post {post_id} (question {question_id}):\n{comment}")
@@ -293,20 +269,32 @@ Forecast Explanation:
 {comment_str}
 """
 
-        try:
-            short_comment = await call_gpt(summary_prompt)
-        except Exception as e:
-            print(f"Summarization failed, using original comment. Error: {e}")
-            short_comment = comment_str
+        short_comment = checkpoint.get("summary")
+        if short_comment is None:
+            try:
+                short_comment = await call_gpt(summary_prompt)
+                checkpoint.save("summary", short_comment)
+            except Exception as e:
+                print(f"Summarization failed, using original comment. Error: {e}")
+                short_comment = comment_str
+
+        if record_task:
+            await record_task
 
         print(f"Forecast was retrieved successfully with value {forecast}")
         print(f"Forecast is of type {type(forecast)}")
 
         if submit_prediction:
-            forecast_payload = create_forecast_payload(forecast, question_type)
-            post_question_prediction(question_id, forecast_payload)
-            post_question_comment(post_id, short_comment)
-            summary_of_forecast += "Posted: Forecast was posted to Metaculus.\n"
+            # Only submit what an interrupted earlier run did not
+            if not checkpoint.submitted("forecast"):
+                forecast_payload = create_forecast_payload(forecast, question_type)
+                await post_question_prediction(question_id, forecast_payload)
+                checkpoint.mark_submitted("forecast")
+                summary_of_forecast += "Posted: Forecast was posted to Metaculus.\n"
+            if not checkpoint.submitted("comment"):
+                await post_question_comment(post_id, short_comment)
+                checkpoint.mark_submitted("comment")
+                summary_of_forecast += "Posted: Comment was posted to Metaculus.\n"
 
         write_to_file(summary_of_forecast)
 
@@ -318,19 +306,67 @@ async def forecast_questions(
     open_question_id_post_id: list[tuple[int, int]],
     submit_prediction: bool,
     num_runs_per_question: int,
-    skip_previously_forecasted_questions: bool,
+    reforecast_mode: str,
+    open_questions: Optional[dict[tuple[int, int], dict]] = None,
+    scheduler: Optional[QuestionScheduler] = None,
+    close_pools: bool = True,
 ) -> None:
-    forecast_tasks = [
-        forecast_individual_question(
-            question_id,
-            post_id,
+    """
+    Forecast every question through a QuestionScheduler (bounded, soonest-closing first).
+
+    open_questions (from get_open_questions_from_tournament) supplies the close times and
+    types used for ordering; without it questions run in the given order. Unless a
+    scheduler is passed in (the daemon owns its own and its signal handling), the first
+    SIGINT/SIGTERM drains the run (questions in flight finish, queued ones do not start)
+    and a second one cancels the questions in flight. With close_pools=False the HTTP
+    sessions, extraction workers and headless browser stay warm for the next call.
+    """
+    open_questions = open_questions or {}
+    jobs = [
+        QuestionJob.from_question(i, question_id, post_id, open_questions.get((question_id, post_id)))
+        for i, (question_id, post_id) in enumerate(open_question_id_post_id)
+    ]
+
+    async def forecast(job: QuestionJob) -> str:
+        return await forecast_individual_question(
+            job.question_id,
+            job.post_id,
             submit_prediction,
             num_runs_per_question,
-            skip_previously_forecasted_questions,
+            reforecast_mode,
         )
-        for question_id, post_id in open_question_id_post_id
-    ]
-    forecast_summaries = await asyncio.gather(*forecast_tasks, return_exceptions=True)
+
+    remove_signal_handlers = None
+    if scheduler is None:
+        scheduler = QuestionScheduler()
+
+        def on_signal():
+            if scheduler.draining:
+                scheduler.cancel()
+            else:
+                scheduler.drain()
+
+        remove_signal_handlers = add_stop_signal_handlers(on_signal)
+
+    try:
+        forecast_summaries = await scheduler.run(jobs, forecast)
+    finally:
+        if remove_signal_handlers:
+            remove_signal_handlers()
+        if close_pools:
+            # Keep-alive pools are shared by every question in the run; release them once at the end
+            await close_sessions()
+            await browser_pool.close()
+            await extraction_pool.close()
+    unhealthy = {k: v for k, v in circuit_breakers.status().items() if v["failures"] or v["rejected"]}
+    if unhealthy:
+        print(f"Provider health: {unhealthy}")
+    if prompt_cache_stats["prompt_tokens"]:
+        print(f"Prompt cache: {prompt_cache_stats['cache_read_tokens']}/{prompt_cache_stats['prompt_tokens']} "
+              f"prompt tokens served from provider caches over {prompt_cache_stats['calls']} calls")
+    extraction = extraction_pool.stats()["strategies"]
+    if extraction["pages"]:
+        print(f"Extraction strategies: {extraction}")
     print("\n", "#" * 100, "\nForecast Summaries\n", "#" * 100)
 
     errors = []
@@ -338,7 +374,11 @@ async def forecast_questions(
         open_question_id_post_id, forecast_summaries
     ):
         question_id, post_id = question_id_post_id
-        if isinstance(forecast_summary, Exception):
+        if isinstance(forecast_summary, QuestionNotStarted):
+            print(
+                f"-----------------------------------------------\nPost {post_id} Question {question_id}:\nSkipped: run was drained before this question started\nURL: https://www.metaculus.com/questions/{post_id}/\n"
+            )
+        elif isinstance(forecast_summary, BaseException):
             print(
                 f"-----------------------------------------------\nPost {post_id} Question {question_id}:\nError: {forecast_summary.__class__.__name__} {forecast_summary}\nURL: https://www.metaculus.com/questions/{post_id}/\n"
             )
@@ -355,20 +395,56 @@ async def forecast_questions(
 
 
 
+async def forecast_tournament(scheduler: Optional[QuestionScheduler] = None, close_pools: bool = True) -> None:
+    """
+    One run over the tournament's open questions (or EXAMPLE_QUESTIONS).
+    """
+    if USE_EXAMPLE_QUESTIONS:
+        open_question_id_post_id = EXAMPLE_QUESTIONS
+        open_questions = None
+    else:
+        open_questions = await get_open_questions_from_tournament()
+        open_question_id_post_id = list(open_questions)
+
+    await forecast_questions(
+        open_question_id_post_id,
+        SUBMIT_PREDICTION,
+        NUM_RUNS_PER_QUESTION,
+        REFORECAST_MODE,
+        open_questions,
+        scheduler=scheduler,
+        close_pools=close_pools,
+    )
+
+
+async def run_daemon() -> None:
+    """
+    Forecast the tournament every DAEMON_INTERVAL_MINUTES in one warm process (see daemon.py).
+    """
+    from daemon import BotDaemon  # aiohttp.web is only needed in daemon mode
+
+    daemon = BotDaemon(
+        cycle=lambda scheduler: forecast_tournament(scheduler, close_pools=False),
+        warm_up=[browser_pool.start, extraction_pool.start],
+        shutdown=[close_sessions, browser_pool.close, extraction_pool.close],
+        stats={
+            "browser": browser_pool.stats,
+            "extraction": extraction_pool.stats,
+            "metaculus": metaculus_client.stats,
+            "circuit_breakers": circuit_breakers.status,
+            "prompt_cache": lambda: dict(prompt_cache_stats),
+        },
+    )
+    await daemon.run()
+
+
 ######################## FINAL RUN #########################
 if __name__ == "__main__":
     if not RUN:
         exit()
-    if USE_EXAMPLE_QUESTIONS:
-        open_question_id_post_id = EXAMPLE_QUESTIONS
-    else:
-        open_question_id_post_id = get_open_question_ids_from_tournament()
-
-    asyncio.run(
-        forecast_questions(
-            open_question_id_post_id,
-            SUBMIT_PREDICTION,
-            NUM_RUNS_PER_QUESTION,
-            SKIP_PREVIOUSLY_FORECASTED_QUESTIONS,
-        )
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Forecast the open questions of the Metaculus tournament")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and forecast the tournament every DAEMON_INTERVAL_MINUTES")
+    args = parser.parse_args()
+
+    asyncio.run(run_daemon() if args.daemon else forecast_tournament())
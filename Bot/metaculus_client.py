@@ -0,0 +1,232 @@
+"""
+Async client for the Metaculus API.
+
+All Metaculus traffic goes through the pooled aiohttp session for the API host
+(http_sessions), so fetching posts or submitting a forecast never blocks the event
+loop and the other questions' pipelines keep running.
+
+- list_open_questions() reads the first page of tournament posts, then fetches
+  the remaining pages concurrently using the total count the API reports
+- get_post() sends If-None-Match with the ETag of the last copy it saw; a 304 is
+  answered from that copy
+- submit_forecast() queues the payload and sends every forecast queued within
+  METACULUS_BATCH_WINDOW seconds in a single POST /questions/forecast/ (the
+  endpoint takes a list); if a batch is rejected, its forecasts are resubmitted
+  one by one, so each caller gets its own success or error and one bad payload
+  (e.g. a question that closed meanwhile) does not fail the others
+- 429 and 5xx answers are retried with backoff (honouring Retry-After), except
+  comment creation on 5xx, which may already have gone through
+
+Configured with environment variables:
+- METACULUS_TOKEN: API token
+- METACULUS_PAGE_SIZE: posts per page when listing a tournament (default 50)
+- METACULUS_BATCH_WINDOW: seconds forecasts are collected before a batch is sent (default 1)
+- METACULUS_BATCH_SIZE: forecasts per POST at most (default 20)
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+import aiohttp
+from dotenv import load_dotenv
+
+from endpoints import METACULUS_API_BASE_URL
+from http_sessions import get_session
+from llm_client import parse_retry_after
+
+load_dotenv()
+
+METACULUS_TOKEN = os.getenv("METACULUS_TOKEN")
+METACULUS_PAGE_SIZE = int(os.getenv("METACULUS_PAGE_SIZE", "50"))
+METACULUS_BATCH_WINDOW = float(os.getenv("METACULUS_BATCH_WINDOW", "1"))
+METACULUS_BATCH_SIZE = int(os.getenv("METACULUS_BATCH_SIZE", "20"))
+METACULUS_TIMEOUT = 60
+METACULUS_MAX_ATTEMPTS = 4
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def write(x):
+    print(x)
+
+
+class MetaculusAPIError(RuntimeError):
+    def __init__(self, status: int, url: str, body: str):
+        super().__init__(f"Metaculus API returned HTTP {status} for {url}: {body[:500]}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+class MetaculusClient:
+    """Pooled, non-blocking access to the Metaculus endpoints the bot uses."""
+
+    def __init__(self, base_url: str = METACULUS_API_BASE_URL, token: Optional[str] = METACULUS_TOKEN):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        # post id -> (ETag, post) of the last full response
+        self._etags: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        self._pending: List[Tuple[int, Dict[str, Any], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # The loop only holds weak references to tasks; these keep full batches alive until posted
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.not_modified = 0
+        self.batches = 0
+        self.split_batches = 0
+
+    async def _request(self, method: str, path: str, retry_server_errors: bool = True,
+                       headers: Optional[Dict[str, str]] = None, **kwargs) -> Tuple[int, Mapping[str, str], str]:
+        url = f"{self.base_url}/{path}"
+        headers = {"Authorization": f"Token {self.token}", **(headers or {})}
+        for attempt in range(1, METACULUS_MAX_ATTEMPTS + 1):
+            self.requests += 1
+            try:
+                async with get_session(url).request(
+                    method, url, headers=headers, timeout=aiohttp.ClientTimeout(total=METACULUS_TIMEOUT), **kwargs
+                ) as response:
+                    status, response_headers, body = response.status, response.headers.copy(), await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == METACULUS_MAX_ATTEMPTS or not retry_server_errors:
+                    raise
+                write(f"[metaculus] {method} {path} failed ({e!r}), retrying")
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            retryable = status == 429 or (retry_server_errors and status in RETRYABLE_STATUSES)
+            if status < 400 or not retryable or attempt == METACULUS_MAX_ATTEMPTS:
+                if status >= 400:
+                    raise MetaculusAPIError(status, url, body)
+                return status, response_headers, body
+            delay = parse_retry_after(response_headers.get("Retry-After")) or 2 ** attempt
+            write(f"[metaculus] {method} {path} returned HTTP {status}, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    async def _get_json(self, path: str, **kwargs) -> Any:
+        _, _, body = await self._request("GET", path, **kwargs)
+        return json.loads(body)
+
+    ######################### READS #########################
+
+    async def list_posts(self, tournament_id: int, offset: int = 0, count: int = METACULUS_PAGE_SIZE) -> Dict[str, Any]:
+        """One page of open binary/multiple choice/numeric posts of a tournament."""
+        params = {
+            "limit": count,
+            "offset": offset,
+            "order_by": "-hotness",
+            "forecast_type": "binary,multiple_choice,numeric",
+            "tournaments": tournament_id,
+            "statuses": "open",
+            "include_description": "true",
+        }
+        return await self._get_json("posts/", params=params)
+
+    async def list_all_posts(self, tournament_id: int, page_size: int = METACULUS_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Every open post of a tournament; pages after the first are fetched concurrently."""
+        first = await self.list_posts(tournament_id, 0, page_size)
+        posts = list(first.get("results", []))
+        total = first.get("count")
+        if total is None:
+            # No total reported: walk the pages one at a time while the API says there is more
+            offset = page_size
+            page = first
+            while page.get("next"):
+                page = await self.list_posts(tournament_id, offset, page_size)
+                posts += page.get("results", [])
+                offset += page_size
+            return posts
+
+        pages = await asyncio.gather(*[
+            self.list_posts(tournament_id, offset, page_size) for offset in range(page_size, total, page_size)
+        ])
+        for page in pages:
+            posts += page.get("results", [])
+        return posts
+
+    async def list_open_questions(self, tournament_id: int) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Open questions of a tournament as {(question_id, post_id): question details from the listing}."""
+        open_questions = {}
+        for post in await self.list_all_posts(tournament_id):
+            question = post.get("question")  # single question posts only
+            if question and question.get("status") == "open":
+                open_questions[(question["id"], post["id"])] = question
+        return open_questions
+
+    async def get_post(self, post_id: int) -> Dict[str, Any]:
+        """Post details; unchanged posts are served from the last copy via ETag."""
+        cached = self._etags.get(post_id)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        status, response_headers, body = await self._request("GET", f"posts/{post_id}/", headers=headers)
+        if status == 304 and cached:
+            self.not_modified += 1
+            return cached[1]
+        post = json.loads(body)
+        if response_headers.get("ETag"):
+            self._etags[post_id] = (response_headers["ETag"], post)
+        return post
+
+    async def get_question(self, question_id: int) -> Dict[str, Any]:
+        return await self._get_json(f"questions/{question_id}/")
+
+    ######################### WRITES #########################
+
+    async def submit_forecasts(self, forecasts: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """POST several (question_id, payload) forecasts in one request."""
+        await self._request(
+            "POST", "questions/forecast/",
+            json=[{"question": question_id, **payload} for question_id, payload in forecasts],
+        )
+
+    async def submit_forecast(self, question_id: int, payload: Dict[str, Any]) -> None:
+        """Queue a forecast for the next batch and wait until that batch has been posted."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((question_id, payload, future))
+        if len(self._pending) >= METACULUS_BATCH_SIZE:
+            batch, self._pending = self._pending, []
+            task = asyncio.create_task(self._flush(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after(METACULUS_BATCH_WINDOW))
+        await future
+
+    async def _flush_after(self, delay: float) -> None:
+        # Whatever else is queued during the window goes out in the same batch
+        await asyncio.sleep(delay)
+        batch, self._pending = self._pending, []
+        await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[int, Dict[str, Any], asyncio.Future]]) -> None:
+        if not batch:
+            return
+        self.batches += 1
+        write(f"[metaculus] Submitting {len(batch)} forecasts: {[question_id for question_id, _, _ in batch]}")
+        try:
+            await self.submit_forecasts([(question_id, payload) for question_id, payload, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][2].done():
+                    batch[0][2].set_exception(e)
+                return
+            write(f"[metaculus] Batch of {len(batch)} forecasts failed ({e!r}), resubmitting them one by one")
+            self.split_batches += 1
+            await asyncio.gather(*[self._flush([item]) for item in batch])
+        else:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def post_comment(self, post_id: int, text: str) -> None:
+        """Private comment on a post; not retried on 5xx so it is never posted twice."""
+        await self._request(
+            "POST", "comments/create/", retry_server_errors=False,
+            json={"text": text, "parent": None, "included_forecast": True, "is_private": True, "on_post": post_id},
+        )
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "not_modified": self.not_modified, "batches": self.batches,
+                "split_batches": self.split_batches}
+
+
+metaculus_client = MetaculusClient()
@@ -0,0 +1,533 @@
+"""
+Local stand-in for every external service the bot calls, for offline load tests and profiling.
+
+Serves the Metaculus API, the Metaculus LLM proxy (Anthropic + OpenAI), OpenRouter, OpenAI,
+Serper, Bright Data, Perplexity and AskNews under path prefixes that match endpoints.py, so
+pointing the bot at it only takes MOCK_SERVER_URL:
+
+    python mock_server.py --port 8900 &
+    MOCK_SERVER_URL=http://127.0.0.1:8900 python main.py
+
+Modes:
+- synthetic: every response is generated from the request. LLM answers follow the format the
+  prompt asks for (search queries, "Probability: ZZ%", "Probabilities: [...]", percentiles),
+  so the pipeline runs end to end.
+- record:    requests are forwarded to the real services (using the caller's own keys) and
+  the responses are appended to the recordings file.
+- replay:    recorded responses are served by request fingerprint; a miss falls back to a
+  synthetic response.
+
+Every response waits for a latency drawn from a per-service log-normal distribution and
+fails with the service's error rate (429/500/503), both configurable with --profile, a JSON
+file such as {"openrouter": {"median": 5, "sigma": 0.5, "error_rate": 0.05}}.
+--latency-scale multiplies every latency (0 makes the server answer immediately).
+"""
+
+import argparse
+import asyncio
+import ast
+import datetime
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import uuid
+from typing import Any, Dict, Optional
+
+import aiohttp
+from aiohttp import web
+
+from endpoints import SERVICES
+
+
+def write(x):
+    print(x)
+
+
+# Seconds; median and log-normal sigma per service, plus the share of requests that fail
+DEFAULT_PROFILES = {
+    "metaculus": {"median": 0.3, "sigma": 0.3, "error_rate": 0.0},
+    "metaculus-proxy": {"median": 40, "sigma": 0.6, "error_rate": 0.02},
+    "openrouter": {"median": 25, "sigma": 0.6, "error_rate": 0.02},
+    "openai": {"median": 30, "sigma": 0.6, "error_rate": 0.02},
+    "serper": {"median": 0.8, "sigma": 0.4, "error_rate": 0.01},
+    "perplexity": {"median": 60, "sigma": 0.5, "error_rate": 0.02},
+    "brightdata": {"median": 3, "sigma": 0.7, "error_rate": 0.05},
+    "asknews": {"median": 1.5, "sigma": 0.4, "error_rate": 0.01},
+    "asknews-auth": {"median": 0.2, "sigma": 0.2, "error_rate": 0.0},
+    "pages": {"median": 0.2, "sigma": 0.3, "error_rate": 0.0},
+}
+ERROR_STATUSES = (429, 500, 503)
+# Share of an LLM response's latency spent before the first streamed token
+TTFT_SHARE = 0.3
+
+SYNTHETIC_QUESTIONS = [
+    {
+        "id": 900001,
+        "type": "binary",
+        "title": "Will the synthetic index close above 100 by the end of the year?",
+    },
+    {
+        "id": 900002,
+        "type": "multiple_choice",
+        "title": "Which synthetic party will win the most seats in the next election?",
+        "options": ["Party A", "Party B", "Party C", "Other"],
+    },
+    {
+        "id": 900003,
+        "type": "numeric",
+        "title": "What will the synthetic unemployment rate be in December?",
+        "scaling": {"range_min": 2.0, "range_max": 12.0, "zero_point": None},
+        "open_lower_bound": True,
+        "open_upper_bound": True,
+        "unit": "%",
+    },
+]
+
+
+######################### SYNTHETIC CONTENT #########################
+
+def _rng(seed_text: str) -> random.Random:
+    """Deterministic randomness per request, so repeated runs see the same answers."""
+    return random.Random(hashlib.sha256(seed_text.encode("utf-8")).hexdigest())
+
+
+def _sentences(rng: random.Random, n: int) -> str:
+    subjects = ["Analysts", "Officials", "Recent polls", "Market data", "Historical records", "Experts"]
+    verbs = ["suggest", "indicate", "point to", "are consistent with", "do not rule out"]
+    objects = ["a gradual continuation of the current trend", "a modest reversal later this year",
+               "elevated uncertainty around the deadline", "a base rate of roughly one in three",
+               "little change from the status quo"]
+    return " ".join(f"{rng.choice(subjects)} {rng.choice(verbs)} {rng.choice(objects)}." for _ in range(n))
+
+
+def synthetic_completion(prompt: str) -> str:
+    """An answer in whatever format `prompt` asks for."""
+    rng = _rng(prompt)
+    analysis = _sentences(rng, 8)
+
+    if "Article to summarize" in prompt:
+        return _sentences(rng, 5)
+
+    if "Search queries:" in prompt and "Previous search queries used" not in prompt and "Probabilit" not in prompt \
+            and "Percentile" not in prompt:
+        topics = ["base rate", "latest news", "official statement", "expert forecast", "historical data"]
+        sources = ["Google", "Google News", "Assistant", "Google", "Agent"]
+        if "Agent" not in prompt:
+            sources = ["Google", "Google News", "Assistant", "Google", "Google News"]
+        queries = "\n".join(f"{i + 1}. \"{topic} {rng.randint(1, 99)}\" ({source})"
+                            for i, (topic, source) in enumerate(zip(topics, sources)))
+        return f"Analysis:\n{analysis}\n\nSearch queries:\n{queries}\n"
+
+    if "Previous search queries used" in prompt:
+        return f"Analysis:\n{analysis}\n"
+
+    if "Percentile" in prompt:
+        hint = re.search(r"above\s+(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?)\s+and below\s+(-?\d+(?:\.\d+)?(?:e[+-]?\d+)?)", prompt)
+        low, high = (float(hint.group(1)), float(hint.group(2))) if hint else (0.0, 100.0)
+        keys = [1, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 99]
+        center = rng.uniform(0.35, 0.65)
+        spread = rng.uniform(0.1, 0.25)
+        lines = []
+        for k in keys:
+            # Inverse logistic keeps the values strictly increasing inside the range
+            z = math.log(k / (100 - k))
+            value = low + (high - low) * min(0.999, max(0.001, center + spread * z / 4.6))
+            lines.append(f"Percentile {k}: {value:.4g}")
+        return f"Analysis:\n{analysis}\n\nChecklist:\nOK\n\nDistribution:\n" + "\n".join(lines) + "\n"
+
+    if "Probabilities:" in prompt:
+        options = re.search(r"appear in (\[.*?\])", prompt, re.DOTALL)
+        try:
+            count = len(ast.literal_eval(options.group(1))) if options else 4
+        except (ValueError, SyntaxError):
+            count = 4
+        weights = [rng.uniform(1, 10) for _ in range(count)]
+        probs = [round(100 * w / sum(weights)) for w in weights]
+        probs[-1] = 100 - sum(probs[:-1])
+        return f"Analysis:\n{analysis}\n\nChecklist:\nOK\n\nProbabilities: [{', '.join(str(max(1, p)) for p in probs)}]\n"
+
+    if "Probability:" in prompt:
+        return f"Analysis:\n{analysis}\n\nChecklist:\nOK\n\nProbability: {rng.randint(5, 95)}%\n"
+
+    return analysis
+
+
+def synthetic_article_html(slug: str, base_url: str) -> str:
+    rng = _rng(slug)
+    paragraphs = "\n".join(f"<p>{_sentences(rng, 6)}</p>" for _ in range(8))
+    return (
+        f"<!DOCTYPE html><html><head><title>Synthetic article {slug}</title>"
+        f"<meta property=\"article:published_time\" content=\"{datetime.date.today().isoformat()}\"></head>"
+        f"<body><nav><a href=\"{base_url}/\">Home</a></nav>"
+        f"<article><h1>Synthetic article {slug}</h1>{paragraphs}</article>"
+        f"<footer>Mock server</footer></body></html>"
+    )
+
+
+# Fixed for the server's lifetime so unchanged posts keep their ETag
+SYNTHETIC_CLOSE_TIME = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=7)).isoformat()
+
+
+def synthetic_question(question: Dict[str, Any]) -> Dict[str, Any]:
+    details = {
+        "status": "open",
+        "description": "A synthetic question served by mock_server.py.",
+        "resolution_criteria": "Resolves according to the synthetic source.",
+        "fine_print": "",
+        "scheduled_close_time": SYNTHETIC_CLOSE_TIME,
+        "resolution_date": (datetime.date.today() + datetime.timedelta(days=60)).isoformat(),
+        "my_forecasts": {"latest": None},
+    }
+    details.update(question)
+    return details
+
+
+######################### SERVER #########################
+
+class MockServer:
+    """aiohttp application emulating the bot's upstream services."""
+
+    def __init__(self, mode: str = "synthetic", recordings: Optional[str] = None,
+                 profiles: Optional[Dict[str, Dict[str, float]]] = None, latency_scale: float = 1.0,
+                 seed: Optional[int] = None):
+        self.mode = mode
+        self.recordings_path = recordings
+        self.profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+        for name, overrides in (profiles or {}).items():
+            self.profiles.setdefault(name, dict(DEFAULT_PROFILES["pages"])).update(overrides)
+        self.latency_scale = latency_scale
+        self.random = random.Random(seed)
+        self.recorded: Dict[str, Dict[str, Any]] = {}
+        # question id -> latest forecast payload posted to the synthetic Metaculus
+        self.forecasts: Dict[int, Dict[str, Any]] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.base_url = ""
+        if recordings and os.path.exists(recordings):
+            with open(recordings, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.recorded[entry["key"]] = entry
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/{service}/{path:.*}", self.handle)
+        return app
+
+    def _count(self, service: str, outcome: str) -> None:
+        self.stats.setdefault(service, {}).setdefault(outcome, 0)
+        self.stats[service][outcome] += 1
+
+    def latency(self, service: str) -> float:
+        profile = self.profiles.get(service, self.profiles["pages"])
+        return self.latency_scale * self.random.lognormvariate(math.log(profile["median"]), profile["sigma"])
+
+    @staticmethod
+    def fingerprint(service: str, path: str, request: web.Request, body: bytes) -> str:
+        query = sorted((k, v) for k, v in request.query.items())
+        blob = json.dumps([service, request.method, path, query,
+                           body.decode("utf-8", errors="replace")])
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        service = request.match_info["service"]
+        path = request.match_info["path"]
+        if service == "v1":
+            # The AskNews SDK joins absolute endpoint paths onto the host, dropping our prefix
+            service, path = "asknews", f"v1/{path}"
+        if service not in self.profiles:
+            raise web.HTTPNotFound(text=f"Unknown mock service {service!r}")
+        self.base_url = f"{request.scheme}://{request.host}"
+        body = await request.read()
+        key = self.fingerprint(service, path, request, body)
+
+        if self.mode == "record":
+            return await self.record(service, path, request, body, key)
+
+        profile = self.profiles[service]
+        if self.random.random() < profile.get("error_rate", 0):
+            await asyncio.sleep(self.latency(service) * 0.2)
+            status = self.random.choice(ERROR_STATUSES)
+            self._count(service, str(status))
+            return web.json_response({"error": {"code": status, "message": "injected by mock_server"}},
+                                     status=status, headers={"Retry-After": "1"} if status == 429 else None)
+
+        latency = self.latency(service)
+        if self.mode == "replay" and key in self.recorded:
+            entry = self.recorded[key]
+            await asyncio.sleep(latency)
+            self._count(service, "replayed")
+            return web.Response(status=entry["status"], body=entry["body"].encode("utf-8"),
+                                content_type=entry["content_type"].split(";")[0])
+
+        self._count(service, "synthetic")
+        payload = json.loads(body) if body and request.content_type == "application/json" else {}
+        return await self.synthetic(service, path, request, payload, latency)
+
+    async def record(self, service: str, path: str, request: web.Request, body: bytes, key: str) -> web.Response:
+        upstream = SERVICES[service][1] if service != "pages" else None
+        if upstream is None:
+            return await self.synthetic(service, path, request, {}, 0)
+        url = upstream.rstrip("/") + "/" + path
+        if service in ("brightdata", "asknews-auth"):
+            # These endpoints are configured as full URLs rather than base URLs
+            url = upstream
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "content-length")}
+        async with aiohttp.ClientSession() as session:
+            async with session.request(request.method, url, params=request.query, data=body,
+                                       headers=headers) as response:
+                text = await response.text()
+                content_type = response.headers.get("Content-Type", "application/json")
+                status = response.status
+        if self.recordings_path and status < 400:
+            entry = {"key": key, "service": service, "path": path,
+                     "status": status, "content_type": content_type, "body": text}
+            self.recorded[key] = entry
+            with open(self.recordings_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        self._count(service, "recorded")
+        return web.Response(status=status, text=text, content_type=content_type.split(";")[0])
+
+    ######################### SYNTHETIC HANDLERS #########################
+
+    async def synthetic(self, service: str, path: str, request: web.Request, payload: Dict[str, Any],
+                        latency: float) -> web.StreamResponse:
+        if service in ("openrouter", "openai", "perplexity") or (service == "metaculus-proxy" and "openai" in path):
+            if path.endswith("responses"):
+                return await self.openai_responses(payload, latency)
+            return await self.chat_completion(request, payload, latency)
+        if service == "metaculus-proxy":
+            return await self.anthropic_messages(request, payload, latency)
+
+        await asyncio.sleep(latency)
+        if service == "serper":
+            return self.serper(path, payload)
+        if service == "brightdata":
+            return web.Response(text=synthetic_article_html(payload.get("url", "x"), self.base_url),
+                                content_type="text/html")
+        if service == "pages":
+            return web.Response(text=synthetic_article_html(self.base_url + "/pages/" + path, self.base_url),
+                                content_type="text/html")
+        if service == "asknews-auth":
+            return web.json_response({"access_token": "mock-token", "token_type": "Bearer",
+                                      "expires_in": 3600, "scope": "news"})
+        if service == "asknews":
+            return self.asknews(request)
+        if service == "metaculus":
+            return self.metaculus(request, path, payload)
+        raise web.HTTPNotFound()
+
+    @staticmethod
+    def _prompt_of(payload: Dict[str, Any]) -> str:
+        parts = []
+        for message in payload.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, list):
+                parts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+            elif content:
+                parts.append(str(content))
+        return "\n".join(parts)
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> Dict[str, int]:
+        return {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                "total_tokens": (len(prompt) + len(text)) // 4}
+
+    async def _stream(self, request: web.Request, events, latency: float) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await asyncio.sleep(latency * TTFT_SHARE)
+        pause = latency * (1 - TTFT_SHARE) / max(1, len(events))
+        try:
+            for event in events:
+                await response.write(event.encode("utf-8"))
+                await asyncio.sleep(pause)
+            await response.write_eof()
+        except ConnectionResetError:
+            # The client stopped reading once the answer was complete
+            pass
+        return response
+
+    async def chat_completion(self, request: web.Request, payload: Dict[str, Any],
+                              latency: float) -> web.StreamResponse:
+        prompt = self._prompt_of(payload)
+        text = synthetic_completion(prompt)
+        model = payload.get("model", "mock")
+        usage = self._usage(prompt, text)
+        if payload.get("stream"):
+            chunks = [text[i:i + 200] for i in range(0, len(text), 200)]
+            events = [f"data: {json.dumps({'model': model, 'choices': [{'index': 0, 'delta': {'content': c}}]})}\n\n"
+                      for c in chunks]
+            events.append(f"data: {json.dumps({'model': model, 'choices': [], 'usage': usage})}\n\n")
+            events.append("data: [DONE]\n\n")
+            return await self._stream(request, events, latency)
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(datetime.datetime.now().timestamp()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": usage,
+        })
+
+    async def openai_responses(self, payload: Dict[str, Any], latency: float) -> web.Response:
+        prompt = payload.get("input") if isinstance(payload.get("input"), str) else json.dumps(payload.get("input"))
+        text = synthetic_completion(prompt)
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "created_at": int(datetime.datetime.now().timestamp()),
+            "model": payload.get("model", "mock"),
+            "status": "completed",
+            "output": [{
+                "type": "message", "id": f"msg_{uuid.uuid4().hex[:12]}", "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                      "total_tokens": (len(prompt) + len(text)) // 4},
+        })
+
+    async def anthropic_messages(self, request: web.Request, payload: Dict[str, Any],
+                                 latency: float) -> web.StreamResponse:
+        prompt = self._prompt_of(payload)
+        text = synthetic_completion(prompt)
+        thinking = "Weighing the base rate against the latest evidence."
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4}
+        if payload.get("stream"):
+            events = [
+                {"type": "message_start", "message": {"usage": {"input_tokens": usage["input_tokens"]}}},
+                {"type": "content_block_start", "index": 0, "content_block": {"type": "thinking"}},
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "thinking_delta", "thinking": thinking}},
+                {"type": "content_block_start", "index": 1, "content_block": {"type": "text"}},
+            ]
+            events += [{"type": "content_block_delta", "index": 1, "delta": {"type": "text_delta", "text": text[i:i + 200]}}
+                       for i in range(0, len(text), 200)]
+            events += [{"type": "message_delta", "usage": {"output_tokens": usage["output_tokens"]}},
+                       {"type": "message_stop"}]
+            return await self._stream(
+                request, [f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events], latency)
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": payload.get("model", "mock"),
+            "content": [{"type": "thinking", "thinking": thinking}, {"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": usage,
+        })
+
+    def serper(self, path: str, payload: Dict[str, Any]) -> web.Response:
+        query = payload.get("q", "")
+        rng = _rng(query)
+        items = []
+        for i in range(min(int(payload.get("num", 10)), 12)):
+            slug = f"{re.sub(r'[^a-z0-9]+', '-', query.lower()).strip('-')}-{i}"
+            day = datetime.date.today() - datetime.timedelta(days=rng.randint(1, 60))
+            items.append({
+                "title": f"{query} ({i + 1})",
+                "link": f"{self.base_url}/pages/{slug}",
+                "snippet": _sentences(rng, 1),
+                "date": day.strftime("%b %d, %Y"),
+                "position": i + 1,
+            })
+        return web.json_response({"news" if path.startswith("news") else "organic": items})
+
+    def asknews(self, request: web.Request) -> web.Response:
+        query = request.query.get("query", "")
+        rng = _rng(query + request.query.get("method", "") + request.query.get("historical", ""))
+        articles = []
+        for i in range(int(request.query.get("n_articles", 8))):
+            published = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=rng.randint(1, 24 * 30))
+            articles.append({
+                "article_url": f"{self.base_url}/pages/asknews-{i}",
+                "article_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "classification": "Politics",
+                "country": "US",
+                "source_id": "mock-news",
+                "page_rank": 1,
+                "domain_url": self.base_url,
+                "eng_title": f"{query} ({i + 1})",
+                "entities": {},
+                "keywords": [query],
+                "language": "en",
+                "pub_date": published.isoformat(),
+                "summary": _sentences(rng, 3),
+                "title": f"{query} ({i + 1})",
+                "sentiment": 0,
+                "as_string_key": str(i),
+            })
+        return web.json_response({"as_dicts": articles, "as_string": "", "offset": 0})
+
+    def metaculus(self, request: web.Request, path: str, payload: Any) -> web.Response:
+        path = path[len("api/"):] if path.startswith("api/") else path
+        if request.method == "POST":
+            if path.rstrip("/") == "questions/forecast" and isinstance(payload, list):
+                for forecast in payload:
+                    self.forecasts[forecast["question"]] = forecast
+            return web.json_response({}, status=201)
+        by_id = {q["id"]: q for q in SYNTHETIC_QUESTIONS}
+        if path.rstrip("/") == "posts":
+            offset = int(request.query.get("offset", 0))
+            limit = int(request.query.get("limit", 50))
+            page = SYNTHETIC_QUESTIONS[offset:offset + limit]
+            return web.json_response({
+                "count": len(SYNTHETIC_QUESTIONS),
+                "next": f"{self.base_url}/metaculus/api/posts/?offset={offset + limit}&limit={limit}"
+                        if offset + limit < len(SYNTHETIC_QUESTIONS) else None,
+                "results": [{"id": q["id"], "question": synthetic_question(q)} for q in page],
+            })
+        match = re.match(r"(posts|questions)/(\d+)/?$", path)
+        if match and int(match.group(2)) in by_id:
+            question = synthetic_question(by_id[int(match.group(2))])
+            if question["id"] in self.forecasts:
+                forecast = self.forecasts[question["id"]]
+                question["my_forecasts"] = {"latest": {"forecast_values": forecast.get("continuous_cdf")
+                                                       or forecast.get("probability_yes_per_category")
+                                                       or [1 - forecast["probability_yes"], forecast["probability_yes"]]}}
+            body = json.dumps({"id": question["id"], "question": question}
+                              if match.group(1) == "posts" else question)
+            etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:16] + '"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+        raise web.HTTPNotFound()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay mock of the bot's external services")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--recordings", default=os.path.join(os.path.dirname(__file__), "..", ".cache",
+                                                             "mock_recordings.jsonl"))
+    parser.add_argument("--profile", help="JSON file of per-service latency/error overrides")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    profiles = None
+    if args.profile:
+        with open(args.profile, encoding="utf-8") as f:
+            profiles = json.load(f)
+    if args.mode == "record":
+        os.makedirs(os.path.dirname(os.path.abspath(args.recordings)), exist_ok=True)
+
+    server = MockServer(args.mode, args.recordings, profiles, args.latency_scale, args.seed)
+    write(f"Mock server ({args.mode}) on http://{args.host}:{args.port}; "
+          f"run the bot with MOCK_SERVER_URL=http://{args.host}:{args.port}")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
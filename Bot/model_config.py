@@ -21,6 +21,15 @@ DEFAULT_MODEL_CONFIG = {
     "forecaster_5": "x-ai/grok-4-fast"
 }
 
+# Substitute used for a forecaster while its model's circuit breaker is open
+DEFAULT_SUBSTITUTE_MODELS = {
+    "forecaster_1": "anthropic/claude-3.5-haiku",
+    "forecaster_2": "google/gemini-2.5-pro",
+    "forecaster_3": "openai/gpt-4o",
+    "forecaster_4": "openai/gpt-4o-mini",
+    "forecaster_5": "x-ai/grok-4"
+}
+
 # Alternative model options (you can easily switch to these)
 ALTERNATIVE_MODELS = {
     # Claude models
@@ -84,6 +93,24 @@ def get_forecaster_model(forecaster_id: int) -> str:
     config = get_model_config()
     return config.get(f"forecaster_{forecaster_id}", DEFAULT_MODEL_CONFIG[f"forecaster_{forecaster_id}"])
 
+def get_substitute_model(forecaster_id: int) -> Optional[str]:
+    """
+    Get the model to reroute a forecaster to while its configured model is unavailable.
+
+    Override with FORECASTER_<N>_SUBSTITUTE_MODEL; set it to "none" to fail fast instead.
+
+    Args:
+        forecaster_id: Forecaster number (1-5)
+
+    Returns:
+        Substitute model name, or None if rerouting is disabled
+    """
+    substitute = os.getenv(f"FORECASTER_{forecaster_id}_SUBSTITUTE_MODEL",
+                           DEFAULT_SUBSTITUTE_MODELS.get(f"forecaster_{forecaster_id}"))
+    if not substitute or substitute.lower() == "none":
+        return None
+    return substitute
+
 def set_forecaster_model(forecaster_id: int, model: str) -> None:
     """
     Set the model for a specific forecaster (runtime only, not persistent).
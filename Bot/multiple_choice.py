@@ -12,6 +12,10 @@ from prompts import (
 )
 from llm_calls import call_claude, call_gpt_o3, call_gpt_o4_mini
 from search import process_search_queries
+from pipeline import forecast_graph, run_forecast
+
+# Step-1 outputs each forecaster's step-2 prompt reads (forecasters 2 and 3 swap outside views)
+STEP2_DEPENDENCIES = {1: (1,), 2: (3,), 3: (2,), 4: (4,), 5: (5,)}
 
 def extract_option_probabilities_from_response(forecast_text: str, num_options: int) -> list[float]:
     matches = re.findall(r"Probabilities:\s*\[([0-9.,\s]+)\]", forecast_text)
@@ -23,6 +27,13 @@ def extract_option_probabilities_from_response(forecast_text: str, num_options:
         raise ValueError(f"Expected {num_options} probabilities, got {len(numbers)}: {numbers}")
     return numbers
 
+def option_probabilities_answer_ready(forecast_text: str) -> bool:
+    """True once the closing bracket of the final 'Probabilities: [...]' list has streamed in."""
+    if "Checklist:" not in forecast_text:
+        return False
+    tail = forecast_text.rsplit("Checklist:", 1)[1]
+    return re.search(r"Probabilities:\s*\[([0-9.,\s]+)\]", tail) is not None
+
 def normalize_probabilities(probs: list[float]) -> list[float]:
     probs = [max(min(p, 99), 1) for p in probs]
     total = sum(probs)
@@ -50,101 +61,98 @@ async def get_multiple_choice_forecast(question_details: dict, write=print) -> t
         )
         return content, await call_gpt_o3(content)
 
-    historical_task = asyncio.create_task(format_and_call_gpt(MULTIPLE_CHOICE_PROMPT_historical))
-    current_task = asyncio.create_task(format_and_call_gpt(MULTIPLE_CHOICE_PROMPT_current))
-    (historical_prompt, historical_output), (current_prompt, current_output) = await asyncio.gather(historical_task, current_task)
+    research_prompts = {"historical": MULTIPLE_CHOICE_PROMPT_historical, "current": MULTIPLE_CHOICE_PROMPT_current}
+    search_ids = {"historical": "-1", "current": "0"}
 
-    context_historical, context_current = await asyncio.gather(
-        process_search_queries(historical_output, forecaster_id="-1", question_details=question_details),
-        process_search_queries(current_output, forecaster_id="0", question_details=question_details)
-    )
+    async def generate_queries(kind):
+        _, output = await format_and_call_gpt(research_prompts[kind])
+        write(f"\n{kind.capitalize()} context LLM output:\n" + output)
+        return output
 
-    write("\nHistorical context LLM output:\n" + historical_output)
-    write("\nCurrent context LLM output:\n" + current_output)
-    write("\nHistorical context search results:\n" + context_historical)
-    write("\nCurrent context search results:\n" + context_current)
-
-    prompt1 = MULTIPLE_CHOICE_PROMPT_1.format(
-        title=title,
-        today=today,
-        resolution_criteria=resolution_criteria,
-        fine_print=fine_print,
-        context=context_historical,
-        options=options
-    )
+    async def search(kind, output):
+        context = await process_search_queries(output, forecaster_id=search_ids[kind], question_details=question_details)
+        write(f"\n{kind.capitalize()} context search results:\n" + context)
+        return context
 
-    async def run_prompt1():
-        return await asyncio.gather(
-            call_claude(prompt1),      # forecaster 1
-            call_claude(prompt1),      # forecaster 2
-            call_gpt_o4_mini(prompt1), # forecaster 3
-            call_gpt_o3(prompt1), # forecaster 4
-            call_gpt_o3(prompt1),      # forecaster 5
+    def format_prompt1(context_historical):
+        return MULTIPLE_CHOICE_PROMPT_1.format(
+            title=title,
+            today=today,
+            resolution_criteria=resolution_criteria,
+            fine_print=fine_print,
+            context=context_historical,
+            options=options
         )
 
-    results_prompt1 = await run_prompt1()
+    labels = {1: "Outside view", 2: "Outside view", 3: "Outside view", 4: "Inside view", 5: "Inside view"}
 
-    for i, res in enumerate(results_prompt1):
-        write(f"\nForecaster_{i+1} step 1 output:\n{res}")
-
-    context_map = {
-        "1": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[0]}",
-        "2": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[2]}",
-        "3": f"Current context: {context_current}\nOutside view prediction: {results_prompt1[1]}",
-        "4": f"Current context: {context_current}\nInside view prediction: {results_prompt1[3]}",
-        "5": f"Current context: {context_current}\nInside view prediction: {results_prompt1[4]}",
-    }
-
-    def format_prompt2(f_id):
+    def format_prompt2(f_id, context_current, step1_outputs):
+        (prediction,) = step1_outputs.values()
         return MULTIPLE_CHOICE_PROMPT_2.format(
             title=title,
             today=today,
             resolution_criteria=resolution_criteria,
             fine_print=fine_print,
-            context=context_map[f_id],
+            context=f"Current context: {context_current}\n{labels[f_id]} prediction: {prediction}",
             options=options
         )
 
-    async def run_prompt2():
-        return await asyncio.gather(
-            call_claude(format_prompt2("1")),
-            call_claude(format_prompt2("2")),
-            call_gpt_o4_mini(format_prompt2("3")),
-            call_gpt_o3(format_prompt2("4")),
-            call_gpt_o3(format_prompt2("5")),
-        )
-
-    results_prompt2 = await run_prompt2()
+    def parse(out):
+        return normalize_probabilities(extract_option_probabilities_from_response(out, num_options))
 
-    all_outputs = results_prompt2
-    all_probs = []
-    final_outputs = []
+    def aggregate(all_outputs, parsed):
+        all_probs = []
+        final_outputs = []
 
-    for i, out in enumerate(all_outputs):
-        try:
+        for i, (out, probs) in enumerate(zip(all_outputs, parsed)):
+            if isinstance(out, Exception):
+                write(f"Forecaster {i+1} failed: {out}")
+                all_probs.append([1.0 / num_options] * num_options)
+                final_outputs.append(f"=== Forecaster {i+1} ===\nOutput:\n{out}\n")
+                continue
             write(f"Forecaster {i+1} step 2 output: {out}")
-            probs = extract_option_probabilities_from_response(out, num_options)
-            probs = normalize_probabilities(probs)
-            all_probs.append(probs)
-        except Exception as e:
-            write(f"Error parsing probabilities from Forecaster {i+1}: {e}")
-            all_probs.append([1.0 / num_options] * num_options)
-        final_outputs.append(f"=== Forecaster {i+1} ===\nOutput:\n{out}\n")
-
-    probs_matrix = np.array(all_probs)
-    weights = np.array([1, 1, 1, 2, 2])[:len(probs_matrix)]
-    weighted_probs = np.average(probs_matrix, axis=0, weights=weights)
-    probability_yes_per_category = {opt: float(p) for opt, p in zip(options, weighted_probs)}
-
-    comment = (
-        f"Average Probability Yes Per Category: `{probability_yes_per_category}`\n\n"
-        + "\n\n".join(final_outputs)
-    )
-
+            if isinstance(probs, Exception):
+                write(f"Error parsing probabilities from Forecaster {i+1}: {probs}")
+                all_probs.append([1.0 / num_options] * num_options)
+            else:
+                all_probs.append(probs)
+            final_outputs.append(f"=== Forecaster {i+1} ===\nOutput:\n{out}\n")
+
+        probs_matrix = np.array(all_probs)
+        weights = np.array([1, 1, 1, 2, 2])[:len(probs_matrix)]
+        weighted_probs = np.average(probs_matrix, axis=0, weights=weights)
+        probability_yes_per_category = {opt: float(p) for opt, p in zip(options, weighted_probs)}
+
+        comment = (
+            f"Average Probability Yes Per Category: `{probability_yes_per_category}`\n\n"
+            + "\n\n".join(final_outputs)
+        )
 
-    write("\nFinal averaged probabilities per category:")
-    write(json.dumps(probability_yes_per_category, indent=2))
-    write("\nForecast comment:")
-    write(comment)
 
-    return probability_yes_per_category, comment
+        write("\nFinal averaged probabilities per category:")
+        write(json.dumps(probability_yes_per_category, indent=2))
+        write("\nForecast comment:")
+        write(comment)
+
+        return probability_yes_per_category, comment
+
+    graph = forecast_graph(
+        "multiple_choice",
+        generate_queries=generate_queries,
+        search=search,
+        forecasters={
+            1: call_claude,
+            2: call_claude,
+            3: call_gpt_o4_mini,
+            4: call_gpt_o3,
+            5: call_gpt_o3,
+        },
+        step1_prompt=format_prompt1,
+        step2_prompt=format_prompt2,
+        dependencies=STEP2_DEPENDENCIES,
+        answer_ready=option_probabilities_answer_ready,
+        parse=parse,
+        aggregate=aggregate,
+        write=write,
+    )
+    return await run_forecast(graph, question_details, write=write)
@@ -15,6 +15,10 @@ from prompts import (
 )
 from llm_calls import call_claude, call_gpt_o4_mini, call_gpt_o3
 from search import process_search_queries
+from pipeline import forecast_graph, run_forecast
+
+# Step-1 output each forecaster's step-2 prompt reads (each forecaster refines its own prior)
+STEP2_DEPENDENCIES = {1: (1,), 2: (2,), 3: (3,), 4: (4,), 5: (5,)}
 
 VALID_KEYS = {1,5,10,15,20,25,30,35,40,45,50,55,60,65,70,75,80,85,90,95,99}
 
@@ -110,6 +114,19 @@ def extract_percentiles_from_response(text: Union[str, list], verbose: bool = Tr
         raise ValueError("❌ No valid percentiles extracted.")
     return percentiles
 
+def percentiles_answer_ready(text: str) -> bool:
+    """True once a complete 'Percentile 99' line has streamed in below the 'Distribution:' anchor."""
+    lowered = text.lower()
+    anchor = lowered.rfind("distribution:")
+    if anchor == -1:
+        return False
+    # Ignore the last, possibly half-streamed, line
+    for raw in lowered[anchor:].split("\n")[1:-1]:
+        match = NUM_PATTERN.match(clean(raw))
+        if match and int(match.group(1)) == max(VALID_KEYS):
+            return True
+    return False
+
 def generate_continuous_cdf(percentile_values, open_upper_bound, open_lower_bound, upper_bound, 
                         lower_bound, zero_point=None, *, min_step=5.0e-5, num_points=201):
     """
@@ -383,73 +400,89 @@ async def get_numeric_forecast(question_details: dict, write=print):
         )
         return txt, await call_gpt_o3(txt)
 
-    hist_prompt, hist_out = await format_call(NUMERIC_PROMPT_historical)
-    curr_prompt, curr_out = await format_call(NUMERIC_PROMPT_current)
-
-    hist_context = await process_search_queries(hist_out, forecaster_id="-1", question_details=question_details)
-    curr_context = await process_search_queries(curr_out, forecaster_id="0", question_details=question_details)
+    research_prompts = {"historical": NUMERIC_PROMPT_historical, "current": NUMERIC_PROMPT_current}
+    search_ids = {"historical": "-1", "current": "0"}
 
-    write(f"Historical output: {hist_out}\nContext: {hist_context}")
-    write(f"Current output: {curr_out}\nContext: {curr_context}")
+    async def generate_queries(kind):
+        _, out = await format_call(research_prompts[kind])
+        write(f"{kind.capitalize()} output: {out}")
+        return out
 
-    prompt1 = NUMERIC_PROMPT_1.format(
-        title=title, today=today, resolution_criteria=resolution,
-        fine_print=fine_print, context=hist_context,
-        units=unit, lower_bound_message="", upper_bound_message="",
-        hint = f"The answer is expected to be above {lower} and below {upper}. Think carefully, and reconsider your sources, if your projections are outside this range."
-    )
-
-    base_forecasts = await asyncio.gather(
-        call_claude(prompt1), call_claude(prompt1),
-        call_gpt_o4_mini(prompt1), call_gpt_o3(prompt1),
-        call_gpt_o3(prompt1)
-    )
+    async def search(kind, out):
+        context = await process_search_queries(out, forecaster_id=search_ids[kind], question_details=question_details)
+        write(f"{kind.capitalize()} context: {context}")
+        return context
 
-    for i, out in enumerate(base_forecasts):
-        write(f"\nForecaster_{i+1} step 1 output:\n{out}")
-
-
-    context_map = {
-        str(i+1): f"Current context: {curr_context}\nPrior: {base_forecasts[i]}"
-        for i in range(5)
-    }
+    def format_prompt1(hist_context):
+        return NUMERIC_PROMPT_1.format(
+            title=title, today=today, resolution_criteria=resolution,
+            fine_print=fine_print, context=hist_context,
+            units=unit, lower_bound_message="", upper_bound_message="",
+            hint = f"The answer is expected to be above {lower} and below {upper}. Think carefully, and reconsider your sources, if your projections are outside this range."
+        )
 
-    prompts2 = [NUMERIC_PROMPT_2.format(
-        title=title, today=today, resolution_criteria=resolution,
-        fine_print=fine_print, context=context_map[str(i+1)],
-        units=unit, lower_bound_message="", upper_bound_message="",
-        hint = f"The answer is expected to be above {lower} and below {upper}. Think carefully, and reconsider your sources, if your projections are outside this range."
-    ) for i in range(5)]
+    def format_prompt2(f_id, curr_context, step1_outputs):
+        (prior,) = step1_outputs.values()
+        return NUMERIC_PROMPT_2.format(
+            title=title, today=today, resolution_criteria=resolution,
+            fine_print=fine_print, context=f"Current context: {curr_context}\nPrior: {prior}",
+            units=unit, lower_bound_message="", upper_bound_message="",
+            hint = f"The answer is expected to be above {lower} and below {upper}. Think carefully, and reconsider your sources, if your projections are outside this range."
+        )
 
-    step2_outputs = await asyncio.gather(
-        call_claude(prompts2[0]), call_claude(prompts2[1]),
-        call_gpt_o4_mini(prompts2[2]), call_gpt_o3(prompts2[3]),
-        call_gpt_o3(prompts2[4])
+    def parse(output):
+        parsed = extract_percentiles_from_response(output, verbose=True)
+        parsed = enforce_strict_increasing(parsed)
+        return generate_continuous_cdf(parsed, open_upper, open_lower, upper, lower, zero)
+
+    def aggregate(step2_outputs, cdfs):
+        all_cdfs = []
+        final_outputs = []
+
+        for i, (output, cdf) in enumerate(zip(step2_outputs, cdfs)):
+            if isinstance(output, Exception):
+                write(f"❌ Forecaster {i+1} failed: {output}")
+                final_outputs.append(f"=== Forecaster {i+1} ===\n{output}\n")
+                continue
+            if isinstance(cdf, Exception):
+                write(f"❌ Forecaster {i+1} failed: {cdf}")
+            else:
+                all_cdfs.append((cdf, 2 if (i == 4 or i == 3) else 1))
+            final_outputs.append(f"=== Forecaster {i+1} ===\n{output}\n")
+
+        if len(all_cdfs) < 3:
+            raise RuntimeError(f"🚨 Only {len(all_cdfs)} valid CDFs — need at least 3 to proceed")
+
+        numer = sum(np.array(cdf) * weight for cdf, weight in all_cdfs)
+        denom = sum(weight for _, weight in all_cdfs)
+        combined = (numer / denom).tolist()
+
+        if len(combined) != 201:
+            raise RuntimeError(f"🚨 Combined CDF malformed: {len(combined)} points")
+
+        comment = "Combined CDF: `" + str(combined[:5]) + "...`\n\n" + "\n\n".join(final_outputs)
+        write(comment)
+        return combined, comment
+
+    # Historical and current research run concurrently; step 1 starts as soon as the
+    # historical context is ready and only step 2 waits for the current context
+    graph = forecast_graph(
+        "numeric",
+        generate_queries=generate_queries,
+        search=search,
+        forecasters={
+            1: call_claude,
+            2: call_claude,
+            3: call_gpt_o4_mini,
+            4: call_gpt_o3,
+            5: call_gpt_o3,
+        },
+        step1_prompt=format_prompt1,
+        step2_prompt=format_prompt2,
+        dependencies=STEP2_DEPENDENCIES,
+        answer_ready=percentiles_answer_ready,
+        parse=parse,
+        aggregate=aggregate,
+        write=write,
     )
-
-    all_cdfs = []
-    final_outputs = []
-
-    for i, output in enumerate(step2_outputs):
-        try:
-            parsed = extract_percentiles_from_response(output, verbose=True)
-            parsed = enforce_strict_increasing(parsed)
-            cdf = generate_continuous_cdf(parsed, open_upper, open_lower, upper, lower, zero)
-            all_cdfs.append((cdf, 2 if (i == 4 or i == 3) else 1))
-        except Exception as e:
-            write(f"❌ Forecaster {i+1} failed: {e}")
-        final_outputs.append(f"=== Forecaster {i+1} ===\n{output}\n")
-
-    if len(all_cdfs) < 3:
-        raise RuntimeError(f"🚨 Only {len(all_cdfs)} valid CDFs — need at least 3 to proceed")
-
-    numer = sum(np.array(cdf) * weight for cdf, weight in all_cdfs)
-    denom = sum(weight for _, weight in all_cdfs)
-    combined = (numer / denom).tolist()
-
-    if len(combined) != 201:
-        raise RuntimeError(f"🚨 Combined CDF malformed: {len(combined)} points")
-
-    comment = "Combined CDF: `" + str(combined[:5]) + "...`\n\n" + "\n\n".join(final_outputs)
-    write(comment)
-    return combined, comment
+    return await run_forecast(graph, question_details, write=write)
@@ -0,0 +1,309 @@
+"""
+Stage-graph engine for the forecasting pipelines.
+
+A question type is a StageGraph: named stages that declare which other stages'
+results they take as inputs. The scheduler starts every stage as soon as its
+inputs are ready, so independent work always overlaps (e.g. step-1 forecasters
+start while current-news research is still running, and each forecaster's
+step 2 starts as soon as the step-1 outputs it reads are in).
+
+Stages can name a resource ("research", "llm"); a global semaphore per resource
+bounds how many such stages run at once across all questions. Every run records
+a per-stage trace (start offset, duration, outcome). Given a checkpoint
+(checkpoint_store), a run restores the stages that already completed and saves
+each stage as it finishes.
+
+forecast_graph() builds the shape shared by binary, numeric and multiple choice:
+
+    historical_queries ─> historical_context ─> step1_1..5 ──┐
+    current_queries ─> current_context ────────────────────>├─> step2_1..5 ─> parse_1..5 ─> forecast
+                                                             │   (step2_N reads the step-1 outputs
+                                                             │    in its dependencies)
+
+Configured with environment variables:
+- PIPELINE_MAX_RESEARCH_STAGES: concurrent research stages across all questions (default 0 = no limit)
+- PIPELINE_MAX_LLM_STAGES: concurrent LLM stages across all questions (default 0 = no limit)
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from checkpoint_store import checkpoint_store
+
+load_dotenv()
+
+STAGE_LIMITS = {
+    "research": int(os.getenv("PIPELINE_MAX_RESEARCH_STAGES", "0")),
+    "llm": int(os.getenv("PIPELINE_MAX_LLM_STAGES", "0")),
+}
+
+
+def write(x):
+    print(x)
+
+
+class StageFailed(Exception):
+    """Raised when a stage that does not capture its errors fails."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"stage {stage} failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    """
+    One node of a StageGraph.
+
+    Attributes:
+        name: Unique stage name; other stages refer to it in their inputs.
+        run: Coroutine function called with the results of `inputs`, in order.
+        inputs: Names of the stages whose results this stage needs.
+        resource: Global concurrency limit this stage counts against (see STAGE_LIMITS).
+        capture_errors: If True an exception becomes the stage's result instead of
+            failing the whole graph (a failed forecaster must not sink the others).
+    """
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    resource: Optional[str] = None
+    capture_errors: bool = False
+
+
+@dataclass
+class StageTrace:
+    stage: str
+    started: float
+    finished: float
+    ok: bool
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+class _ResourceLimits:
+    """Semaphores per resource, rebuilt if the bot is re-run under a new event loop."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = limits
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, resource: Optional[str]) -> Optional[asyncio.Semaphore]:
+        if not resource or self.limits.get(resource, 0) <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphores = {}
+            self._loop = loop
+        if resource not in self._semaphores:
+            self._semaphores[resource] = asyncio.Semaphore(self.limits[resource])
+        return self._semaphores[resource]
+
+
+resource_limits = _ResourceLimits(STAGE_LIMITS)
+
+
+class StageGraph:
+    """A validated set of stages that can be run concurrently in dependency order."""
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError(f"{name}: duplicate stage names")
+        for stage in stages:
+            missing = [i for i in stage.inputs if i not in self.stages]
+            if missing:
+                raise ValueError(f"{name}: stage {stage.name} has unknown inputs {missing}")
+        self._check_acyclic()
+        self.trace: List[StageTrace] = []
+
+    def _check_acyclic(self) -> None:
+        done, visiting = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"{self.name}: cycle through stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _restorable(self, saved: Dict[str, Any]) -> Dict[str, Any]:
+        """Saved results whose inputs were all restored too, so a resumed run stays consistent."""
+        kept: Dict[str, Any] = {}
+
+        def keep(name: str) -> bool:
+            if name not in kept and name in saved and all(keep(dep) for dep in self.stages[name].inputs):
+                kept[name] = saved[name]
+            return name in kept
+
+        for name in self.stages:
+            keep(name)
+        return kept
+
+    async def run(self, results: Optional[Dict[str, Any]] = None, write=write, checkpoint=None) -> Dict[str, Any]:
+        """
+        Run every stage and return {stage name: result}.
+
+        Args:
+            results: Results already known; those stages are not run again.
+            write: Logger for the trace summary.
+            checkpoint: checkpoint_store.QuestionCheckpoint; completed stages are restored
+                from it and every stage that completes is saved to it.
+
+        Raises:
+            StageFailed: a stage without capture_errors raised; the rest are cancelled.
+        """
+        saved = checkpoint.load() if checkpoint else {}
+        known = self._restorable({**saved, **(results or {})})
+        if saved:
+            write(f"[checkpoint] {self.name} question {checkpoint.question_id}: "
+                  f"resuming with {len(known)}/{len(self.stages)} stages done")
+        self.trace = []
+        origin = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = [await tasks[dep] for dep in stage.inputs]
+            semaphore = resource_limits.get(stage.resource)
+            async with semaphore or contextlib.nullcontext():
+                started = time.monotonic()
+                try:
+                    result = await stage.run(*inputs)
+                    ok = True
+                except Exception as e:
+                    if not stage.capture_errors:
+                        self.trace.append(StageTrace(stage.name, started - origin, time.monotonic() - origin, False))
+                        raise StageFailed(stage.name, e) from e
+                    result, ok = e, False
+                self.trace.append(StageTrace(stage.name, started - origin, time.monotonic() - origin, ok))
+                # Failures are not saved, so a rerun retries them
+                if ok and checkpoint:
+                    checkpoint.save(stage.name, result)
+                return result
+
+        for name, stage in self.stages.items():
+            if name in known:
+                tasks[name] = asyncio.get_running_loop().create_future()
+                tasks[name].set_result(known[name])
+            else:
+                tasks[name] = asyncio.create_task(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        if self.trace:
+            write(f"[pipeline] {self.name}: " + ", ".join(
+                f"{t.stage} {t.started:.1f}+{t.duration:.1f}s{'' if t.ok else ' (failed)'}"
+                for t in sorted(self.trace, key=lambda t: t.started)
+            ))
+        return {name: task.result() for name, task in tasks.items()}
+
+
+######################### FORECAST PIPELINE #########################
+
+def _unwrap(value: Any) -> Any:
+    # A captured failure flows on as its exception; re-raise it in the consumer
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+def forecast_graph(
+    name: str,
+    generate_queries: Callable[[str], Awaitable[str]],
+    search: Callable[[str, str], Awaitable[str]],
+    forecasters: Dict[int, Callable[..., Awaitable[str]]],
+    step1_prompt: Callable[[str], str],
+    step2_prompt: Callable[[int, str, Dict[int, Any]], str],
+    dependencies: Dict[int, Tuple[int, ...]],
+    answer_ready: Callable[[str], bool],
+    parse: Callable[[str], Any],
+    aggregate: Callable[[List[Any], List[Any]], Any],
+    write=write,
+) -> StageGraph:
+    """
+    The two-stage ensemble shared by every question type.
+
+    Args:
+        name: Graph name used in the trace; matches the Metaculus question type.
+        generate_queries: "historical" or "current" -> research LLM output with search queries.
+        search: ("historical" or "current", that output) -> context from process_search_queries.
+        forecasters: forecaster id -> call_* function.
+        step1_prompt: historical context -> step-1 prompt (same for every forecaster).
+        step2_prompt: (forecaster id, current context, {dependency id: step-1 output}) -> step-2 prompt.
+        dependencies: forecaster id -> ids of the step-1 outputs its step 2 reads.
+        answer_ready: lets streaming step-2 calls stop once the final answer is complete.
+        parse: step-2 output -> parsed forecast; exceptions are kept as that forecaster's result.
+        aggregate: (step-2 outputs, parsed forecasts) -> the question's (forecast, comment).
+    """
+    stages = []
+    for kind in ("historical", "current"):
+        async def queries(kind=kind):
+            return await generate_queries(kind)
+
+        async def context(output, kind=kind):
+            return await search(kind, output)
+
+        stages += [
+            Stage(f"{kind}_queries", queries, resource="llm"),
+            Stage(f"{kind}_context", context, (f"{kind}_queries",), resource="research"),
+        ]
+
+    for f_id, call in forecasters.items():
+        async def step1(context_historical, f_id=f_id, call=call):
+            output = await call(step1_prompt(context_historical), shared_context=context_historical)
+            write(f"\nForecaster_{f_id} step 1 output:\n{output}")
+            return output
+
+        async def step2(context_current, *step1_outputs, f_id=f_id, call=call):
+            # A failed step 1 fails this chain too, rather than reaching the prompt as a prior
+            step1_outputs = [_unwrap(output) for output in step1_outputs]
+            prompt = step2_prompt(f_id, context_current, dict(zip(dependencies[f_id], step1_outputs)))
+            # Shared by every step-2 prompt ahead of the per-forecaster part, so providers can cache it
+            return await call(prompt, answer_ready=answer_ready, shared_context=f"Current context: {context_current}\n")
+
+        async def parse_output(output, f_id=f_id):
+            return parse(_unwrap(output))
+
+        stages += [
+            Stage(f"step1_{f_id}", step1, ("historical_context",), resource="llm", capture_errors=True),
+            Stage(f"step2_{f_id}", step2, ("current_context", *[f"step1_{d}" for d in dependencies[f_id]]),
+                  resource="llm", capture_errors=True),
+            Stage(f"parse_{f_id}", parse_output, (f"step2_{f_id}",), capture_errors=True),
+        ]
+
+    ids = sorted(forecasters)
+
+    async def forecast(*outputs_and_parsed):
+        return aggregate(list(outputs_and_parsed[:len(ids)]), list(outputs_and_parsed[len(ids):]))
+
+    stages.append(Stage("forecast", forecast, (*[f"step2_{i}" for i in ids], *[f"parse_{i}" for i in ids])))
+    return StageGraph(name, stages)
+
+
+async def run_forecast(graph: StageGraph, question_details: Dict[str, Any], write=write) -> Tuple[Any, str]:
+    """Run a forecast_graph with checkpointing and return its (forecast, comment)."""
+    checkpoint = checkpoint_store.question(question_details, graph.name)
+    results = await graph.run(write=write, checkpoint=checkpoint)
+    forecast, comment = results["forecast"]
+    return forecast, comment
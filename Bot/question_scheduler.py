@@ -0,0 +1,178 @@
+"""
+Bounded, priority-ordered scheduling of whole questions.
+
+forecast_questions hands every open question to a QuestionScheduler instead of
+gathering them all at once. At most MAX_QUESTIONS_IN_FLIGHT questions run at a
+time; the rest wait in a priority queue ordered by:
+
+1. scheduled_close_time - questions closing soonest go first (to the hour)
+2. question type       - among questions closing in the same hour, numeric starts
+                          first, then multiple choice, then binary (TYPE_COST)
+3. listing order
+
+Draining stops the scheduler from starting queued questions while the ones in
+flight finish; cancelling also cancels those in flight. Questions that never
+started come back as QuestionNotStarted (their checkpoints let the next run pick
+them up).
+
+Configured with environment variables:
+- MAX_QUESTIONS_IN_FLIGHT: questions forecast concurrently (default 4)
+"""
+
+import asyncio
+import datetime
+import heapq
+import math
+import os
+import signal
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_QUESTIONS_IN_FLIGHT = int(os.getenv("MAX_QUESTIONS_IN_FLIGHT", "4"))
+
+# Start order of question types whose close times fall in the same bucket (higher first)
+TYPE_COST = {"numeric": 3, "multiple_choice": 2, "binary": 1}
+# Close times are compared in buckets of this many seconds, so type cost can break ties
+CLOSE_TIME_BUCKET = 3600
+
+
+def write(x):
+    print(x)
+
+
+def add_stop_signal_handlers(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Call `callback` on every SIGINT/SIGTERM instead of letting the signal kill the run.
+
+    Returns a function that removes the handlers again. Does nothing where the event
+    loop cannot handle signals (Windows, or not the main thread).
+    """
+    loop = asyncio.get_running_loop()
+    handled = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, callback)
+            handled.append(sig)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    def remove() -> None:
+        for sig in handled:
+            loop.remove_signal_handler(sig)
+
+    return remove
+
+
+class QuestionNotStarted(Exception):
+    """Result of a queued question that the scheduler was drained or cancelled before starting."""
+
+
+def parse_close_time(value: Optional[str]) -> float:
+    """Metaculus scheduled_close_time (ISO 8601) -> epoch seconds; unknown sorts last."""
+    if not value:
+        return math.inf
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return math.inf
+
+
+@dataclass(order=True)
+class QuestionJob:
+    """One question waiting in the scheduler; jobs compare by priority."""
+    close_time: float
+    cost: int
+    index: int
+    question_id: int = field(compare=False)
+    post_id: int = field(compare=False)
+    question_type: Optional[str] = field(default=None, compare=False)
+
+    @classmethod
+    def from_question(cls, index: int, question_id: int, post_id: int,
+                      question: Optional[Dict[str, Any]] = None) -> "QuestionJob":
+        question = question or {}
+        question_type = question.get("type")
+        close_time = parse_close_time(question.get("scheduled_close_time"))
+        return cls(
+            close_time=close_time // CLOSE_TIME_BUCKET if math.isfinite(close_time) else close_time,
+            cost=-TYPE_COST.get(question_type, 0),  # negated: higher TYPE_COST starts first
+            index=index,
+            question_id=question_id,
+            post_id=post_id,
+            question_type=question_type,
+        )
+
+
+class QuestionScheduler:
+    """Runs question jobs with a cap on how many are in flight, most urgent first."""
+
+    def __init__(self, max_in_flight: int = MAX_QUESTIONS_IN_FLIGHT):
+        self.max_in_flight = max(1, max_in_flight)
+        self._queue: List[QuestionJob] = []
+        self._running: Set[asyncio.Task] = set()
+        self.draining = False
+        self.cancelled = False
+        self.started = 0
+        self.finished = 0
+
+    def drain(self) -> None:
+        """Start no more queued questions; the ones in flight run to completion."""
+        if not self.draining:
+            write(f"[scheduler] Draining: {len(self._running)} questions in flight, "
+                  f"{len(self._queue)} queued questions will not start")
+        self.draining = True
+
+    def cancel(self) -> None:
+        """Drain and cancel the questions in flight."""
+        self.drain()
+        self.cancelled = True
+        for task in self._running:
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._running), "queued": len(self._queue), "started": self.started,
+                "finished": self.finished, "draining": self.draining}
+
+    async def _worker(self, forecast: Callable[[QuestionJob], Awaitable[Any]], results: Dict[int, Any]) -> None:
+        while self._queue and not self.draining:
+            job = heapq.heappop(self._queue)
+            self.started += 1
+            write(f"[scheduler] Starting question {job.question_id} ({job.question_type or 'unknown type'}); "
+                  f"{len(self._running) + 1} in flight, {len(self._queue)} queued")
+            task = asyncio.create_task(forecast(job))
+            self._running.add(task)
+            try:
+                results[job.index] = await task
+            except asyncio.CancelledError as e:
+                if not task.cancelled() or not self.cancelled:
+                    raise  # the scheduler itself was cancelled
+                results[job.index] = e
+            except Exception as e:
+                results[job.index] = e
+            finally:
+                self._running.discard(task)
+                self.finished += 1
+
+    async def run(self, jobs: List[QuestionJob], forecast: Callable[[QuestionJob], Awaitable[Any]]) -> List[Any]:
+        """
+        Run forecast(job) for every job and return the results in the order of `jobs`.
+
+        Like asyncio.gather(..., return_exceptions=True), a failed question's result is
+        its exception; questions that never started get QuestionNotStarted.
+        """
+        self._queue = list(jobs)
+        heapq.heapify(self._queue)
+        results: Dict[int, Any] = {}
+        workers = [asyncio.create_task(self._worker(forecast, results))
+                   for _ in range(min(self.max_in_flight, len(jobs)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in [*workers, *self._running]:
+                task.cancel()
+        return [results.get(job.index, QuestionNotStarted(f"question {job.question_id} was not started"))
+                for job in jobs]
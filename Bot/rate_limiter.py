@@ -0,0 +1,255 @@
+"""
+Per-provider/model rate limiting for LLM calls.
+
+Every (provider, model) pair gets two token buckets: requests per minute (RPM)
+and prompt tokens per minute (TPM, estimated from prompt length). llm_client
+awaits `rate_limiter.acquire(...)` before each attempt, so a full tournament
+run queues locally instead of tripping 429s and sleeping blindly.
+
+Budgets adapt at runtime:
+- a 429 halves the pair's budgets and pauses it for the provider's Retry-After
+- each success restores a slice of the configured budget (additive increase)
+- rate-limit response headers (remaining / reset) pause the pair until reset
+  when the provider says the window is exhausted
+
+Defaults live in DEFAULT_RATE_LIMITS and can be overridden per provider with
+environment variables, e.g. RATE_LIMIT_OPENROUTER_RPM=60 or
+RATE_LIMIT_METACULUS_ANTHROPIC_TPM=200000.
+"""
+
+import asyncio
+import datetime
+import os
+import re
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Budgets per provider adapter name; each model behind a provider gets its own copy.
+DEFAULT_RATE_LIMITS = {
+    "openrouter": {"rpm": 120, "tpm": 2_000_000},
+    "metaculus-anthropic": {"rpm": 50, "tpm": 400_000},
+    "metaculus-openai": {"rpm": 100, "tpm": 1_000_000},
+    "openai": {"rpm": 500, "tpm": 2_000_000},
+}
+FALLBACK_RATE_LIMIT = {"rpm": 60, "tpm": 1_000_000}
+
+# Never adapt a budget below this fraction of its configured value
+MIN_BUDGET_FRACTION = 0.1
+# Fraction of the configured budget restored after each successful call
+RECOVERY_FRACTION = 0.05
+
+
+def write(x):
+    print(x)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count using ~4 characters per token."""
+    return max(1, len(text or "") // 4)
+
+
+def _configured_limits(provider: str) -> Dict[str, float]:
+    limits = dict(DEFAULT_RATE_LIMITS.get(provider, FALLBACK_RATE_LIMIT))
+    env_prefix = "RATE_LIMIT_" + re.sub(r"[^A-Z0-9]", "_", provider.upper())
+    for key in ("rpm", "tpm"):
+        override = os.getenv(f"{env_prefix}_{key.upper()}")
+        if override:
+            limits[key] = float(override)
+    return limits
+
+
+def _parse_reset(value: str) -> Optional[float]:
+    """
+    Seconds until a rate-limit window resets. Providers disagree on the format:
+    OpenAI uses durations ("1m30s", "250ms"), Anthropic uses RFC 3339 timestamps
+    and OpenRouter uses epoch milliseconds.
+    """
+    value = value.strip()
+    if re.fullmatch(r"\d{12,}", value):
+        return max(0.0, int(value) / 1000 - time.time())
+    if re.fullmatch(r"\d+(\.\d+)?", value):
+        return float(value)
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+    try:
+        when = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return max(0.0, when.timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` tokens per second,
+    holding at most one minute's worth. Waiters are served in arrival order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Locks are tied to an event loop; rebuild if the bot is re-run under a new one
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.per_minute, self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """
+        Wait until `amount` tokens are available and take them.
+
+        Requests larger than the whole bucket are clamped to its size so they can
+        still go through once the bucket is full.
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.per_minute)
+        waited = 0.0
+        async with self._get_lock():
+            while True:
+                self._refill()
+                now = time.monotonic()
+                if self.blocked_until > now:
+                    delay = self.blocked_until - now
+                elif self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                else:
+                    delay = (amount - self.tokens) * 60 / self.per_minute
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def set_rate(self, per_minute: float) -> None:
+        self._refill()
+        self.per_minute = per_minute
+        self.tokens = min(self.tokens, per_minute)
+
+    def block_for(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def cap(self, tokens: float) -> None:
+        """Never hold more tokens than the provider says remain in its window."""
+        self._refill()
+        self.tokens = min(self.tokens, tokens)
+
+
+class ModelLimiter:
+    """RPM + TPM buckets for one (provider, model) pair, with AIMD budget adaptation."""
+
+    def __init__(self, provider: str, model: str, rpm: float, tpm: float):
+        self.provider = provider
+        self.model = model
+        self.max_rpm = rpm
+        self.max_tpm = tpm
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.rate_limited = 0
+
+    async def acquire(self, prompt_tokens: int) -> float:
+        waited = await self.requests.acquire(1)
+        waited += await self.tokens.acquire(prompt_tokens)
+        return waited
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:
+        self.rate_limited += 1
+        for bucket, ceiling in ((self.requests, self.max_rpm), (self.tokens, self.max_tpm)):
+            bucket.set_rate(max(ceiling * MIN_BUDGET_FRACTION, bucket.per_minute / 2))
+            bucket.block_for(retry_after if retry_after is not None else 60 / bucket.per_minute)
+        write(f"[rate_limiter] {self.provider} {self.model} throttled to "
+              f"{self.requests.per_minute:.0f} rpm / {self.tokens.per_minute:.0f} tpm")
+
+    def on_success(self) -> None:
+        for bucket, ceiling in ((self.requests, self.max_rpm), (self.tokens, self.max_tpm)):
+            if bucket.per_minute < ceiling:
+                bucket.set_rate(min(ceiling, bucket.per_minute + ceiling * RECOVERY_FRACTION))
+
+    def on_headers(self, headers: Mapping[str, str]) -> None:
+        lowered = {k.lower(): v for k, v in headers.items()}
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = (lowered.get(f"x-ratelimit-remaining-{kind}")
+                         or lowered.get(f"anthropic-ratelimit-{kind}-remaining"))
+            reset = (lowered.get(f"x-ratelimit-reset-{kind}")
+                     or lowered.get(f"anthropic-ratelimit-{kind}-reset"))
+            if kind == "requests":
+                # OpenRouter only reports a request window, without a suffix
+                remaining = remaining or lowered.get("x-ratelimit-remaining")
+                reset = reset or lowered.get("x-ratelimit-reset")
+            if remaining is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            if remaining_value <= 0 and reset:
+                seconds = _parse_reset(reset)
+                if seconds:
+                    bucket.block_for(seconds)
+            else:
+                bucket.cap(remaining_value)
+
+
+class RateLimiter:
+    """Registry of ModelLimiters keyed by (provider, model)."""
+
+    def __init__(self):
+        self._limiters: Dict[Tuple[str, str], ModelLimiter] = {}
+        self.enabled = os.getenv("RATE_LIMITING", "1") != "0"
+
+    def get(self, provider: str, model: str) -> ModelLimiter:
+        key = (provider, model)
+        if key not in self._limiters:
+            limits = _configured_limits(provider)
+            self._limiters[key] = ModelLimiter(provider, model, limits["rpm"], limits["tpm"])
+        return self._limiters[key]
+
+    async def acquire(self, provider: str, model: str, prompt_tokens: int) -> None:
+        """Wait for budget to send one request of `prompt_tokens` estimated tokens."""
+        if not self.enabled:
+            return
+        waited = await self.get(provider, model).acquire(prompt_tokens)
+        if waited > 1:
+            write(f"[rate_limiter] Waited {waited:.1f}s for {provider} {model} budget")
+
+    def on_rate_limited(self, provider: str, model: str, retry_after: Optional[float] = None) -> None:
+        if self.enabled:
+            self.get(provider, model).on_rate_limited(retry_after)
+
+    def on_success(self, provider: str, model: str) -> None:
+        if self.enabled:
+            self.get(provider, model).on_success()
+
+    def on_headers(self, provider: str, model: str, headers: Mapping[str, str]) -> None:
+        if self.enabled:
+            self.get(provider, model).on_headers(headers)
+
+    def status(self) -> Dict[str, Dict[str, float]]:
+        """Current budgets per provider/model, for logging."""
+        return {
+            f"{l.provider}:{l.model}": {
+                "rpm": round(l.requests.per_minute, 1),
+                "tpm": round(l.tokens.per_minute),
+                "rate_limited": l.rate_limited,
+            }
+            for l in self._limiters.values()
+        }
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,101 @@
+"""
+Change detection for questions that already have a forecast (REFORECAST_MODE = "incremental"
+in main.py; opt-in, the default "never" leaves forecast questions alone).
+
+After a full forecast, the research record of the question is saved in
+checkpoint_store: the current-news search queries the research LLM wrote and a
+fingerprint of what those queries return (Google/Google News result URLs and
+AskNews article IDs). On later runs, a question that already has a forecast is
+only probed: the saved queries are sent to Serper/AskNews again (no LLM calls,
+no scraping, no summarisation) and the ensemble runs again only if
+
+- at least REFORECAST_NEW_SOURCE_FRACTION of the sources found are new, or
+- the last full forecast is older than REFORECAST_MAX_AGE_HOURS, or
+- the question has no research record yet.
+
+Agent and Perplexity queries are not probed; they are LLM calls themselves.
+
+Configured with environment variables:
+- REFORECAST_MAX_AGE_HOURS: staleness deadline for a forecast (default 24)
+- REFORECAST_NEW_SOURCE_FRACTION: share of new sources that counts as new evidence (default 0.25)
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from checkpoint_store import checkpoint_store
+from search import asknews_article_ids, google_search, parse_search_queries
+
+load_dotenv()
+
+REFORECAST_MAX_AGE_HOURS = float(os.getenv("REFORECAST_MAX_AGE_HOURS", "24"))
+REFORECAST_NEW_SOURCE_FRACTION = float(os.getenv("REFORECAST_NEW_SOURCE_FRACTION", "0.25"))
+
+
+def write(x):
+    print(x)
+
+
+@dataclass
+class ReforecastDecision:
+    needed: bool
+    reason: str
+
+
+async def probe_sources(queries_output: str, question_details: Dict[str, Any]) -> List[str]:
+    """
+    Sources the search queries in a research LLM output currently return, as sorted identifiers.
+
+    Queries whose lookup fails are left out, so a flaky search provider reads as
+    "no new evidence" rather than "everything changed".
+    """
+    lookups = []
+    for query, source in parse_search_queries(queries_output):
+        if source in ("Google", "Google News"):
+            lookups.append(google_search(query, is_news=(source == "Google News"),
+                                         date_before=question_details.get("resolution_date")))
+        elif source == "Assistant":
+            lookups.append(asknews_article_ids(query))
+
+    sources = set()
+    for result in await asyncio.gather(*lookups, return_exceptions=True):
+        if isinstance(result, Exception):
+            write(f"[research_fingerprint] Probe lookup failed: {result!r}")
+            continue
+        sources.update(result)
+    return sorted(sources)
+
+
+async def record_research(question_details: Dict[str, Any], queries_output: str) -> None:
+    """Save the research record of a question that was just forecast in full."""
+    sources = await probe_sources(queries_output, question_details)
+    checkpoint_store.save_research(question_details["id"], {
+        "queries": queries_output,
+        "sources": sources,
+        "forecast_at": time.time(),
+    })
+    write(f"[research_fingerprint] Question {question_details['id']}: recorded {len(sources)} sources")
+
+
+async def reforecast_decision(question_details: Dict[str, Any]) -> ReforecastDecision:
+    """Decide whether a question that already has a forecast needs the full ensemble again."""
+    record = checkpoint_store.research(question_details["id"])
+    if not record or not record.get("queries"):
+        return ReforecastDecision(True, "no research record from an earlier forecast")
+
+    age_hours = (time.time() - record["forecast_at"]) / 3600
+    if age_hours >= REFORECAST_MAX_AGE_HOURS:
+        return ReforecastDecision(True, f"last forecast is {age_hours:.1f}h old")
+
+    sources = await probe_sources(record["queries"], question_details)
+    new = set(sources) - set(record["sources"])
+    fraction = len(new) / len(sources) if sources else 0.0
+    if fraction >= REFORECAST_NEW_SOURCE_FRACTION:
+        return ReforecastDecision(True, f"{len(new)}/{len(sources)} sources are new")
+    return ReforecastDecision(False, f"{len(new)}/{len(sources)} sources are new, "
+                                     f"last forecast {age_hours:.1f}h old")
@@ -0,0 +1,154 @@
+"""
+Content-addressed on-disk cache of LLM responses.
+
+Responses are keyed by a SHA-256 of (provider, model, system context, prompt,
+sampling params) and stored in a local SQLite file, so retried runs and
+benchmarks can skip identical calls. llm_client consults the cache before
+touching the network.
+
+Configured with environment variables:
+- LLM_CACHE_MODE:
+    off     - no caching (default)
+    on      - serve fresh hits, call the provider on a miss and store the result
+    record  - always call the provider and store every result
+    replay  - serve only from the cache (ignoring TTL); a miss raises LLMCacheMiss
+- LLM_CACHE_PATH: SQLite file (default .cache/llm_responses.sqlite at the repo root)
+- LLM_CACHE_TTL: seconds an entry stays fresh in "on" mode (default 7 days)
+- LLM_CACHE_MAX_MB: size budget; least recently used entries are evicted past it
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_MODES = ("off", "on", "record", "replay")
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off").lower()
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "llm_responses.sqlite")),
+)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "500"))
+
+
+def write(x):
+    print(x)
+
+
+def cache_key(provider: str, model: str, system: Optional[str], prompt: str, params: Dict[str, Any]) -> str:
+    """Stable SHA-256 key for one request."""
+    blob = json.dumps(
+        {"provider": provider, "model": model, "system": system or "", "prompt": prompt, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed store with TTL and LRU size eviction."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, mode: str = LLM_CACHE_MODE,
+                 ttl: float = LLM_CACHE_TTL, max_mb: float = LLM_CACHE_MAX_MB):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {CACHE_MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def reads(self) -> bool:
+        return self.mode in ("on", "replay")
+
+    @property
+    def writes(self) -> bool:
+        return self.mode in ("on", "record")
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT,
+                    model TEXT,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored payload for `key`, or None on a miss or a stale entry."""
+        if not self.reads:
+            return None
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT payload, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.mode == "on" and time.time() - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, provider: str, model: str, payload: Dict[str, Any]) -> None:
+        if not self.writes:
+            return
+        data = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, data, len(data), now, now),
+            )
+            db.commit()
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        if self.mode == "on":
+            db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            db.commit()
+            return
+        # Drop least recently used rows until we are back under 90% of the budget
+        target = int(self.max_bytes * 0.9)
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= target:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+        db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
@@ -5,21 +5,19 @@ import os
 
 # Add the parent directory to the path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from FastContentExtractor import FastContentExtractor
 from prompts import INITIAL_SEARCH_PROMPT, CONTINUATION_SEARCH_PROMPT
-import dateparser
 from dotenv import load_dotenv
 import json
 import os
 from aiohttp import ClientSession, ClientTimeout
-from asknews_sdk import AskNewsSDK
 from prompts import context
 from dotenv import load_dotenv
 import aiohttp
 import re
 import random
 import time
-from openai import OpenAI   
+from http_sessions import get_openai_client
+from endpoints import SERPER_BASE_URL, PERPLEXITY_BASE_URL, ASKNEWS_BASE_URL, ASKNEWS_TOKEN_URL
 import traceback
 load_dotenv()
 
@@ -30,8 +28,6 @@ PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 METACULUS_TOKEN = os.getenv("METACULUS_TOKEN")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 assistant_prompt = """
 
 You are an assistant to a superforecaster and your task involves high-quality information retrieval to help the forecaster make the most informed forecasts. Forecasting involves parsing through an immense trove of internet articles and web content. To make this easier for the forecaster, you read entire articles and extract the key pieces of the articles relevant to the question. The key pieces generally include:
@@ -65,7 +61,12 @@ Please summarize only the article given, not injecting your own knowledge or pro
 def write(x):
     print(x)
 
+# dateparser, asknews_sdk and the scraping stack (FastContentExtractor) are slow to import,
+# so they are imported by the functions that use them instead of at startup
+
 def parse_date(date_str: str) -> str:
+    import dateparser
+
     parsed_date = dateparser.parse(date_str, settings={'STRICT_PARSING': False})
     if parsed_date:
         return parsed_date.strftime("%b %d, %Y")
@@ -74,6 +75,8 @@ def parse_date(date_str: str) -> str:
 def validate_time(before_date_str, source_date_str):
     if source_date_str == "Unknown":
         return False
+    import dateparser
+
     before_date = dateparser.parse(before_date_str)
     source_date = dateparser.parse(source_date_str)
     return source_date <= before_date
@@ -95,9 +98,12 @@ async def call_asknews(question: str) -> str:
     Use the AskNews `news` endpoint to get news context for your query.
     The full API reference can be found here: https://docs.asknews.app/en/reference#get-/v1/news/search
     """
+    from asknews_sdk import AskNewsSDK
+
     try:
         ask = AskNewsSDK(
-            client_id=ASKNEWS_CLIENT_ID, client_secret=ASKNEWS_SECRET, scopes=set(["news"])
+            client_id=ASKNEWS_CLIENT_ID, client_secret=ASKNEWS_SECRET, scopes=set(["news"]),
+            base_url=ASKNEWS_BASE_URL, token_url=ASKNEWS_TOKEN_URL,
         )
 
         async with aiohttp.ClientSession() as session:
@@ -313,7 +319,7 @@ async def call_perplexity(prompt: str) -> str:
     Async function to call Perplexity API for deep research
     Includes retry logic and proper timeout handling
     """
-    url = "https://api.perplexity.ai/chat/completions"
+    url = f"{PERPLEXITY_BASE_URL}/chat/completions"
     payload = {
         "model": "sonar-deep-research",
         "messages": [
@@ -374,7 +380,7 @@ async def google_search(query, is_news=False, date_before=None):
     write(f"[google_search] Cleaned query: '{query}' (original: '{original_query}') | is_news={is_news}, date_before={date_before}")
     
     search_type = "news" if is_news else "search"
-    url = f"https://google.serper.dev/{search_type}"
+    url = f"{SERPER_BASE_URL}/{search_type}"
     headers = {
         'X-API-KEY': SERPER_KEY,
         'Content-Type': 'application/json'
@@ -423,10 +429,10 @@ async def google_search(query, is_news=False, date_before=None):
 
 
 async def call_gpt(prompt, step=1):
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    client = get_openai_client()
 
     try:
-        response = client.responses.create(
+        response = await client.responses.create(
             model="o3",
             input=prompt
         )
@@ -437,6 +443,8 @@ async def call_gpt(prompt, step=1):
 
 
 async def google_search_and_scrape(query, is_news, question_details, date_before=None):
+    from FastContentExtractor import FastContentExtractor
+
     write(f"[google_search_and_scrape] Called with query='{query}', is_news={is_news}, date_before={date_before}")
     try:
         urls = await google_search(query, is_news, date_before)
@@ -445,7 +453,8 @@ async def google_search_and_scrape(query, is_news, question_details, date_before
             write(f"[google_search_and_scrape] [ERROR] No URLs returned for query: '{query}'")
             return f"<Summary query=\"{query}\">No URLs returned from Google.</Summary>\n"
 
-        async with FastContentExtractor() as extractor:
+        # Only the first 8000 characters of three articles get summarized, so a quick extraction is enough
+        async with FastContentExtractor(extraction_mode="fast") as extractor:
             write(f"[google_search_and_scrape] [INFO] Starting content extraction for {len(urls)} URLs")
             results = await extractor.extract_content(urls)
             write(f"[google_search_and_scrape] [OK] Finished content extraction")
@@ -504,6 +513,8 @@ async def google_search_agentic(query, is_news=False):
     Returns:
         Formatted string with raw article contents
     """
+    from FastContentExtractor import FastContentExtractor
+
     write(f"[google_search_agentic] Called with query='{query}', is_news={is_news}")
     try:
         urls = await google_search(query, is_news)
@@ -553,6 +564,59 @@ async def google_search_agentic(query, is_news=False):
 
 
 
+def parse_search_queries(response: str) -> List[tuple]:
+    """
+    Parse the (query, source) pairs out of the "Search queries:" block of a research LLM output.
+    """
+    search_queries_block = re.search(r'(?:Search queries:)(.*)', response, re.DOTALL | re.IGNORECASE)
+    if not search_queries_block:
+        return []
+    queries_text = search_queries_block.group(1).strip()
+
+    # Queries of the form: 1. "text" (Source); support both "Perplexity" (legacy) and "Agent" (new)
+    matches = re.findall(
+        r'(?:\d+\.\s*)?(["\']?(.*?)["\']?)\s*\((Google|Google News|Assistant|Agent|Perplexity)\)',
+        queries_text
+    )
+    # Fallback to unquoted queries if none found
+    if not matches:
+        matches = re.findall(
+            r'(?:\d+\.\s*)?([^(\n]+)\s*\((Google|Google News|Assistant|Agent|Perplexity)\)',
+            queries_text
+        )
+
+    search_queries = []
+    for match in matches:
+        # match can be ("\"text\"", "text", "Source") or ("text", "Source")
+        if len(match) == 3:
+            _, raw_query, source = match
+        else:
+            raw_query, source = match
+        query = raw_query.strip().strip('"').strip("'")
+        if query:
+            search_queries.append((query, source))
+    return search_queries
+
+
+async def asknews_article_ids(query: str) -> List[str]:
+    """
+    IDs of the latest AskNews articles for a query, without formatting them (used for change detection).
+    """
+    from asknews_sdk import AskNewsSDK
+
+    ask = AskNewsSDK(
+        client_id=ASKNEWS_CLIENT_ID, client_secret=ASKNEWS_SECRET, scopes=set(["news"]),
+        base_url=ASKNEWS_BASE_URL, token_url=ASKNEWS_TOKEN_URL,
+    )
+    response = await asyncio.to_thread(ask.news.search_news,
+        query=query,
+        n_articles=8,
+        return_type="dicts",
+        strategy="latest news"
+    )
+    return [str(getattr(article, "article_id", None) or article.article_url) for article in response.as_dicts]
+
+
 async def process_search_queries(response: str, forecaster_id: str, question_details: dict):
     """
     Parses out search queries from the forecaster's response, executes them
@@ -566,42 +630,19 @@ async def process_search_queries(response: str, forecaster_id: str, question_det
             write(f"Forecaster {forecaster_id}: No search queries block found")
             return ""
 
-        queries_text = search_queries_block.group(1).strip()
-
-        # 2) Try to find queries of the form: 1. "text" (Source)
-        # Support both "Perplexity" (legacy) and "Agent" (new)
-        search_queries = re.findall(
-            r'(?:\d+\.\s*)?(["\']?(.*?)["\']?)\s*\((Google|Google News|Assistant|Agent|Perplexity)\)',
-            queries_text
-        )
-        # 3) Fallback to unquoted queries if none found
-        if not search_queries:
-            search_queries = re.findall(
-                r'(?:\d+\.\s*)?([^(\n]+)\s*\((Google|Google News|Assistant|Agent|Perplexity)\)',
-                queries_text
-            )
-
+        # 2) Parse the (query, source) pairs out of it
+        search_queries = parse_search_queries(response)
         if not search_queries:
-            write(f"Forecaster {forecaster_id}: No valid search queries found:\n{queries_text}")
+            write(f"Forecaster {forecaster_id}: No valid search queries found:\n{search_queries_block.group(1).strip()}")
             return ""
 
         write(f"Forecaster {forecaster_id}: Processing {len(search_queries)} search queries")
 
-        # 4) Kick off one asyncio task per query
+        # 3) Kick off one asyncio task per query
         tasks = []
         query_sources = []  # Track which source goes with which task
         
-        for match in search_queries:
-            # match can be ("\"text\"", "text", "Source") or ("text", "Source")
-            if len(match) == 3:
-                _, raw_query, source = match
-            else:
-                raw_query, source = match
-
-            query = raw_query.strip().strip('"').strip("'")
-            if not query:
-                continue
-
+        for query, source in search_queries:
             write(f"Forecaster {forecaster_id}: Query='{query}' Source={source}")
             query_sources.append((query, source))
 
@@ -626,13 +667,13 @@ async def process_search_queries(response: str, forecaster_id: str, question_det
             write(f"Forecaster {forecaster_id}: No tasks generated")
             return ""
 
-        # 5) Await all tasks
+        # 4) Await all tasks
         formatted_results = ""
         
         # First gather with return_exceptions=True to prevent one failure from breaking everything
         results = await asyncio.gather(*tasks, return_exceptions=True)
             
-        # 6) Format the outputs
+        # 5) Format the outputs
         for (query, source), result in zip(query_sources, results):
             if isinstance(result, Exception):
                 write(f"[process_search_queries] [ERROR] Forecaster {forecaster_id}: Error for '{query}' -> {str(result)}")
@@ -0,0 +1,132 @@
+"""
+Cold-start import benchmark for the bot's entry points.
+
+Every CLI run and every hourly job starts a fresh interpreter, so the time spent
+importing main (and what it pulls in) is paid before the first request goes out.
+This script measures it reproducibly with `python -X importtime`: each module is
+imported in a new interpreter several times, and the median total plus the
+slowest imports (by cumulative time, from the median run) are reported.
+
+    python startup_benchmark.py                        # main, forecaster, benchmark
+    python startup_benchmark.py --modules main --runs 10 --top 20
+    python startup_benchmark.py --json > startup.json  # save a baseline
+    python startup_benchmark.py --baseline startup.json --max-regression 0.2
+
+With --baseline the exit status is 1 if a module got slower than the baseline by
+more than --max-regression (a fraction), so it can gate a CI step.
+
+Heavy libraries are imported where they are first used (openai, dateparser,
+asknews_sdk, the scraping stack, aiohttp.web, matplotlib, pandas); a new top-level
+import of one of them shows up here as a jump in the total.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ["main", "forecaster", "benchmark"]
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        (total seconds, {top-level or nested module: cumulative seconds})
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BOT_DIR, capture_output=True, text=True,
+        # Keep the measurement free of .pyc writes and of the caller's PYTHONSTARTUP
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONSTARTUP": ""},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name, seconds = match.group(4), int(match.group(2)) / 1e6
+        cumulative[name] = max(cumulative.get(name, 0.0), seconds)
+        if name == module:
+            total = seconds
+    return total, cumulative
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    # One untimed import first, so every timed run sees the same warm OS file cache
+    import_times(module)
+    samples = [import_times(module) for _ in range(runs)]
+    totals = [total for total, _ in samples]
+    median_run = sorted(samples, key=lambda sample: sample[0])[len(samples) // 2]
+    slowest = sorted(
+        ((name, seconds) for name, seconds in median_run[1].items() if name != module),
+        key=lambda item: item[1], reverse=True,
+    )[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "median": statistics.median(totals),
+        "min": min(totals),
+        "max": max(totals),
+        "slowest": [{"module": name, "cumulative": seconds} for name, seconds in slowest],
+    }
+
+
+def format_report(results: List[dict], baseline: Dict[str, float]) -> str:
+    lines = ["### Startup import time", "",
+             "| module | median | min | max | baseline |", "|---|---|---|---|---|"]
+    for result in results:
+        base = baseline.get(result["module"])
+        change = f"{base * 1000:.0f} ms ({(result['median'] / base - 1) * 100:+.0f}%)" if base else "-"
+        lines.append(f"| {result['module']} | {result['median'] * 1000:.0f} ms | {result['min'] * 1000:.0f} ms "
+                     f"| {result['max'] * 1000:.0f} ms | {change} |")
+    for result in results:
+        lines += ["", f"Slowest imports under `{result['module']}` (cumulative, median run):", ""]
+        lines += [f"- `{item['module']}`: {item['cumulative'] * 1000:.0f} ms" for item in result["slowest"]]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the bot's cold-start import time")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per module")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON (usable as --baseline)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    results = [measure(module, max(1, args.runs), args.top) for module in args.modules]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {result["module"]: result["median"] for result in json.load(f)}
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results, baseline))
+
+    regressed = [result["module"] for result in results
+                 if result["module"] in baseline
+                 and result["median"] > baseline[result["module"]] * (1 + args.max_regression)]
+    if regressed:
+        print(f"Import time regressed by more than {args.max_regression:.0%}: {', '.join(regressed)}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
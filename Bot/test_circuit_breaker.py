@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Checks for the circuit breakers' closed/open/half-open state machine on a fake
+clock, and for forecaster rerouting while a breaker is open (no network or API
+keys needed)
+"""
+
+import asyncio
+import contextlib
+
+import circuit_breaker
+import llm_calls
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, circuit_breakers
+from llm_client import OPENROUTER, LLMResponse
+from response_cache import response_cache
+
+
+class FakeClock:
+    """Stands in for the time module inside circuit_breaker."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@contextlib.contextmanager
+def fake_clock(threshold=5, cooldown=60, max_cooldown=600):
+    clock = FakeClock()
+    saved = (circuit_breaker.time, circuit_breaker.CIRCUIT_FAILURE_THRESHOLD,
+             circuit_breaker.CIRCUIT_COOLDOWN, circuit_breaker.CIRCUIT_MAX_COOLDOWN, circuit_breaker.write)
+    circuit_breaker.time = clock
+    circuit_breaker.CIRCUIT_FAILURE_THRESHOLD = threshold
+    circuit_breaker.CIRCUIT_COOLDOWN = cooldown
+    circuit_breaker.CIRCUIT_MAX_COOLDOWN = max_cooldown
+    circuit_breaker.write = lambda x: None
+    try:
+        yield clock
+    finally:
+        (circuit_breaker.time, circuit_breaker.CIRCUIT_FAILURE_THRESHOLD, circuit_breaker.CIRCUIT_COOLDOWN,
+         circuit_breaker.CIRCUIT_MAX_COOLDOWN, circuit_breaker.write) = saved
+
+
+def open_breaker(breaker, failures=5):
+    for _ in range(failures):
+        breaker.record_failure("overloaded")
+
+
+def test_consecutive_failures_open_the_breaker():
+    with fake_clock(threshold=3):
+        breaker = CircuitBreaker("openrouter", "model")
+        open_breaker(breaker, 2)
+        breaker.record_success()
+        open_breaker(breaker, 2)
+        assert breaker.state == CLOSED and breaker.allow()
+
+        breaker.record_failure("overloaded")
+        assert breaker.state == OPEN
+        assert not breaker.allow() and not breaker.allow()
+        assert breaker.rejected == 2
+        assert breaker.retry_in() == 60
+
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    with fake_clock() as clock:
+        breaker = CircuitBreaker("openrouter", "model")
+        open_breaker(breaker)
+        clock.now += 59
+        assert not breaker.allow()
+
+        clock.now += 1
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        assert breaker.rejected == 1  # a call waiting on the probe is not a rejection
+
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.allow()
+        assert breaker.cooldown == 60
+
+
+def test_failed_probes_double_the_cooldown_up_to_the_cap():
+    with fake_clock() as clock:
+        breaker = CircuitBreaker("openrouter", "model")
+        open_breaker(breaker)
+        cooldowns = []
+        for _ in range(5):
+            clock.now += breaker.cooldown
+            assert breaker.allow()
+            breaker.record_failure("timeout")
+            assert breaker.state == OPEN
+            assert breaker.retry_in() == breaker.cooldown
+            cooldowns.append(breaker.cooldown)
+        assert cooldowns == [120, 240, 480, 600, 600]
+
+        clock.now += 600
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.cooldown == 60
+
+
+def test_released_probe_lets_the_next_one_through():
+    with fake_clock() as clock:
+        breaker = CircuitBreaker("openrouter", "model")
+        open_breaker(breaker)
+        clock.now += 60
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.release()
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert breaker.cooldown == 60
+
+
+def test_open_breaker_reroutes_forecaster_to_its_substitute():
+    primary, substitute = "test/primary-model", "test/substitute-model"
+    sent = []
+
+    async def send(request, timeout):
+        sent.append(request.model)
+        return LLMResponse(text=f"answer from {request.model}", provider=OPENROUTER.name, model=request.model)
+
+    saved = (llm_calls.OPENROUTER_API_KEY, llm_calls.get_forecaster_model, llm_calls.get_substitute_model,
+             response_cache.mode)
+    llm_calls.OPENROUTER_API_KEY = "x"
+    llm_calls.get_forecaster_model = lambda f_id: primary
+    llm_calls.get_substitute_model = lambda f_id: substitute
+    response_cache.mode = "off"
+    OPENROUTER.send = send
+    try:
+        open_breaker(circuit_breakers.get(OPENROUTER.name, primary))
+        text = asyncio.run(llm_calls.call_forecaster_model(1, "Will it rain?", max_retries=1))
+    finally:
+        (llm_calls.OPENROUTER_API_KEY, llm_calls.get_forecaster_model, llm_calls.get_substitute_model,
+         response_cache.mode) = saved
+        del OPENROUTER.send
+        circuit_breakers._breakers.pop((OPENROUTER.name, primary), None)
+        circuit_breakers._breakers.pop((OPENROUTER.name, substitute), None)
+
+    assert text == f"answer from {substitute}"
+    assert sent == [substitute]
+
+
+if __name__ == "__main__":
+    test_consecutive_failures_open_the_breaker()
+    test_half_open_breaker_lets_a_single_probe_through()
+    test_failed_probes_double_the_cooldown_up_to_the_cap()
+    test_released_probe_lets_the_next_one_through()
+    test_open_breaker_reroutes_forecaster_to_its_substitute()
+    print("✅ circuit breaker checks passed")
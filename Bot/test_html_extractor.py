@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Checks for HTMLContentExtractor's strategy order, weights and early exits in
+tiered, fast and full mode, on fixture HTML (no network needed)
+"""
+
+from HTMLContentExtractor import EXTRACTION_MODES, STRATEGY_WEIGHTS, HTMLContentExtractor
+
+ORDER = ["site-specific", "trafilatura", "boilerpy", "readability"]
+URL = "https://news.example.com/2026/05/river-levels"
+
+PARAGRAPH = (
+    "<p>The river rose by {n} centimetres overnight after three days of heavy rain. "
+    "Officials said the flood barriers held, but farmland upstream was under water. "
+    "Forecasters expect the level to fall again by the end of the week, if the rain eases.</p>"
+)
+ARTICLE_HTML = f"""<html>
+<head><title>River levels rise after heavy rain</title>
+<meta name="author" content="A. Reporter"></head>
+<body>
+<nav><ul><li><a href="/">Home</a></li><li><a href="/world">World</a></li><li><a href="/sport">Sport</a></li></ul></nav>
+<article>
+<h1>River levels rise after heavy rain</h1>
+{''.join(PARAGRAPH.format(n=n) for n in range(10, 40))}
+</article>
+<div id="footer">Subscribe to our newsletter. Privacy policy. Terms of service.</div>
+</body></html>"""
+
+
+def stubbed_extractor(quality, mode="tiered"):
+    """An extractor whose strategies return fixed 5000-character texts scored by `quality` (label -> quality)."""
+    extractor = HTMLContentExtractor(mode=mode, strategies=ORDER, good_enough=0.6, fast_good_enough=0.3)
+    calls = []
+
+    def strategy(label):
+        def run(document, url, fast):
+            calls.append((label, fast))
+            if quality.get(label) is None:
+                return None
+            return (label + " text. ").ljust(5000, "x")
+        return run
+
+    extractor._strategy_functions = {label: strategy(label) for label in ORDER}
+    extractor._calculate_content_quality = lambda content: quality[content.split(" ")[0]]
+    extractor.calls = calls
+    return extractor
+
+
+def test_strategy_weights_cap_each_score():
+    assert STRATEGY_WEIGHTS == {"site-specific": 1.2, "trafilatura": 1.0, "readability": 0.9, "boilerpy": 0.8}
+    assert EXTRACTION_MODES == ("tiered", "fast", "full")
+
+
+def test_tiered_stops_at_the_first_good_enough_result():
+    extractor = stubbed_extractor({"trafilatura": 0.7, "boilerpy": 1.0, "readability": 1.0})
+    _, report = extractor.extract_with_report(URL, ARTICLE_HTML)
+
+    assert list(report["strategies"]) == ["site-specific", "trafilatura"]
+    assert report["selected"] == "trafilatura" and report["early_exit"]
+
+
+def test_tiered_stops_once_no_remaining_strategy_can_score_higher():
+    extractor = stubbed_extractor({"trafilatura": 0.5, "boilerpy": 0.5, "readability": 0.5})
+    extractor.good_enough = 0.99
+    _, report = extractor.extract_with_report(URL, ARTICLE_HTML)
+    assert list(report["strategies"]) == ORDER  # 0.5 is below readability's 0.9 cap
+
+    extractor = stubbed_extractor({"trafilatura": 0.95, "boilerpy": 1.0, "readability": 1.0})
+    extractor.good_enough = 0.99
+    _, report = extractor.extract_with_report(URL, ARTICLE_HTML)
+    assert list(report["strategies"]) == ["site-specific", "trafilatura"]
+    assert report["early_exit"]
+
+
+def test_fast_accepts_a_lower_score_and_asks_strategies_for_their_fast_path():
+    quality = {"trafilatura": 0.35, "boilerpy": 1.0, "readability": 1.0}
+
+    tiered = stubbed_extractor(quality)
+    _, tiered_report = tiered.extract_with_report(URL, ARTICLE_HTML)
+    fast = stubbed_extractor(quality)
+    _, fast_report = fast.extract_with_report(URL, ARTICLE_HTML, mode="fast")
+
+    assert tiered_report["selected"] == "boilerpy"
+    assert list(fast_report["strategies"]) == ["site-specific", "trafilatura"]
+    assert fast_report["selected"] == "trafilatura"
+    assert fast.calls == [("site-specific", True), ("trafilatura", True)]
+    assert all(not fast_path for _, fast_path in tiered.calls)
+
+
+def test_full_runs_every_strategy_and_keeps_the_best_weighted_score():
+    # Scores: site-specific 0.6, trafilatura 0.55, boilerpy 0.72, readability 0.63
+    extractor = stubbed_extractor({"site-specific": 0.5, "trafilatura": 0.55, "boilerpy": 0.9, "readability": 0.7},
+                                  mode="full")
+    _, report = extractor.extract_with_report(URL, ARTICLE_HTML)
+
+    assert list(report["strategies"]) == ORDER
+    assert report["selected"] == "boilerpy" and not report["early_exit"]
+
+
+def test_ties_go_to_the_higher_weight_whatever_the_order():
+    # site-specific 1.2 * 0.5 and trafilatura 1.0 * 0.6 both score 0.6
+    for order in (ORDER, list(reversed(ORDER))):
+        extractor = stubbed_extractor({"site-specific": 0.5, "trafilatura": 0.6}, mode="full")
+        extractor.strategies = order
+        _, report = extractor.extract_with_report(URL, ARTICLE_HTML)
+        assert report["selected"] == "site-specific", order
+
+
+def test_fixture_article_fast_mode_stops_early_and_full_mode_scores_everything():
+    extractor = HTMLContentExtractor(strategies=ORDER, good_enough=0.6, fast_good_enough=0.3)
+
+    fast_text, fast = extractor.extract_with_report(URL, ARTICLE_HTML, mode="fast")
+    full_text, full = extractor.extract_with_report(URL, ARTICLE_HTML, mode="full")
+
+    assert fast["early_exit"] and len(fast["strategies"]) < len(ORDER)
+    assert fast["selected"] == list(fast["strategies"])[-1]
+    assert list(full["strategies"]) == ORDER and not full["early_exit"]
+    for text in (fast_text, full_text):
+        assert "The river rose by 10 centimetres overnight" in text
+        assert "Subscribe to our newsletter" not in text
+
+
+if __name__ == "__main__":
+    test_strategy_weights_cap_each_score()
+    test_tiered_stops_at_the_first_good_enough_result()
+    test_tiered_stops_once_no_remaining_strategy_can_score_higher()
+    test_fast_accepts_a_lower_score_and_asks_strategies_for_their_fast_path()
+    test_full_runs_every_strategy_and_keeps_the_best_weighted_score()
+    test_ties_go_to_the_higher_weight_whatever_the_order()
+    test_fixture_article_fast_mode_stops_early_and_full_mode_scores_everything()
+    print("✅ HTML extractor checks passed")
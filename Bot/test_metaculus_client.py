@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Checks for the Metaculus client's batching, ETag and paging logic against a fake
+_request (no network or API token needed)
+"""
+
+import asyncio
+import json
+
+import metaculus_client
+from metaculus_client import MetaculusAPIError, MetaculusClient
+
+
+def fake_client(handler):
+    """A client whose _request calls handler(method, path, headers, kwargs) and records every call."""
+    client = MetaculusClient(base_url="http://metaculus.test/api", token="x")
+    client.calls = []
+
+    async def request(method, path, retry_server_errors=True, headers=None, **kwargs):
+        client.calls.append((method, path, headers, kwargs))
+        await asyncio.sleep(0)
+        return handler(method, path, headers, kwargs)
+
+    client._request = request
+    return client
+
+
+def posted_question_ids(client):
+    return [[item["question"] for item in kwargs["json"]] for method, _, _, kwargs in client.calls if method == "POST"]
+
+
+def with_batching(window, size, coro):
+    saved = metaculus_client.METACULUS_BATCH_WINDOW, metaculus_client.METACULUS_BATCH_SIZE
+    metaculus_client.METACULUS_BATCH_WINDOW, metaculus_client.METACULUS_BATCH_SIZE = window, size
+    try:
+        return asyncio.run(coro)
+    finally:
+        metaculus_client.METACULUS_BATCH_WINDOW, metaculus_client.METACULUS_BATCH_SIZE = saved
+
+
+def test_rejected_payload_fails_only_its_own_forecast():
+    def handler(method, path, headers, kwargs):
+        if any(item["question"] == 3 for item in kwargs["json"]):
+            raise MetaculusAPIError(400, path, "question is closed")
+        return 201, {}, ""
+
+    client = fake_client(handler)
+
+    async def run():
+        return await asyncio.gather(*[client.submit_forecast(q, {}) for q in range(1, 6)], return_exceptions=True)
+
+    results = with_batching(0.01, 20, run())
+
+    assert [r for r in results if r is not None] == [results[2]]
+    assert isinstance(results[2], MetaculusAPIError)
+    assert posted_question_ids(client)[0] == [1, 2, 3, 4, 5]
+    assert sorted(posted_question_ids(client)[1:]) == [[1], [2], [3], [4], [5]]
+    assert client.split_batches == 1
+
+
+def test_forecasts_within_the_window_go_out_in_one_batch():
+    client = fake_client(lambda *args: (201, {}, ""))
+
+    async def run():
+        await asyncio.gather(*[client.submit_forecast(q, {"probability_yes": 0.5}) for q in (1, 2, 3)])
+        await client.submit_forecast(4, {})
+
+    with_batching(0.01, 20, run())
+
+    assert posted_question_ids(client) == [[1, 2, 3], [4]]
+    assert client.calls[0][3]["json"][0] == {"question": 1, "probability_yes": 0.5}
+
+
+def test_a_full_batch_is_sent_without_waiting_for_the_window():
+    client = fake_client(lambda *args: (201, {}, ""))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*[client.submit_forecast(q, {}) for q in (1, 2)])
+        return loop.time() - started
+
+    elapsed = with_batching(5, 2, run())
+
+    assert elapsed < 1
+    assert posted_question_ids(client) == [[1, 2]]
+
+
+def test_unchanged_post_is_served_from_its_etag():
+    post = {"id": 7, "question": {"id": 70}}
+
+    def handler(method, path, headers, kwargs):
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return 304, {}, ""
+        return 200, {"ETag": '"v1"'}, json.dumps(post)
+
+    client = fake_client(handler)
+
+    async def run():
+        return await client.get_post(7), await client.get_post(7)
+
+    first, second = asyncio.run(run())
+
+    assert first == second == post
+    assert client.calls[0][2] is None
+    assert client.calls[1][2] == {"If-None-Match": '"v1"'}
+    assert client.not_modified == 1
+
+
+def paged_handler(total, report_count):
+    def handler(method, path, headers, kwargs):
+        offset, limit = kwargs["params"]["offset"], kwargs["params"]["limit"]
+        page = {
+            "results": [{"id": i} for i in range(offset, min(offset + limit, total))],
+            "next": "more" if offset + limit < total else None,
+        }
+        if report_count:
+            page["count"] = total
+        return 200, {}, json.dumps(page)
+    return handler
+
+
+def test_list_all_posts_fetches_every_page_using_the_count():
+    client = fake_client(paged_handler(120, report_count=True))
+
+    posts = asyncio.run(client.list_all_posts(1, page_size=50))
+
+    assert [p["id"] for p in posts] == list(range(120))
+    assert [kwargs["params"]["offset"] for _, _, _, kwargs in client.calls] == [0, 50, 100]
+
+
+def test_list_all_posts_follows_next_without_a_count():
+    client = fake_client(paged_handler(120, report_count=False))
+
+    posts = asyncio.run(client.list_all_posts(1, page_size=50))
+
+    assert [p["id"] for p in posts] == list(range(120))
+    assert [kwargs["params"]["offset"] for _, _, _, kwargs in client.calls] == [0, 50, 100]
+
+
+if __name__ == "__main__":
+    test_rejected_payload_fails_only_its_own_forecast()
+    test_forecasts_within_the_window_go_out_in_one_batch()
+    test_a_full_batch_is_sent_without_waiting_for_the_window()
+    test_unchanged_post_is_served_from_its_etag()
+    test_list_all_posts_fetches_every_page_using_the_count()
+    test_list_all_posts_follows_next_without_a_count()
+    print("✅ Metaculus client checks passed")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Checks for the forecast pipeline's stage graph and its checkpoints (no network or
+API keys needed)
+"""
+
+import asyncio
+import contextlib
+import datetime
+import os
+import tempfile
+import types
+
+import checkpoint_store
+import main
+from checkpoint_store import CheckpointStore, input_hash
+from llm_client import LLMError
+from pipeline import Stage, StageGraph, forecast_graph
+
+QUESTION = {"id": 42, "title": "Will it rain?", "type": "binary", "description": "Rain in Paris",
+            "resolution_criteria": "Any rain", "fine_print": "", "page_url": "/questions/7/"}
+
+
+@contextlib.contextmanager
+def temp_store():
+    with tempfile.TemporaryDirectory() as directory:
+        store = CheckpointStore(os.path.join(directory, "checkpoints.sqlite"), enabled=True)
+        try:
+            yield store
+        finally:
+            if store._conn is not None:
+                store._conn.close()
+
+
+def test_failed_step1_fails_its_chain():
+    """A forecaster whose step 1 failed must not reach step 2 or the aggregate."""
+    step2_prompts = []
+
+    async def call(prompt, **kwargs):
+        if prompt.startswith("step1") and prompt.endswith("fail"):
+            raise LLMError("provider down", provider="test")
+        if prompt.startswith("step2"):
+            step2_prompts.append(prompt)
+        return f"output of {prompt}"
+
+    async def generate_queries(kind):
+        return kind
+
+    async def search(kind, output):
+        return "history" if kind == "historical" else "news"
+
+    def step1_prompt(context):
+        return "step1"
+
+    def step2_prompt(f_id, context, step1_outputs):
+        return f"step2 {f_id} prior={list(step1_outputs.values())}"
+
+    forecasters = {
+        1: lambda prompt, **kwargs: call(prompt + " fail", **kwargs),
+        2: call,
+    }
+    graph = forecast_graph(
+        "binary",
+        generate_queries,
+        search,
+        forecasters,
+        step1_prompt,
+        step2_prompt,
+        dependencies={1: (1,), 2: (2,)},
+        answer_ready=lambda text: True,
+        parse=lambda output: 50,
+        aggregate=lambda outputs, parsed: ([p for p in parsed if not isinstance(p, Exception)], ""),
+        write=lambda x: None,
+    )
+    results = asyncio.run(graph.run(write=lambda x: None))
+
+    assert isinstance(results["step1_1"], LLMError)
+    assert isinstance(results["step2_1"], LLMError)
+    assert isinstance(results["parse_1"], LLMError)
+    assert results["parse_2"] == 50
+    assert step2_prompts == ["step2 2 prior=['output of step1']"]
+    assert results["forecast"] == ([50], "")
+
+
+def test_restored_stages_need_their_inputs_restored_too():
+    async def echo(*inputs):
+        return inputs
+
+    graph = StageGraph("test", [
+        Stage("a", echo),
+        Stage("b", echo, ("a",)),
+        Stage("c", echo, ("b",)),
+        Stage("d", echo),
+    ])
+
+    assert graph._restorable({"a": 1, "b": 2, "c": 3}) == {"a": 1, "b": 2, "c": 3}
+    assert graph._restorable({"b": 2, "c": 3, "d": 4}) == {"d": 4}
+    assert graph._restorable({"a": 1, "c": 3}) == {"a": 1}
+
+    with temp_store() as store:
+        checkpoint = store.question(QUESTION, "test")
+        checkpoint.save("a", "saved a")
+        checkpoint.save("c", "stale c")
+        results = asyncio.run(graph.run(write=lambda x: None, checkpoint=checkpoint))
+
+    assert results["a"] == "saved a"
+    assert results["c"] == (("saved a",),)
+    assert sorted(t.stage for t in graph.trace) == ["b", "c", "d"]
+
+
+def test_input_hash_covers_question_fields_date_and_revision():
+    key = input_hash(QUESTION, "binary")
+
+    assert input_hash(dict(QUESTION), "binary") == key
+    assert input_hash({**QUESTION, "page_url": "/questions/8/"}, "binary") == key  # not a hashed field
+    for field, value in (("title", "Will it snow?"), ("fine_print", "Drizzle counts"), ("type", "numeric")):
+        assert input_hash({**QUESTION, field: value}, "binary") != key, field
+    assert input_hash(QUESTION, "numeric") != key
+    assert input_hash(QUESTION, "binary", revision=1) != key
+
+    class Tomorrow(datetime.date):
+        @classmethod
+        def today(cls):
+            return datetime.date.today() + datetime.timedelta(days=1)
+
+    saved = checkpoint_store.datetime
+    checkpoint_store.datetime = types.SimpleNamespace(date=Tomorrow)
+    try:
+        assert input_hash(QUESTION, "binary") != key
+    finally:
+        checkpoint_store.datetime = saved
+
+
+def test_new_revision_starts_fresh_checkpoints_and_keeps_the_research_record():
+    with temp_store() as store:
+        checkpoint = store.question(QUESTION, "binary")
+        checkpoint.save("forecast", [0.4, ""])
+        checkpoint.mark_submitted("forecast")
+        store.save_research(QUESTION["id"], {"queries": "q", "sources": ["s"], "forecast_at": 0})
+
+        store.new_revision(QUESTION["id"])
+        fresh = store.question(QUESTION, "binary")
+
+        assert fresh.key != checkpoint.key
+        assert fresh.load() == {} and not fresh.submitted("forecast")
+        assert checkpoint.load() == {"forecast": [0.4, ""]}
+        assert store.research(QUESTION["id"])["sources"] == ["s"]
+
+        store.save_research(QUESTION["id"], {"queries": "q", "sources": ["t"], "forecast_at": 1})
+        assert store.question(QUESTION, "binary").key == fresh.key
+
+
+def test_completed_run_is_forecast_and_posted_again():
+    """A rerun after both submissions went through must not be mistaken for a resume."""
+    posted = []
+
+    async def get_post_details(post_id):
+        return {"question": dict(QUESTION)}
+
+    async def binary_forecast(question_details, write):
+        return 0.4, "comment"
+
+    async def call_gpt(prompt):
+        return "summary"
+
+    async def post_question_prediction(question_id, payload):
+        posted.append(("forecast", question_id))
+
+    async def post_question_comment(post_id, text):
+        posted.append(("comment", post_id))
+
+    names = ("get_post_details", "binary_forecast", "call_gpt", "post_question_prediction",
+             "post_question_comment", "checkpoint_store", "OUTPUT_DIR")
+    saved = {name: getattr(main, name) for name in names}
+    with temp_store() as store, tempfile.TemporaryDirectory() as output_dir:
+        for name, value in zip(names, (get_post_details, binary_forecast, call_gpt, post_question_prediction,
+                                       post_question_comment, store, output_dir)):
+            setattr(main, name, value)
+        try:
+            summaries = [asyncio.run(main.forecast_individual_question(42, 7, True, 1, "never")) for _ in range(2)]
+        finally:
+            for name, value in saved.items():
+                setattr(main, name, value)
+
+    assert posted == [("forecast", 42), ("comment", 7)] * 2
+    assert all("Posted: Forecast" in s and "Posted: Comment" in s for s in summaries)
+
+
+if __name__ == "__main__":
+    test_failed_step1_fails_its_chain()
+    test_restored_stages_need_their_inputs_restored_too()
+    test_input_hash_covers_question_fields_date_and_revision()
+    test_new_revision_starts_fresh_checkpoints_and_keeps_the_research_record()
+    test_completed_run_is_forecast_and_posted_again()
+    print("✅ pipeline checks passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Checks for the question scheduler's priority order, concurrency bound, drain and
+cancel (no network or API keys needed)
+"""
+
+import asyncio
+
+from question_scheduler import QuestionJob, QuestionNotStarted, QuestionScheduler
+
+
+def job(index, question_type=None, close="2026-06-01T12:00:00Z"):
+    return QuestionJob.from_question(index, question_id=100 + index, post_id=index,
+                                     question={"type": question_type, "scheduled_close_time": close})
+
+
+def test_jobs_start_soonest_closing_first_then_by_type():
+    jobs = [
+        job(0, "binary", "2026-06-02T12:00:00Z"),
+        job(1, "binary", "2026-06-01T12:10:00Z"),
+        job(2, "multiple_choice", "2026-06-01T12:20:00Z"),
+        job(3, "numeric", "2026-06-01T12:30:00Z"),
+        job(4, "binary", None),
+        job(5, "numeric", "2026-06-01T09:00:00Z"),
+        job(6, "binary", "2026-06-01T12:40:00Z"),
+    ]
+    started = []
+
+    async def forecast(job):
+        started.append(job.index)
+        await asyncio.sleep(0)
+        return job.question_id
+
+    results = asyncio.run(QuestionScheduler(max_in_flight=1).run(jobs, forecast))
+
+    # Same hour: numeric, then multiple choice, then binary in listing order; no close time goes last
+    assert started == [5, 3, 2, 1, 6, 0, 4]
+    assert results == [job.question_id for job in jobs]
+
+
+def test_no_more_than_max_in_flight_questions_run_at_once():
+    in_flight, peak = 0, 0
+
+    async def forecast(job):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if job.index == 3:
+            raise ValueError("bad question")
+        return job.index
+
+    scheduler = QuestionScheduler(max_in_flight=3)
+    results = asyncio.run(scheduler.run([job(i) for i in range(10)], forecast))
+
+    assert peak == 3
+    assert results[:3] == [0, 1, 2] and results[4:] == list(range(4, 10))
+    assert isinstance(results[3], ValueError)
+    assert scheduler.stats() == {"in_flight": 0, "queued": 0, "started": 10, "finished": 10, "draining": False}
+
+
+def test_drain_finishes_questions_in_flight_and_starts_no_more():
+    scheduler = QuestionScheduler(max_in_flight=2)
+
+    async def forecast(job):
+        if job.index == 1:
+            scheduler.drain()
+        await asyncio.sleep(0.01)
+        return job.index
+
+    results = asyncio.run(scheduler.run([job(i) for i in range(5)], forecast))
+
+    assert results[:2] == [0, 1]
+    assert all(isinstance(r, QuestionNotStarted) for r in results[2:])
+    assert (scheduler.started, scheduler.finished) == (2, 2)
+
+
+def test_cancel_cancels_questions_in_flight():
+    scheduler = QuestionScheduler(max_in_flight=2)
+    finished = []
+
+    async def forecast(job):
+        if job.index == 0:
+            return job.index
+        if job.index == 1:
+            asyncio.get_running_loop().call_later(0.01, scheduler.cancel)
+        await asyncio.sleep(10)
+        finished.append(job.index)
+
+    results = asyncio.run(asyncio.wait_for(scheduler.run([job(i) for i in range(5)], forecast), 5))
+
+    assert results[0] == 0
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert isinstance(results[2], asyncio.CancelledError)
+    assert all(isinstance(r, QuestionNotStarted) for r in results[3:])
+    assert finished == []
+
+
+if __name__ == "__main__":
+    test_jobs_start_soonest_closing_first_then_by_type()
+    test_no_more_than_max_in_flight_questions_run_at_once()
+    test_drain_finishes_questions_in_flight_and_starts_no_more()
+    test_cancel_cancels_questions_in_flight()
+    print("✅ question scheduler checks passed")
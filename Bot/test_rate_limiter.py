@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Checks for the LLM rate limiter's buckets, AIMD budgets and reset parsing, on a
+fake clock (no network or API keys needed)
+"""
+
+import asyncio
+import contextlib
+import datetime
+import types
+
+import rate_limiter
+from rate_limiter import MIN_BUDGET_FRACTION, RECOVERY_FRACTION, ModelLimiter, TokenBucket, _parse_reset
+
+NOW = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc).timestamp()
+
+
+class FakeClock:
+    """Stands in for the time module and asyncio.sleep inside rate_limiter."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return NOW + self.now - 1000.0
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@contextlib.contextmanager
+def fake_clock():
+    clock = FakeClock()
+    saved = rate_limiter.time, rate_limiter.asyncio
+    rate_limiter.time = clock
+    rate_limiter.asyncio = types.SimpleNamespace(
+        Lock=asyncio.Lock, get_running_loop=asyncio.get_running_loop, sleep=clock.sleep,
+    )
+    try:
+        yield clock
+    finally:
+        rate_limiter.time, rate_limiter.asyncio = saved
+
+
+def test_parse_reset_formats():
+    with fake_clock():
+        assert _parse_reset("1m30s") == 90
+        assert _parse_reset("250ms") == 0.25
+        assert _parse_reset("1h2m3.5s") == 3723.5
+        assert _parse_reset("12") == 12
+        assert _parse_reset(str(int((NOW + 30) * 1000))) == 30  # epoch milliseconds (OpenRouter)
+        assert _parse_reset(str(int((NOW - 30) * 1000))) == 0
+        assert _parse_reset("2026-01-01T00:00:45Z") == 45  # RFC 3339 (Anthropic)
+        assert _parse_reset("2026-01-01T01:00:45+01:00") == 45
+        assert _parse_reset("soon") is None
+
+
+def test_rate_limited_halves_budget_down_to_the_floor_and_recovers_to_the_ceiling():
+    with fake_clock() as clock:
+        limiter = ModelLimiter("openrouter", "model", rpm=100, tpm=10_000)
+        limiter.on_rate_limited(retry_after=5)
+        assert (limiter.requests.per_minute, limiter.tokens.per_minute) == (50, 5_000)
+        assert limiter.requests.blocked_until == clock.now + 5
+
+        for _ in range(10):
+            limiter.on_rate_limited(retry_after=None)
+        floor = 100 * MIN_BUDGET_FRACTION
+        assert limiter.requests.per_minute == floor
+        assert limiter.tokens.per_minute == 10_000 * MIN_BUDGET_FRACTION
+        assert limiter.rate_limited == 11
+
+        steps = round((1 - MIN_BUDGET_FRACTION) / RECOVERY_FRACTION)
+        for _ in range(steps - 1):
+            limiter.on_success()
+        assert limiter.requests.per_minute < 100
+        for _ in range(5):
+            limiter.on_success()
+        assert (limiter.requests.per_minute, limiter.tokens.per_minute) == (100, 10_000)
+
+
+def test_oversized_request_is_clamped_to_the_bucket_size():
+    async def run():
+        bucket = TokenBucket(60)
+        waited = await bucket.acquire(1_000)
+        return waited, bucket.tokens
+
+    with fake_clock():
+        assert asyncio.run(run()) == (0.0, 0)
+
+
+def test_empty_bucket_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(60)
+        await bucket.acquire(60)
+        return await bucket.acquire(30)
+
+    with fake_clock():
+        assert asyncio.run(run()) == 30
+
+
+def test_blocked_bucket_waits_until_blocked_until():
+    async def run():
+        bucket = TokenBucket(60)
+        bucket.block_for(5)
+        return await bucket.acquire(1)
+
+    with fake_clock() as clock:
+        assert asyncio.run(run()) == 5
+        assert clock.slept == [5]
+
+
+def test_exhausted_window_in_headers_blocks_until_reset():
+    with fake_clock() as clock:
+        limiter = ModelLimiter("openai", "model", rpm=100, tpm=10_000)
+        limiter.on_headers({"X-RateLimit-Remaining-Requests": "0", "X-RateLimit-Reset-Requests": "1m30s",
+                            "X-RateLimit-Remaining-Tokens": "250", "X-RateLimit-Reset-Tokens": "2s"})
+        assert limiter.requests.blocked_until == clock.now + 90
+        assert limiter.tokens.blocked_until == 0
+        assert limiter.tokens.tokens == 250
+
+
+if __name__ == "__main__":
+    test_parse_reset_formats()
+    test_rate_limited_halves_budget_down_to_the_floor_and_recovers_to_the_ceiling()
+    test_oversized_request_is_clamped_to_the_bucket_size()
+    test_empty_bucket_waits_for_refill()
+    test_blocked_bucket_waits_until_blocked_until()
+    test_exhausted_window_in_headers_blocks_until_reset()
+    print("✅ rate limiter checks passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Checks for the reforecast decision of research_fingerprint against stubbed
+searches and a temporary checkpoint file (no network or API keys needed)
+"""
+
+import asyncio
+import contextlib
+import os
+import tempfile
+
+import research_fingerprint
+from checkpoint_store import CheckpointStore
+from research_fingerprint import probe_sources, record_research, reforecast_decision
+
+QUESTION = {"id": 42, "resolution_date": "2026-12-31"}
+QUERIES = """Search queries:
+1. "rainfall forecast" (Google)
+2. "storm warning" (Google News)
+3. "weather service statement" (Assistant)
+4. "summarise the outlook" (Agent)
+"""
+
+
+class FakeClock:
+    """Stands in for the time module inside research_fingerprint."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeSearch:
+    """google_search/asknews_article_ids stubs returning the sources set for each provider."""
+
+    def __init__(self):
+        self.results = {"Google": ["g1", "g2"], "Google News": ["n1", "n2"], "Assistant": ["a1", "a2"]}
+        self.queries = []
+
+    def answer(self, source, query):
+        self.queries.append((source, query))
+        result = self.results[source]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def google_search(self, query, is_news=False, date_before=None):
+        return self.answer("Google News" if is_news else "Google", query)
+
+    async def asknews_article_ids(self, query):
+        return self.answer("Assistant", query)
+
+
+@contextlib.contextmanager
+def stubbed():
+    clock, search = FakeClock(), FakeSearch()
+    names = ("time", "checkpoint_store", "google_search", "asknews_article_ids", "write",
+             "REFORECAST_MAX_AGE_HOURS", "REFORECAST_NEW_SOURCE_FRACTION")
+    saved = {name: getattr(research_fingerprint, name) for name in names}
+    with tempfile.TemporaryDirectory() as directory:
+        store = CheckpointStore(os.path.join(directory, "checkpoints.sqlite"), enabled=True)
+        research_fingerprint.time = clock
+        research_fingerprint.checkpoint_store = store
+        research_fingerprint.google_search = search.google_search
+        research_fingerprint.asknews_article_ids = search.asknews_article_ids
+        research_fingerprint.write = lambda x: None
+        research_fingerprint.REFORECAST_MAX_AGE_HOURS = 24
+        research_fingerprint.REFORECAST_NEW_SOURCE_FRACTION = 0.25
+        try:
+            yield clock, search, store
+        finally:
+            for name, value in saved.items():
+                setattr(research_fingerprint, name, value)
+            if store._conn is not None:
+                store._conn.close()
+
+
+def test_probe_queries_search_and_asknews_only():
+    with stubbed() as (_, search, _):
+        sources = asyncio.run(probe_sources(QUERIES, QUESTION))
+
+    assert sources == ["a1", "a2", "g1", "g2", "n1", "n2"]
+    assert sorted(search.queries) == [("Assistant", "weather service statement"), ("Google", "rainfall forecast"),
+                                      ("Google News", "storm warning")]
+
+
+def test_question_without_research_record_is_reforecast():
+    with stubbed() as (_, search, _):
+        decision = asyncio.run(reforecast_decision(QUESTION))
+
+    assert decision.needed
+    assert search.queries == []
+
+
+def test_stale_forecast_is_reforecast_without_probing():
+    with stubbed() as (clock, search, _):
+        asyncio.run(record_research(QUESTION, QUERIES))
+        search.queries.clear()
+        clock.now += 24 * 3600 - 1
+        fresh = asyncio.run(reforecast_decision(QUESTION))
+        probes = len(search.queries)
+        clock.now += 1
+        search.queries.clear()
+        stale = asyncio.run(reforecast_decision(QUESTION))
+
+    assert not fresh.needed and probes == 3
+    assert stale.needed and "old" in stale.reason
+    assert search.queries == []
+
+
+def test_reforecast_once_the_new_source_fraction_is_reached():
+    with stubbed() as (_, search, _):
+        asyncio.run(record_research(QUESTION, QUERIES))
+
+        search.results["Google"] = ["g1", "g3"]  # 1 of 6 new, below 0.25
+        below = asyncio.run(reforecast_decision(QUESTION))
+        search.results["Google News"] = ["n1", "n3"]  # 2 of 6 new
+        above = asyncio.run(reforecast_decision(QUESTION))
+
+    assert not below.needed and below.reason.startswith("1/6 sources are new")
+    assert above.needed and above.reason == "2/6 sources are new"
+
+
+def test_failed_lookups_count_as_no_new_evidence():
+    with stubbed() as (_, search, _):
+        asyncio.run(record_research(QUESTION, QUERIES))
+
+        search.results["Google"] = ConnectionError("serper down")
+        search.results["Google News"] = TimeoutError("serper timed out")
+        partial = asyncio.run(reforecast_decision(QUESTION))
+        search.results["Assistant"] = ConnectionError("asknews down")
+        nothing = asyncio.run(reforecast_decision(QUESTION))
+
+    assert not partial.needed and partial.reason.startswith("0/2 sources are new")
+    assert not nothing.needed and nothing.reason.startswith("0/0 sources are new")
+
+
+if __name__ == "__main__":
+    test_probe_queries_search_and_asknews_only()
+    test_question_without_research_record_is_reforecast()
+    test_stale_forecast_is_reforecast_without_probing()
+    test_reforecast_once_the_new_source_fraction_is_reached()
+    test_failed_lookups_count_as_no_new_evidence()
+    print("✅ research fingerprint checks passed")
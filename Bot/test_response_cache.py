@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Checks for the LLM response cache's modes, TTL, LRU eviction and keys, on a
+temporary SQLite file (no network or API keys needed)
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+
+import llm_client
+import response_cache
+from llm_client import OPENROUTER, LLMCacheMiss, LLMRequest, LLMResponse
+from response_cache import ResponseCache, cache_key
+
+
+class FakeClock:
+    """Stands in for the time module inside response_cache."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@contextlib.contextmanager
+def temp_cache(mode, ttl=3600, max_mb=1):
+    clock = FakeClock()
+    saved = response_cache.time
+    response_cache.time = clock
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "responses.sqlite"), mode=mode, ttl=ttl, max_mb=max_mb)
+        try:
+            yield cache, clock
+        finally:
+            response_cache.time = saved
+            if cache._conn is not None:
+                cache._conn.close()
+
+
+def payload(text):
+    return {"text": text, "provider": "openrouter", "model": "model"}
+
+
+def complete_with(cache, prompt="Will it rain?"):
+    """Run llm_client.complete against `cache`, returning (text, models sent to the provider)."""
+    sent = []
+
+    async def send(request, timeout):
+        sent.append(request.model)
+        return LLMResponse(text="fresh answer", provider=OPENROUTER.name, model=request.model)
+
+    saved = llm_client.response_cache
+    llm_client.response_cache = cache
+    OPENROUTER.send = send
+    try:
+        response = asyncio.run(llm_client.llm_client.complete(
+            OPENROUTER, LLMRequest(model="test/model", prompt=prompt, stream=False),
+            llm_client.llm_client.with_policy(max_attempts=1),
+        ))
+    finally:
+        llm_client.response_cache = saved
+        del OPENROUTER.send
+    return response.text, sent
+
+
+def test_replay_miss_raises_without_calling_the_provider():
+    with temp_cache("replay") as (cache, _):
+        try:
+            complete_with(cache)
+        except LLMCacheMiss:
+            pass
+        else:
+            raise AssertionError("replay miss did not raise LLMCacheMiss")
+        assert cache.misses == 1
+
+
+def test_record_mode_stores_but_never_reads():
+    with temp_cache("record") as (cache, _):
+        assert complete_with(cache) == ("fresh answer", ["test/model"])
+        assert complete_with(cache) == ("fresh answer", ["test/model"])
+        assert (cache.hits, cache.misses) == (0, 0)
+
+        cache.mode = "replay"
+        assert complete_with(cache) == ("fresh answer", [])
+        assert cache.hits == 1
+
+
+def test_on_mode_expires_entries_after_the_ttl():
+    with temp_cache("on", ttl=3600) as (cache, clock):
+        cache.put("key", "openrouter", "model", payload("stored"))
+        clock.now += 3599
+        assert cache.get("key") == payload("stored")
+
+        clock.now += 2
+        assert cache.get("key") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Replay ignores the TTL
+        cache.mode = "replay"
+        assert cache.get("key") == payload("stored")
+
+
+def test_least_recently_used_entries_are_evicted_past_the_budget():
+    entry_size = len(json.dumps(payload("x" * 1000)))
+    with temp_cache("on", max_mb=3.5 * entry_size / (1024 * 1024)) as (cache, clock):
+        for key in ("a", "b", "c"):
+            cache.put(key, "openrouter", "model", payload("x" * 1000))
+            clock.now += 1
+        assert cache.get("a") is not None  # "b" is now the least recently used
+        clock.now += 1
+
+        cache.put("d", "openrouter", "model", payload("x" * 1000))
+
+        assert cache.get("b") is None
+        assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+
+
+def test_cache_key_ignores_param_order():
+    first = cache_key("openrouter", "model", None, "prompt", {"max_tokens": 100, "temperature": 0.2})
+    second = cache_key("openrouter", "model", "", "prompt", {"temperature": 0.2, "max_tokens": 100})
+    assert first == second
+    assert first != cache_key("openrouter", "model", None, "prompt", {"max_tokens": 101, "temperature": 0.2})
+    assert first != cache_key("openrouter", "other", None, "prompt", {"max_tokens": 100, "temperature": 0.2})
+
+
+if __name__ == "__main__":
+    test_replay_miss_raises_without_calling_the_provider()
+    test_record_mode_stores_but_never_reads()
+    test_on_mode_expires_entries_after_the_ttl()
+    test_least_recently_used_entries_are_evicted_past_the_budget()
+    test_cache_key_ignores_param_order()
+    print("✅ response cache checks passed")